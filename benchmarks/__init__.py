@@ -0,0 +1 @@
+"""Benchmarks for glotter_core"""
@@ -0,0 +1,60 @@
+"""Compare uncached, cold-cache, and warm-cache categorization of a synthetic tree
+
+Usage: ``python -m benchmarks.bench_cache [--languages N] [--projects N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            Path(tmp_dir, "tree"), num_languages=args.languages, num_projects=args.projects
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+        finally:
+            os.chdir(orig_cwd)
+
+        cache_dir = str(Path(tmp_dir, "cache"))
+        print(f"{args.languages} languages, {args.projects} projects")
+        uncached = _time_categorize(settings, None)
+        print(f"uncached   {uncached:8.3f}s")
+        cold = _time_categorize(settings, cache_dir)
+        print(f"cold cache {cold:8.3f}s")
+        warm = _time_categorize(settings, cache_dir)
+        print(f"warm cache {warm:8.3f}s  speedup {uncached / warm:6.2f}x")
+
+        test_info_path = next(Path(settings.source_root).glob("*/*/testinfo.yml"))
+        test_info_path.write_text(
+            test_info_path.read_text(encoding="utf-8") + "\n", encoding="utf-8"
+        )
+        one_changed = _time_categorize(settings, cache_dir)
+        print(f"1 changed  {one_changed:8.3f}s  speedup {uncached / one_changed:6.2f}x")
+
+
+def _time_categorize(settings: CoreSettings, cache_dir: str | None) -> float:
+    start = time.perf_counter()
+    categorize_sources(settings.source_root, settings.projects, CoreSource, cache_dir=cache_dir)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Time finding the sources affected by a change set against categorizing everything
+
+Usage: ``python -m benchmarks.bench_changes [--languages N] [--projects N] [--changed N,N,...]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.changes import find_affected_sources
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument(
+        "--changed", default="1,10,100", help="comma-separated numbers of changed files"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            Path(tmp_dir, "tree"), num_languages=args.languages, num_projects=args.projects
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+            start = time.perf_counter()
+            categorize_sources(settings.source_root, settings.projects, CoreSource)
+            full_time = time.perf_counter() - start
+            source_files = sorted(
+                os.path.relpath(os.path.join(directory, filename), root)
+                for directory, _, files in os.walk(settings.source_root)
+                for filename in files
+                if filename not in ("testinfo.yml", "untestable.yml")
+            )
+
+            print(f"{args.languages} languages, {args.projects} projects")
+            print(f"{'changed':>7} {'time':>9} {'speedup':>8} {'sources':>8}")
+            print(f"{'all':>7} {full_time:8.3f}s {1:7.2f}x {'':>8}")
+            rng = random.Random(0)
+            for num_changed in [int(num_changed) for num_changed in args.changed.split(",")]:
+                changed_paths = rng.sample(source_files, min(num_changed, len(source_files)))
+                start = time.perf_counter()
+                affected = find_affected_sources(
+                    settings.source_root, settings.projects, CoreSource, changed_paths
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{num_changed:7} {elapsed:8.3f}s {full_time / elapsed:7.2f}x "
+                    f"{len(affected.sources):8}"
+                )
+        finally:
+            os.chdir(orig_cwd)
+
+
+if __name__ == "__main__":
+    main()
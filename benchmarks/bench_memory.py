@@ -0,0 +1,68 @@
+"""Measure memory used per source object with tracemalloc
+
+Usage: ``python -m benchmarks.bench_memory [--languages N] [--projects N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, CoreSourceCategories, categorize_sources
+from glotter_core.testinfo import clear_intern_cache, get_intern_cache_stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=500, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(tmp_dir, num_languages=args.languages, num_projects=args.projects)
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+            print(f"{args.languages} languages, {args.projects} projects")
+            print(f"{'mode':6} {'sources':>8} {'bytes/source':>13} {'dedup ratio':>12}")
+            for lazy in [False, True]:
+                # Warm up caches (compiled templates, project names) so that only the
+                # categorized sources are measured
+                categorize_sources(settings.source_root, settings.projects, CoreSource, lazy)
+                clear_intern_cache()
+                num_sources, num_bytes = _measure(settings, lazy)
+                mode = "lazy" if lazy else "eager"
+                dedup_ratio = get_intern_cache_stats().hit_ratio
+                print(
+                    f"{mode:6} {num_sources:8} {num_bytes / num_sources:13.1f} {dedup_ratio:12.3f}"
+                )
+        finally:
+            os.chdir(orig_cwd)
+
+
+def _measure(settings: CoreSettings, lazy: bool) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return _count_sources(categories), after - before
+
+
+def _count_sources(categories: CoreSourceCategories) -> int:
+    return sum(len(language.sources) for language in categories.by_language.values())
+
+
+if __name__ == "__main__":
+    main()
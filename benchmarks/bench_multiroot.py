@@ -0,0 +1,85 @@
+"""Time categorizing several forks of a synthetic tree one at a time and merged
+
+Usage: ``python -m benchmarks.bench_multiroot [--languages N] [--projects N] [--forks N]
+[--changed-ratio R]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.multiroot import categorize_roots
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument("--forks", type=int, default=2, help="number of forks")
+    parser.add_argument(
+        "--changed-ratio",
+        type=float,
+        default=0.05,
+        help="fraction of language directories that each fork changes",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            Path(tmp_dir, "tree"), num_languages=args.languages, num_projects=args.projects
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+        finally:
+            os.chdir(orig_cwd)
+
+        source_root = Path(settings.source_root)
+        source_roots = [str(source_root)]
+        rng = random.Random(0)
+        for fork in range(args.forks):
+            fork_root = Path(tmp_dir, f"fork-{fork}")
+            shutil.copytree(source_root, fork_root)
+            directories = sorted(
+                directory
+                for directory, _, files in os.walk(fork_root)
+                if "testinfo.yml" in files or "untestable.yml" in files
+            )
+            for directory in rng.sample(directories, int(len(directories) * args.changed_ratio)):
+                Path(directory, "README.md").write_text(f"fork {fork}\n", encoding="utf-8")
+
+            source_roots.insert(0, str(fork_root))
+
+        # Categorize merged first, so that it does not benefit from warm caches
+        start = time.perf_counter()
+        categories = categorize_roots(
+            [(path, settings.projects) for path in source_roots], CoreSource
+        )
+        merged_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for path in source_roots:
+            categorize_sources(path, settings.projects, CoreSource)
+
+        serial_time = time.perf_counter() - start
+
+        print(
+            f"{args.languages} languages, {args.projects} projects, {len(source_roots)} roots, "
+            f"{args.changed_ratio:.0%} of directories changed per fork"
+        )
+        print(f"{'one at a time':>14} {serial_time:8.3f}s")
+        print(f"{'merged':>14} {merged_time:8.3f}s {serial_time / merged_time:7.2f}x")
+        print(f"{'duplicates':>14} {len(categories.duplicate_directories):9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Compare serial and process-pool categorization of a synthetic tree
+
+Usage: ``python -m benchmarks.bench_parallel [--languages N] [--jobs N ...]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1], help="jobs"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(tmp_dir, num_languages=args.languages, num_projects=args.projects)
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+        finally:
+            os.chdir(orig_cwd)
+
+        print(f"{args.languages} languages, {args.projects} projects, {os.cpu_count()} CPUs")
+        baseline = None
+        for jobs in sorted(set(args.jobs)):
+            elapsed = min(
+                _time_categorize(settings.source_root, settings.projects, jobs)
+                for _ in range(args.repeat)
+            )
+            baseline = baseline or elapsed
+            print(f"jobs={jobs:<3} {elapsed:8.3f}s  speedup {baseline / elapsed:5.2f}x")
+
+
+def _time_categorize(source_root: str | Path, projects: dict, jobs: int) -> float:
+    start = time.perf_counter()
+    categorize_sources(str(source_root), projects, CoreSource, jobs=jobs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare CoreSettings() construction from YAML, from a snapshot, and from memory
+
+Usage: ``python -m benchmarks.bench_settings [--projects N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Optional
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings, clear_settings_cache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500, help="number of projects")
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(tmp_dir, num_languages=1, num_projects=args.projects)
+        snapshot_dir = os.path.join(tmp_dir, "snapshots")
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            parse = _time(_construct_uncached, args.repeat)
+            CoreSettings(snapshot=True, snapshot_dir=snapshot_dir)
+            snapshot = _time(lambda: _construct_uncached(snapshot_dir), args.repeat)
+            CoreSettings()
+            memo = _time(CoreSettings, args.repeat)
+        finally:
+            os.chdir(orig_cwd)
+
+    print(f"{args.projects} projects")
+    print(f"yaml     {parse * 1000:8.3f}ms")
+    print(f"snapshot {snapshot * 1000:8.3f}ms  speedup {parse / snapshot:7.1f}x")
+    print(f"memory   {memo * 1000:8.3f}ms  speedup {parse / memo:7.1f}x")
+
+
+def _construct_uncached(snapshot_dir: Optional[str] = None) -> CoreSettings:
+    clear_settings_cache()
+    return CoreSettings(snapshot=snapshot_dir is not None, snapshot_dir=snapshot_dir)
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare the old full-walk .glotter.yml discovery with the bounded, pruned search
+
+The synthetic tree has a large ``.git`` directory, a large ``node_modules`` directory,
+and a large archive, with ``.glotter.yml`` one level below the root (``nested``) or
+missing entirely (``missing``).
+
+Usage: ``python -m benchmarks.bench_settings_discovery [--files N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Callable
+
+from glotter_core.settings import CoreSettingsParser
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000, help="files per large directory")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(tmp_dir)
+        for name in (".git/objects", "node_modules", "archive"):
+            _make_files(root / name, args.files)
+
+        print(f"{args.files} files in each of .git, node_modules, and archive")
+        for case in ("nested", "missing"):
+            yml_path = root / "project" / ".glotter.yml"
+            if case == "nested":
+                yml_path.parent.mkdir(exist_ok=True)
+                yml_path.write_text("projects: {}\n", encoding="utf-8")
+            else:
+                yml_path.unlink(missing_ok=True)
+
+            full_walk = _time(lambda: _locate_with_full_walk(str(root)), args.repeat)
+            pruned = _time(lambda: _locate_with_parser(str(root)), args.repeat)
+            print(
+                f"{case:8} full walk {full_walk * 1000:9.2f}ms  "
+                f"pruned {pruned * 1000:8.2f}ms  speedup {full_walk / pruned:8.1f}x"
+            )
+
+
+def _make_files(directory: Path, num_files: int) -> None:
+    for n in range(num_files):
+        subdir = directory / f"d{n // 100}"
+        subdir.mkdir(parents=True, exist_ok=True)
+        (subdir / f"f{n}").touch()
+
+
+def _locate_with_full_walk(project_root: str) -> str | None:
+    for root, _, files in os.walk(project_root):
+        if ".glotter.yml" in files:
+            return str((Path(root) / ".glotter.yml").resolve())
+
+    return None
+
+
+def _locate_with_parser(project_root: str) -> str | None:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return CoreSettingsParser(project_root).yml_path
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Time categorizing one shard of a synthetic tree for several numbers of shards
+
+Usage: ``python -m benchmarks.bench_shard [--languages N] [--projects N] [--shards N,N,...]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument("--shards", default="1,2,4,8", help="comma-separated numbers of shards")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            Path(tmp_dir, "tree"), num_languages=args.languages, num_projects=args.projects
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+        finally:
+            os.chdir(orig_cwd)
+
+        print(f"{args.languages} languages, {args.projects} projects")
+        print(f"{'shards':>6} {'slowest shard':>14} {'speedup':>8} {'languages':>10}")
+        baseline = None
+        for num_shards in [int(num_shards) for num_shards in args.shards.split(",")]:
+            elapsed = []
+            num_languages = []
+            for shard in range(num_shards):
+                start = time.perf_counter()
+                categories = categorize_sources(
+                    settings.source_root,
+                    settings.projects,
+                    CoreSource,
+                    shard=shard,
+                    num_shards=num_shards,
+                )
+                elapsed.append(time.perf_counter() - start)
+                num_languages.append(len(categories.by_language))
+
+            slowest = max(elapsed)
+            baseline = baseline or slowest
+            languages = f"{min(num_languages)}-{max(num_languages)}"
+            print(f"{num_shards:6} {slowest:13.3f}s {baseline / slowest:7.2f}x {languages:>10}")
+
+
+if __name__ == "__main__":
+    main()
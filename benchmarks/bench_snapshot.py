@@ -0,0 +1,66 @@
+"""Compare categorizing a synthetic tree against loading a saved snapshot of it
+
+Usage: ``python -m benchmarks.bench_snapshot [--languages N] [--projects N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings
+from glotter_core.snapshot import SourceSnapshot, is_snapshot_stale, load_snapshot, save_snapshot
+from glotter_core.source import CoreSource, categorize_sources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=1000, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            Path(tmp_dir, "tree"), num_languages=args.languages, num_projects=args.projects
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = CoreSettings()
+        finally:
+            os.chdir(orig_cwd)
+
+        snapshot_path = Path(tmp_dir, "categories.snapshot")
+        print(f"{args.languages} languages, {args.projects} projects")
+        start = time.perf_counter()
+        categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+        categorize = time.perf_counter() - start
+        print(f"categorize   {categorize:8.3f}s")
+
+        start = time.perf_counter()
+        save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+        print(f"save         {time.perf_counter() - start:8.3f}s")
+        print(f"size         {snapshot_path.stat().st_size / 1024:8.1f}KiB")
+
+        start = time.perf_counter()
+        load_snapshot(snapshot_path)
+        load = time.perf_counter() - start
+        print(f"load         {load:8.3f}s  speedup {categorize / load:6.2f}x")
+
+        start = time.perf_counter()
+        with SourceSnapshot(snapshot_path) as snapshot:
+            snapshot.get_language(snapshot.languages[0]).sources
+        attach = time.perf_counter() - start
+        print(f"attach + 1   {attach:8.3f}s  speedup {categorize / attach:6.2f}x")
+
+        start = time.perf_counter()
+        is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+        print(f"stale check  {time.perf_counter() - start:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
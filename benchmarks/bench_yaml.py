@@ -0,0 +1,75 @@
+"""Compare the libyaml and pure-Python YAML backends
+
+Usage: ``python -m benchmarks.bench_yaml [--languages N] [--projects N]``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.synthetic import generate_tree
+from glotter_core.settings import CoreSettings, clear_settings_cache
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.yml import get_available_yaml_backends, load_yaml, set_yaml_backend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=200, help="number of languages")
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(tmp_dir, num_languages=args.languages, num_projects=args.projects)
+        glotter_yml = (root / ".glotter.yml").read_text(encoding="utf-8")
+        test_info = next(Path(root).glob("archive/*/*/testinfo.yml")).read_text(encoding="utf-8")
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            print(f"{args.languages} languages, {args.projects} projects")
+            print(f"{'backend':8} {'.glotter.yml':>14} {'testinfo.yml':>14} {'categorize':>12}")
+            for backend in get_available_yaml_backends():
+                set_yaml_backend(backend)
+                settings = _construct_settings()
+                times = [
+                    _time(lambda: load_yaml(glotter_yml), args.repeat * 10),
+                    _time(lambda: load_yaml(test_info), args.repeat * 100),
+                    _time(
+                        lambda s=settings: categorize_sources(
+                            s.source_root, s.projects, CoreSource
+                        ),
+                        args.repeat,
+                    ),
+                ]
+                print(
+                    f"{backend:8} {times[0] * 1000:12.3f}ms {times[1] * 1000:12.3f}ms "
+                    f"{times[2]:11.3f}s"
+                )
+        finally:
+            os.chdir(orig_cwd)
+            set_yaml_backend()
+
+
+def _construct_settings() -> CoreSettings:
+    clear_settings_cache()
+    return CoreSettings()
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+if __name__ == "__main__":
+    main()
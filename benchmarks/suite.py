@@ -0,0 +1,203 @@
+"""Time the main operations at several archive sizes and compare against a baseline
+
+Usage: ``python -m benchmarks.suite [--sizes N,N,...] [--output FILE] [--baseline FILE]``
+
+Results are written as JSON. When a baseline file (a previous output) is given, each
+timing is compared against it, and the exit status is 1 if any timing is slower than
+the baseline by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.synthetic import NAMING_SCHEMES, generate_tree
+from glotter_core.settings import CoreSettings, clear_settings_cache
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.testinfo import TestInfo, get_test_info_template
+
+DEFAULT_SIZES = "100,500,1000"
+DEFAULT_THRESHOLD = 0.2
+
+
+def main() -> None:
+    args = _parse_args()
+    knobs = {
+        "projects": args.projects,
+        "files_per_directory": args.files_per_directory,
+        "naming_schemes": args.naming_schemes.split(","),
+        "untestable_ratio": args.untestable_ratio,
+        "template_complexity": args.template_complexity,
+        "repeat": args.repeat,
+    }
+    results = {
+        "metadata": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **knobs,
+        },
+        "results": {},
+    }
+    for size in [int(size) for size in args.sizes.split(",")]:
+        results["results"][str(size)] = _run(size, knobs)
+        print(f"{size} languages: " + ", ".join(_format(results["results"][str(size)])))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        for name, value in knobs.items():
+            if baseline["metadata"].get(name) != value:
+                print(
+                    f"warning: baseline {name} is {baseline['metadata'].get(name)!r}, not {value!r}"
+                )
+
+        regressions = _compare(baseline["results"], results["results"], args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="comma-separated numbers of languages"
+    )
+    parser.add_argument("--projects", type=int, default=50, help="number of projects")
+    parser.add_argument(
+        "--files-per-directory",
+        type=int,
+        default=None,
+        help="number of project source files per language (default: about 80%% of projects)",
+    )
+    parser.add_argument(
+        "--naming-schemes",
+        default=",".join(NAMING_SCHEMES),
+        help="comma-separated naming schemes that languages cycle through",
+    )
+    parser.add_argument(
+        "--untestable-ratio",
+        type=float,
+        default=0.1,
+        help="fraction of languages with untestable.yml",
+    )
+    parser.add_argument(
+        "--template-complexity", type=int, default=1, help="testinfo.yml template complexity"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed runs")
+    parser.add_argument("--output", help="file to write JSON results to")
+    parser.add_argument("--baseline", help="JSON results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown relative to the baseline (0.2 means 20%%)",
+    )
+    return parser.parse_args()
+
+
+def _run(size: int, knobs: dict[str, Any]) -> dict[str, float]:
+    repeat = knobs["repeat"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = generate_tree(
+            tmp_dir,
+            num_languages=size,
+            num_projects=knobs["projects"],
+            files_per_directory=knobs["files_per_directory"],
+            naming_schemes=knobs["naming_schemes"],
+            untestable_ratio=knobs["untestable_ratio"],
+            template_complexity=knobs["template_complexity"],
+        )
+        orig_cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            settings = _construct_settings()
+            timings = {"settings": _time(_construct_settings, repeat)}
+        finally:
+            os.chdir(orig_cwd)
+
+        categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+        timings["categorize_sources"] = _time(
+            lambda: categorize_sources(settings.source_root, settings.projects, CoreSource),
+            repeat,
+        )
+
+        language_info = next(
+            info
+            for info in categories.by_language.values()
+            if info.test_info_path.name == "testinfo.yml"
+        )
+        test_info_string = language_info.test_info_path.read_text(encoding="utf-8")
+        sources = language_info.sources
+        timings["test_info_from_string"] = _time(
+            lambda: [TestInfo.from_string(test_info_string, source) for source in sources],
+            repeat * 10,
+        ) / len(sources)
+        template = get_test_info_template(test_info_string)
+        timings["test_info_template_render"] = _time(
+            lambda: [template.render(source) for source in sources],
+            repeat * 10,
+        ) / len(sources)
+
+        folder_infos = [info.test_info.file_info for info in categories.by_language.values()]
+        timings["get_project_mappings"] = _time(
+            lambda: [info.get_project_mappings(settings.projects) for info in folder_infos],
+            repeat * 10,
+        ) / len(folder_infos)
+
+    return timings
+
+
+def _construct_settings() -> CoreSettings:
+    clear_settings_cache()
+    return CoreSettings()
+
+
+def _time(func: Callable[[], object], repeat: int) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+
+    return min(elapsed)
+
+
+def _format(timings: dict[str, float]) -> list[str]:
+    return [f"{name} {seconds * 1000:.3f}ms" for name, seconds in timings.items()]
+
+
+def _compare(
+    baseline: dict[str, dict[str, float]], results: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    regressions = []
+    print(f"{'size':>6} {'operation':26} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for size, timings in results.items():
+        for name, seconds in timings.items():
+            baseline_seconds = baseline.get(size, {}).get(name)
+            if not baseline_seconds:
+                continue
+
+            ratio = seconds / baseline_seconds
+            status = ""
+            if ratio > 1 + threshold:
+                status = "REGRESSION"
+                regressions.append(f"{size}/{name}")
+
+            print(
+                f"{size:>6} {name:26} {baseline_seconds * 1000:10.3f}ms "
+                f"{seconds * 1000:10.3f}ms {ratio:7.2f} {status}"
+            )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
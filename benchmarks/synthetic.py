@@ -0,0 +1,177 @@
+"""Deterministic generator for sample-programs-shaped source trees"""
+
+from __future__ import annotations
+
+import random
+import string
+from pathlib import Path
+from typing import Optional, Sequence
+
+import yaml
+
+from glotter_core.project import CoreProject
+
+PROJECT_WORDS = [
+    "hello",
+    "world",
+    "fizz",
+    "buzz",
+    "reverse",
+    "string",
+    "binary",
+    "search",
+    "quick",
+    "sort",
+    "merge",
+    "prime",
+    "number",
+    "even",
+    "odd",
+    "file",
+    "input",
+    "output",
+    "longest",
+    "word",
+]
+NAMING_SCHEMES = ["hyphen", "underscore", "camel", "pascal", "lower"]
+CONTAINER_TEMPLATES = [
+    # 0: no templating
+    """\
+  build: "build main"
+  cmd: "run main"
+""",
+    # 1: variable substitution
+    """\
+  build: "build {{ source.name }}{{ source.extension }}"
+  cmd: "run {{ source.name }}"
+""",
+    # 2: filters and conditionals
+    """\
+  build: "build {{ source.name | lower }}{{ source.extension }}"
+  cmd: "{% if source.extension.endswith('0') %}exec{% else %}run{% endif %} \
+{{ source.name | replace('-', '_') }}"
+""",
+]
+# testinfo.yml must also be valid YAML before it is rendered, so the loop is kept
+# inside a quoted string
+NOTES_TEMPLATE = """\
+notes:
+  - "{% for i in range(NUM_NOTES) %}step {{ i }} of {{ source.name }}. {% endfor %}"
+"""
+
+
+def make_test_info(
+    extension: str, naming: str, image: str, tag: str, template_complexity: int = 1
+) -> str:
+    """
+    Make the contents of a ``testinfo.yml`` file
+
+    :param extension: source file extension
+    :param naming: naming scheme
+    :param image: container image
+    :param tag: container tag
+    :param template_complexity: 0 for no templating, 1 for variable substitution, 2 for
+        filters and conditionals, and 3 or more to also add a note produced by a
+        templated loop with that many iterations
+    :return: contents of ``testinfo.yml``
+    """
+
+    container_template = CONTAINER_TEMPLATES[min(template_complexity, len(CONTAINER_TEMPLATES) - 1)]
+    test_info = (
+        f'folder:\n  extension: "{extension}"\n  naming: "{naming}"\n\n'
+        f'container:\n  image: "{image}"\n  tag: "{tag}"\n{container_template}'
+    )
+    if template_complexity >= len(CONTAINER_TEMPLATES):
+        test_info += NOTES_TEMPLATE.replace("NUM_NOTES", str(template_complexity))
+
+    return test_info
+
+
+def make_projects(num_projects: int, seed: int = 0) -> dict[str, dict[str, list[str]]]:
+    """
+    Make a deterministic set of project definitions
+
+    :param num_projects: number of projects
+    :param seed: random seed
+    :return: dictionary whose key is the project name and whose value is the project
+        definition as it would appear in ``.glotter.yml``
+    """
+
+    rng = random.Random(seed)
+    projects = {}
+    while len(projects) < num_projects:
+        words = [*rng.sample(PROJECT_WORDS, rng.randint(1, 3)), str(len(projects))]
+        projects["".join(words)] = {"words": words}
+
+    return projects
+
+
+def generate_tree(  # noqa: PLR0913
+    root: str | Path,
+    num_languages: int = 1000,
+    num_projects: int = 50,
+    seed: int = 0,
+    *,
+    files_per_directory: Optional[int] = None,
+    naming_schemes: Sequence[str] = NAMING_SCHEMES,
+    untestable_ratio: float = 0.0,
+    template_complexity: int = 1,
+) -> Path:
+    """
+    Generate a sample-programs-shaped tree: a ``.glotter.yml`` at the root and one
+    directory per language under ``archive/<letter>/<language>`` containing a
+    ``testinfo.yml`` or ``untestable.yml`` file, source files for projects, and an
+    occasional bad source file
+
+    :param root: directory to generate the tree in
+    :param num_languages: number of language directories
+    :param num_projects: number of projects
+    :param seed: random seed
+    :param files_per_directory: number of project source files in each directory.
+        Default is about 80% of the projects
+    :param naming_schemes: naming schemes that the languages cycle through
+    :param untestable_ratio: fraction of languages that have an ``untestable.yml``
+        file instead of a ``testinfo.yml`` file
+    :param template_complexity: complexity of the templates in ``testinfo.yml`` files.
+        See :func:`make_test_info`
+    :return: root of the tree
+    """
+
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    project_items = make_projects(num_projects, seed)
+    glotter_yml = {"settings": {"source_root": "archive"}, "projects": project_items}
+    (root / ".glotter.yml").write_text(yaml.safe_dump(glotter_yml), encoding="utf-8")
+
+    projects = [CoreProject(project) for project in project_items.values()]
+    for n in range(num_languages):
+        letter = string.ascii_lowercase[n % len(string.ascii_lowercase)]
+        language = f"{letter}lang-{n}"
+        naming = naming_schemes[n % len(naming_schemes)]
+        extension = f".{letter}{n % 7}"
+        language_dir = root / "archive" / letter / language
+        language_dir.mkdir(parents=True, exist_ok=True)
+        if rng.random() < untestable_ratio:
+            (language_dir / "untestable.yml").write_text(
+                f'- reason: "{language} cannot be tested"\n', encoding="utf-8"
+            )
+        else:
+            test_info = make_test_info(
+                extension, naming, f"image{n % 10}", f"{n % 3}.0", template_complexity
+            )
+            (language_dir / "testinfo.yml").write_text(test_info, encoding="utf-8")
+
+        if files_per_directory is None:
+            language_projects = [project for project in projects if rng.random() < 0.8]
+        else:
+            language_projects = rng.sample(projects, min(files_per_directory, len(projects)))
+
+        for project in language_projects:
+            filename = project.get_project_name_by_scheme(naming) + extension
+            (language_dir / filename).write_text("source\n", encoding="utf-8")
+
+        if rng.random() < 0.1:
+            (language_dir / f"junk{extension}").write_text("junk\n", encoding="utf-8")
+
+    return root
@@ -0,0 +1,203 @@
+"""Asynchronous source categorization"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from typing import AsyncIterator, Iterator, Mapping, Optional, Union
+
+from glotter_core.project import CoreProjectMixin
+from glotter_core.shard import _make_shard_options
+from glotter_core.source import (
+    BadSourceFound,
+    CoreSourceCategories,
+    LanguageFound,
+    SourceFound,
+    _CategorizeOptions,
+    _DirectoryResult,
+    _find_shard_directories,
+    _get_directory_categorizer,
+    _iter_found,
+    _make_options,
+    _merge_directory_results,
+)
+
+DEFAULT_CONCURRENCY = 8
+
+
+async def categorize_sources_async(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    lazy: bool = False,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    executor: Optional[Executor] = None,
+    cache_dir: Optional[str] = None,
+    shard: int = 0,
+    num_shards: int = 1,
+    shard_costs: Optional[Mapping[str, float]] = None,
+) -> CoreSourceCategories:
+    """
+    Categorize sources without blocking the event loop. The result is the same as
+    :func:`glotter_core.source.categorize_sources`
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :param concurrency: maximum number of directories that are categorized at the
+        same time
+    :param executor: optional executor used to search for directories and categorize
+        them. Default is a thread pool with ``concurrency`` threads that is shut down
+        when done
+    :param cache_dir: optional directory in which to cache the result for each
+        language directory
+    :param shard: which shard of the language directories to categorize
+    :param num_shards: number of shards to split the language directories into (see
+        :func:`glotter_core.source.categorize_sources`)
+    :param shard_costs: optional dictionary of recorded costs used to balance the
+        shards
+    :return: CoreSourceCategories object containing information of the source
+        categories
+    :raises: :exc:`ValueError` if ``concurrency`` is less than 1, ``num_shards`` is
+        less than 1, or ``shard`` is out of range
+    """
+
+    options = _make_options(path, projects, source_cls, lazy, cache_dir)
+    shard_options = _make_shard_options(shard, num_shards, shard_costs)
+    results = [
+        result
+        async for result in _aiter_directory_results(
+            _find_shard_directories(path, shard_options),
+            options,
+            concurrency,
+            executor,
+            ordered=True,
+        )
+    ]
+    return _merge_directory_results(results, projects)
+
+
+async def aiter_sources(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    lazy: bool = False,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    executor: Optional[Executor] = None,
+    cache_dir: Optional[str] = None,
+    shard: int = 0,
+    num_shards: int = 1,
+    shard_costs: Optional[Mapping[str, float]] = None,
+) -> AsyncIterator[Union[SourceFound, BadSourceFound, LanguageFound]]:
+    """
+    Asynchronously generate sources as each directory is categorized. The objects
+    are the same as the ones produced by :func:`glotter_core.source.iter_sources`,
+    but directories are produced in the order that they finish
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :param concurrency: maximum number of directories that are categorized at the
+        same time
+    :param executor: optional executor used to search for directories and categorize
+        them. Default is a thread pool with ``concurrency`` threads that is shut down
+        when done
+    :param cache_dir: optional directory in which to cache the result for each
+        language directory
+    :param shard: which shard of the language directories to categorize
+    :param num_shards: number of shards to split the language directories into (see
+        :func:`glotter_core.source.categorize_sources`)
+    :param shard_costs: optional dictionary of recorded costs used to balance the
+        shards
+    :return: asynchronous generator of SourceFound, BadSourceFound, and LanguageFound
+        objects
+    :raises: :exc:`ValueError` if ``concurrency`` is less than 1, ``num_shards`` is
+        less than 1, or ``shard`` is out of range
+    """
+
+    options = _make_options(path, projects, source_cls, lazy, cache_dir)
+    shard_options = _make_shard_options(shard, num_shards, shard_costs)
+    async for result in _aiter_directory_results(
+        _find_shard_directories(path, shard_options),
+        options,
+        concurrency,
+        executor,
+        ordered=False,
+    ):
+        for event in _iter_found([result]):
+            yield event
+
+
+async def _aiter_directory_results(
+    directories: Iterator[tuple[str, list[str]]],
+    options: _CategorizeOptions,
+    concurrency: int,
+    executor: Optional[Executor],
+    ordered: bool,
+) -> AsyncIterator[_DirectoryResult]:
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    loop = asyncio.get_running_loop()
+    owned_executor = None
+    if executor is None:
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        executor = owned_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    categorize_directory = _get_directory_categorizer(options)
+    pending: deque[asyncio.Future] = deque()
+    found_all = False
+    try:
+        while True:
+            # Keep up to "concurrency" directories in flight, searching for more
+            # directories in the executor so that os.walk does not block the loop
+            num_wanted = concurrency - len(pending)
+            if not found_all and num_wanted > 0:
+                batch = await loop.run_in_executor(executor, _take, directories, num_wanted)
+                found_all = len(batch) < num_wanted
+                pending.extend(
+                    loop.run_in_executor(executor, categorize_directory, root, files)
+                    for root, files in batch
+                )
+
+            if not pending:
+                break
+
+            for future in await _pop_done(pending, ordered):
+                result = future.result()
+                if result is not None:
+                    yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _pop_done(pending: deque[asyncio.Future], ordered: bool) -> list[asyncio.Future]:
+    if ordered:
+        await asyncio.wait([pending[0]])
+        return [pending.popleft()]
+
+    await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    done = [future for future in pending if future.done()]
+    for future in done:
+        pending.remove(future)
+
+    return done
+
+
+def _take(directories: Iterator[tuple[str, list[str]]], count: int) -> list[tuple[str, list[str]]]:
+    return [directory for _, directory in zip(range(count), directories)]
+
+
+__all__ = ["DEFAULT_CONCURRENCY", "aiter_sources", "categorize_sources_async"]
@@ -0,0 +1,249 @@
+"""Caching utilities"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Statistics for a cache
+
+    :ivar hits: number of lookups that found an entry
+    :ivar misses: number of lookups that had to create an entry
+    :ivar size: number of entries currently in the cache
+    :ivar maxsize: maximum number of entries. ``None`` means unbounded
+    """
+
+    hits: int = 0
+    misses: int = 0
+    size: int = 0
+    maxsize: Optional[int] = None
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Get fraction of lookups that were hits
+
+        :return: Hit ratio. 0.0 if there were no lookups
+        """
+
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """Thread-safe, least-recently-used cache with hit and miss counters
+
+    :param maxsize: maximum number of entries. ``None`` means unbounded
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get the entry for a key. If there is no entry, create it with the factory and
+        store it, evicting the least recently used entry if the cache is full
+
+        :param key: key of entry
+        :param factory: function to call to create the entry
+        :return: entry for key
+        """
+
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return value
+
+        # Create outside of the lock so that a slow factory does not block other threads
+        value = factory()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if self._maxsize is not None:
+                while len(self._entries) > self._maxsize:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def resize(self, maxsize: Optional[int]) -> None:
+        """
+        Change the maximum number of entries, evicting least recently used entries if
+        needed
+
+        :param maxsize: maximum number of entries. ``None`` means unbounded
+        """
+
+        with self._lock:
+            self._maxsize = maxsize
+            if maxsize is not None:
+                while len(self._entries) > maxsize:
+                    self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit and miss counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Get cache statistics
+
+        :return: CacheStats object
+        """
+
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                size=len(self._entries),
+                maxsize=self._maxsize,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+
+def atomic_write_bytes(path: str | Path, data: bytes) -> None:
+    """
+    Write a file atomically. The data is written to a temporary file in the same
+    directory, which is then renamed, so readers see either the old or the new contents
+
+    :param path: path to file
+    :param data: contents of file
+    """
+
+    import tempfile  # noqa: PLC0415
+
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+class DiskCache:
+    """Pickle-based on-disk cache. Each entry is stored in its own file, and entries
+    are written atomically (written to a temporary file and then renamed), so several
+    processes can safely share one cache directory.
+
+    Entries are loaded with :mod:`pickle`, so the cache directory must only be
+    writable by trusted users.
+
+    :param cache_dir: directory to store entries in. It is created if it does not exist
+    """
+
+    SUFFIX = ".pickle"
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get the entry for a key
+
+        :param key: key of entry. It must be usable as a filename (e.g., a hex digest)
+        :param default: value to return if there is no entry or the entry cannot be
+            loaded
+        :return: entry for key
+        """
+
+        import pickle  # noqa: PLC0415
+
+        try:
+            with self._path(key).open("rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            with self._lock:
+                self._misses += 1
+
+            return default
+
+        with self._lock:
+            self._hits += 1
+
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store the entry for a key atomically. The cache directory is created again if
+        it was removed. If the entry cannot be written (e.g., the disk is full), it is
+        not stored, and later lookups miss
+
+        :param key: key of entry. It must be usable as a filename (e.g., a hex digest)
+        :param value: picklable entry
+        """
+
+        import pickle  # noqa: PLC0415
+
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            try:
+                atomic_write_bytes(self._path(key), data)
+            except FileNotFoundError:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                atomic_write_bytes(self._path(key), data)
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit and miss counters"""
+
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Get cache statistics for lookups made through this object
+
+        :return: CacheStats object
+        """
+
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                size=len(list(self.cache_dir.glob(f"*{self.SUFFIX}"))),
+            )
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+
+__all__ = ["CacheStats", "DiskCache", "LRUCache", "atomic_write_bytes"]
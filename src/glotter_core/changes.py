@@ -0,0 +1,162 @@
+"""Find the sources that are affected by a set of changed files"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .project import CoreProjectMixin
+from .source import (
+    CoreLanguage,
+    CoreSource,
+    SourceFound,
+    _categorize_directory,
+    _CategorizeOptions,
+    _make_options,
+)
+from .trace import DIRECTORY, Tracer, trace_span, tracing
+
+SETTINGS_FILENAME = ".glotter.yml"
+
+_TEST_INFO_FILENAMES = ("testinfo.yml", "untestable.yml")
+
+
+@dataclass
+class AffectedSources:
+    """
+    Sources that are affected by a set of changed files
+
+    :ivar sources: list of :class:`~glotter_core.source.SourceFound` objects, one for
+        each source that changed. If a directory's ``testinfo.yml`` or
+        ``untestable.yml`` file changed, every source in the directory is included
+    :ivar languages: dictionary whose key is the language and whose value is a
+        CoreLanguage object, for each language directory that has a changed file
+    :ivar bad_sources: list of filenames that changed and do not belong to a project.
+        If a directory's ``testinfo.yml`` or ``untestable.yml`` file changed, every
+        file in the directory that does not belong to a project is included
+    :ivar full_rebuild: whether the settings file (``.glotter.yml``) changed. If so,
+        the projects may have changed too, so nothing else is found and all sources
+        need to be categorized again
+    """
+
+    sources: list[SourceFound] = field(default_factory=list)
+    languages: dict[str, CoreLanguage] = field(default_factory=dict)
+    bad_sources: list[str] = field(default_factory=list)
+    full_rebuild: bool = False
+
+    @property
+    def testable_sources(self) -> list[CoreSource]:
+        """Returns the affected sources that are testable"""
+        return [found.source for found in self.sources if found.is_testable]
+
+
+def find_affected_sources(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    changed_paths: Iterable[str],
+    *,
+    base_dir: Optional[str] = None,
+    lazy: bool = False,
+    tracer: Optional[Tracer] = None,
+) -> AffectedSources:
+    """
+    Find the sources that are affected by a set of changed files (e.g., from
+    ``git diff --name-only``) without categorizing the whole source directory. Only
+    the directories that contain a changed file are listed, and only their
+    ``testinfo.yml`` or ``untestable.yml`` files are read, so the cost depends on
+    the number of changed files instead of the number of languages
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param changed_paths: paths to the changed files, relative to ``base_dir`` or
+        absolute. Deleted files can be included. Files outside of the source directory
+        are ignored, except for the settings file
+    :param base_dir: directory that the changed paths are relative to. Default is the
+        current directory, which is where ``git diff`` reports paths from when run at
+        the top of the repository
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :param tracer: optional :class:`~glotter_core.trace.Tracer` that times each phase
+        and each directory. Default is the tracer enabled with
+        :func:`~glotter_core.trace.tracing`, if any
+    :return: AffectedSources object
+    """
+
+    with tracing(tracer), trace_span("find_affected_sources", path=path):
+        options = _make_options(path, projects, source_cls, lazy, None)
+        changed_by_directory = _group_changed_paths(
+            Path(base_dir or os.getcwd()), changed_paths, options.orig_path
+        )
+        affected = AffectedSources()
+        if changed_by_directory is None:
+            affected.full_rebuild = True
+        else:
+            for directory, filenames in sorted(changed_by_directory.items()):
+                _add_affected_directory(affected, directory, filenames, options)
+
+    return affected
+
+
+def _group_changed_paths(
+    base_dir: Path, changed_paths: Iterable[str], orig_path: Path
+) -> Optional[dict[Path, set[str]]]:
+    # Returns None if the settings file changed
+    changed_by_directory: dict[Path, set[str]] = {}
+    for changed_path in changed_paths:
+        full_path = Path(base_dir, changed_path)
+        if full_path.name == SETTINGS_FILENAME:
+            return None
+
+        directory = full_path.parent.resolve()
+        if directory.is_relative_to(orig_path):
+            changed_by_directory.setdefault(directory, set()).add(full_path.name)
+
+    return changed_by_directory
+
+
+def _add_affected_directory(
+    affected: AffectedSources, directory: Path, filenames: set[str], options: _CategorizeOptions
+) -> None:
+    with trace_span("list"):
+        files = _list_files(directory)
+
+    if not any(filename in files for filename in _TEST_INFO_FILENAMES):
+        return
+
+    with trace_span("directory", DIRECTORY, path=str(directory)):
+        result = _categorize_directory(str(directory), files, options)
+
+    if result is None:
+        return
+
+    # A changed testinfo.yml or untestable.yml file affects every file in the directory
+    all_affected = any(filename in filenames for filename in _TEST_INFO_FILENAMES)
+    testable_ids = {id(source) for source in result.testable_sources}
+    affected.sources += [
+        SourceFound(source, id(source) in testable_ids)
+        for source in result.language_info.sources
+        if all_affected or source.filename in filenames
+    ]
+    affected.bad_sources += [
+        bad_source
+        for bad_source in result.bad_sources
+        if all_affected or Path(bad_source).name in filenames
+    ]
+    affected.languages[result.language] = result.language_info
+
+
+def _list_files(directory: Path) -> list[str]:
+    # Match the file listing from os.walk
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.name for entry in entries if not entry.is_dir()]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+__all__ = ["SETTINGS_FILENAME", "AffectedSources", "find_affected_sources"]
@@ -0,0 +1,264 @@
+"""Multi-key source index"""
+
+from __future__ import annotations
+
+from typing import Any, Hashable, Iterator, Optional
+
+from glotter_core.source import (
+    CoreLanguage,
+    CoreSource,
+    CoreSourceCategories,
+    _get_unrendered_container_info,
+)
+from glotter_core.testinfo import ContainerInfo
+
+KEYS = ("language", "project_type", "extension", "image", "tag", "testable")
+
+
+class SourceIndex:
+    """Index of sources that supports constant-time lookups by language and project
+    type, full path, extension, container image and tag, and testable flag, as well
+    as queries that combine them
+
+    The container image and tag of a lazy source whose test information has not been
+    rendered are taken from its language's test information when they are not
+    templated, so indexing does not render it.
+
+    :param categories: optional categorized sources to index
+    """
+
+    def __init__(self, categories: Optional[CoreSourceCategories] = None) -> None:
+        self._sources: dict[str, CoreSource] = {}
+        self._keys: dict[str, dict[str, Hashable]] = {}
+        self._buckets: dict[str, dict[Hashable, dict[str, CoreSource]]] = {
+            key: {} for key in (*KEYS, "language_project_type")
+        }
+        self._language_infos: dict[str, CoreLanguage] = {}
+        self._testable_ids: dict[str, frozenset[int]] = {}
+        if categories is not None:
+            self.update(categories)
+
+    def update(self, categories: CoreSourceCategories) -> None:
+        """
+        Make the index match categorized sources. Languages whose CoreLanguage object
+        and testable sources are unchanged (e.g., when the categories are kept up to
+        date by :class:`~glotter_core.watch.SourceWatcher`) are skipped. Otherwise,
+        only the sources that were added, removed, or replaced are re-indexed
+
+        :param categories: CoreSourceCategories object
+        """
+
+        testable_ids = _get_testable_ids_by_language(categories)
+        for language in list(self._language_infos):
+            if language not in categories.by_language:
+                self._remove_language(language)
+
+        for language, language_info in categories.by_language.items():
+            language_testable_ids = testable_ids.get(language, frozenset())
+            if (
+                self._language_infos.get(language) is language_info
+                and self._testable_ids.get(language) == language_testable_ids
+            ):
+                continue
+
+            self._update_language(language, language_info, language_testable_ids)
+
+    def add(
+        self,
+        source: CoreSource,
+        is_testable: bool,
+        container_info: Optional[ContainerInfo] = None,
+    ) -> None:
+        """
+        Add a source to the index, replacing any source with the same full path
+
+        :param source: source object
+        :param is_testable: whether the source is testable
+        :param container_info: container information used for the image and tag.
+            Default is to get it from the source's test information, which renders it
+            if the source is lazy
+        """
+
+        if container_info is None:
+            container_info = source.test_info.container_info
+
+        full_path = source.full_path
+        self.remove(full_path)
+        keys = {
+            "language": source.language,
+            "project_type": source.project_type,
+            "extension": source.extension,
+            "image": container_info.image,
+            "tag": container_info.tag,
+            "testable": is_testable,
+            "language_project_type": (source.language, source.project_type),
+        }
+        self._sources[full_path] = source
+        self._keys[full_path] = keys
+        for key, value in keys.items():
+            self._buckets[key].setdefault(value, {})[full_path] = source
+
+    def remove(self, full_path: str) -> Optional[CoreSource]:
+        """
+        Remove a source from the index
+
+        :param full_path: full path of the source
+        :return: the source object that was removed. ``None`` if there was no source
+            with that path
+        """
+
+        source = self._sources.pop(full_path, None)
+        if source is None:
+            return None
+
+        for key, value in self._keys.pop(full_path).items():
+            bucket = self._buckets[key][value]
+            del bucket[full_path]
+            if not bucket:
+                del self._buckets[key][value]
+
+        return source
+
+    def get(self, language: str, project_type: str) -> Optional[CoreSource]:
+        """
+        Get the source for a language and project type
+
+        :param language: the language
+        :param project_type: the project type
+        :return: source object. ``None`` if there is no source. If there is more than
+            one source, the first one is returned
+        """
+
+        bucket = self._buckets["language_project_type"].get((language, project_type), {})
+        return next(iter(bucket.values()), None)
+
+    def get_by_path(self, full_path: str) -> Optional[CoreSource]:
+        """
+        Get the source with a full path
+
+        :param full_path: full path of the source
+        :return: source object. ``None`` if there is no source
+        """
+
+        return self._sources.get(full_path)
+
+    def find(  # noqa: PLR0913
+        self,
+        *,
+        language: Optional[str] = None,
+        project_type: Optional[str] = None,
+        extension: Optional[str] = None,
+        image: Optional[str] = None,
+        tag: Optional[str] = None,
+        testable: Optional[bool] = None,
+    ) -> list[CoreSource]:
+        """
+        Find the sources that match all of the specified criteria. The time taken is
+        proportional to the number of sources that match the most selective criterion
+
+        :param language: optional language
+        :param project_type: optional project type
+        :param extension: optional extension (e.g., ``.py``)
+        :param image: optional container image
+        :param tag: optional container tag
+        :param testable: optional testable flag
+        :return: list of matching source objects. If no criteria are specified, all
+            sources are returned
+        """
+
+        criteria: dict[str, Any] = {
+            "extension": extension,
+            "image": image,
+            "tag": tag,
+            "testable": testable,
+        }
+        if language is not None and project_type is not None:
+            criteria["language_project_type"] = (language, project_type)
+        else:
+            criteria.update(language=language, project_type=project_type)
+
+        buckets = sorted(
+            (
+                self._buckets[key].get(value, {})
+                for key, value in criteria.items()
+                if value is not None
+            ),
+            key=len,
+        )
+        if not buckets:
+            return list(self._sources.values())
+
+        smallest, *others = buckets
+        return [
+            source
+            for full_path, source in smallest.items()
+            if all(full_path in bucket for bucket in others)
+        ]
+
+    def count_by(self, key: str) -> dict[Hashable, int]:
+        """
+        Count the sources for each value of a key
+
+        :param key: one of :const:`KEYS`
+        :return: dictionary whose key is the value and whose value is the number of
+            sources
+        :raises: :exc:`ValueError` if unknown key
+        """
+
+        if key not in KEYS:
+            raise ValueError(f'Unknown key "{key}"')
+
+        return {value: len(bucket) for value, bucket in self._buckets[key].items()}
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def __contains__(self, full_path: str) -> bool:
+        return full_path in self._sources
+
+    def __iter__(self) -> Iterator[CoreSource]:
+        return iter(list(self._sources.values()))
+
+    def _update_language(
+        self, language: str, language_info: CoreLanguage, testable_ids: frozenset[int]
+    ) -> None:
+        new_sources = {source.full_path: source for source in language_info.sources}
+        old_language_info = self._language_infos.get(language)
+        if old_language_info is not None:
+            for source in old_language_info.sources:
+                if source.full_path not in new_sources:
+                    self.remove(source.full_path)
+
+        for full_path, source in new_sources.items():
+            is_testable = id(source) in testable_ids
+            if self._sources.get(full_path) is source and (
+                self._keys[full_path]["testable"] == is_testable
+            ):
+                continue
+
+            container_info = _get_unrendered_container_info(source, language_info.test_info)
+
+            self.add(source, is_testable, container_info)
+
+        self._language_infos[language] = language_info
+        self._testable_ids[language] = testable_ids
+
+    def _remove_language(self, language: str) -> None:
+        for source in self._language_infos.pop(language).sources:
+            self.remove(source.full_path)
+
+        del self._testable_ids[language]
+
+
+def _get_testable_ids_by_language(
+    categories: CoreSourceCategories,
+) -> dict[str, frozenset[int]]:
+    testable_ids: dict[str, set[int]] = {}
+    for sources in categories.testable_by_project.values():
+        for source in sources:
+            testable_ids.setdefault(source.language, set()).add(id(source))
+
+    return {language: frozenset(ids) for language, ids in testable_ids.items()}
+
+
+__all__ = ["KEYS", "SourceIndex"]
@@ -0,0 +1,302 @@
+"""Categorize sources from several source directories into one merged view"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .aio import DEFAULT_CONCURRENCY
+from .project import CoreProjectMixin
+from .source import (
+    CoreLanguage,
+    CoreSource,
+    CoreSourceCategories,
+    _DirectoryResult,
+    _find_directories,
+    _get_directory_categorizer,
+    _get_projects_digest,
+    _make_options,
+)
+from .testinfo import get_test_info_template
+
+_TEST_INFO_FILENAMES = ("testinfo.yml", "untestable.yml")
+
+
+@dataclass
+class MergedSourceCategories(CoreSourceCategories):
+    """
+    Categories for sources from several source directories. The inherited items
+    contain the merged sources:
+
+    - ``testable_by_project``: dictionary whose key is the project type (from any
+      source directory) and whose value is a list of testable source objects
+    - ``by_language``: dictionary whose key is the language and whose value is a
+      CoreLanguage object. The test information is from the highest priority source
+      directory that has the language, and the sources are the merged sources
+    - ``bad_sources``: list of paths to files that do not belong to a project, from
+      every source directory. Each path includes its source directory
+
+    :ivar source_roots: dictionary whose key is the full path to a merged source and
+        whose value is the source directory that it came from
+    :ivar shadowed_sources: list of source objects that were not merged because a
+        higher priority source directory has a source for the same language and project
+    :ivar duplicate_directories: dictionary whose key is a language directory that was
+        not categorized and whose value is the language directory in a higher priority
+        source directory with the same files, test information, and projects. The
+        sources in a duplicate directory are always shadowed, so they are in
+        ``shadowed_sources``
+    :ivar bad_sources_by_root: dictionary whose key is the source directory and whose
+        value is a list of paths, relative to it, to files that do not belong to a
+        project
+    """
+
+    source_roots: dict[str, str] = field(default_factory=dict)
+    shadowed_sources: list[CoreSource] = field(default_factory=list)
+    duplicate_directories: dict[str, str] = field(default_factory=dict)
+    bad_sources_by_root: dict[str, list[str]] = field(default_factory=dict)
+
+    def get_root(self, source: CoreSource) -> Optional[str]:
+        """
+        Get the source directory that a merged source came from
+
+        :param source: source object
+        :return: source directory. ``None`` if the source is not merged
+        """
+
+        return self.source_roots.get(source.full_path)
+
+
+def categorize_roots(
+    roots: Sequence[tuple[str, dict[str, CoreProjectMixin]]],
+    source_cls: type,
+    lazy: bool = False,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    executor: Optional[Executor] = None,
+) -> MergedSourceCategories:
+    """
+    Categorize sources from several source directories at the same time and merge
+    them. If more than one source directory has a source for the same language and
+    project, the one from the highest priority source directory is used
+
+    Language directories are searched for in every source directory first. A language
+    directory whose file listing, ``testinfo.yml`` or ``untestable.yml`` file, and
+    projects are the same as a language directory in a higher priority source
+    directory (e.g., a fork that did not change it, or a directory that both source
+    directories share) is not categorized again
+
+    :param roots: list of ``(path, projects)`` tuples, from the highest to the lowest
+        priority. ``path`` is the path to a source directory, and ``projects`` is a
+        dictionary whose key is a project type and whose value is a CoreProjectMixin
+        object
+    :param source_cls: source object class
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :param concurrency: maximum number of source directories that are searched and
+        language directories that are categorized at the same time
+    :param executor: optional executor used to search for and categorize directories.
+        Default is a thread pool with ``concurrency`` threads that is shut down when
+        done
+    :return: MergedSourceCategories object
+    :raises: :exc:`ValueError` if ``concurrency`` is less than 1 or a source directory
+        is given more than once
+    """
+
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    options = [_make_options(path, projects, source_cls, lazy, None) for path, projects in roots]
+    seen_paths = set()
+    for root_options in options:
+        if root_options.orig_path in seen_paths:
+            raise ValueError(f'Source directory "{root_options.orig_path}" is given more than once')
+
+        seen_paths.add(root_options.orig_path)
+
+    owned_executor = None
+    if executor is None:
+        from concurrent.futures import ThreadPoolExecutor  # noqa: PLC0415
+
+        executor = owned_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    try:
+        prefixes = [_get_fingerprint_prefix(source_cls, lazy, projects) for _, projects in roots]
+        scans = list(executor.map(_scan_root, [path for path, _ in roots], prefixes))
+        originals = _find_originals(scans)
+        futures = {
+            (root_index, directory): executor.submit(
+                _get_directory_categorizer(options[root_index]), directory, files
+            )
+            for root_index, scan in enumerate(scans)
+            for directory, files, _ in scan
+            if (root_index, directory) not in originals
+        }
+        results = []
+        for root_index, scan in enumerate(scans):
+            root_results = []
+            for directory, _, _ in scan:
+                original = originals.get((root_index, directory))
+                if original is None:
+                    result = futures[root_index, directory].result()
+                    root_results.append(_RootDirectory(directory, result))
+                else:
+                    result = futures[original].result()
+                    root_results.append(_RootDirectory(directory, result, original[1]))
+
+            results.append(root_results)
+    finally:
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False, cancel_futures=True)
+
+    return _merge_root_results(roots, results, lazy)
+
+
+@dataclass
+class _RootDirectory:
+    directory: str
+    result: Optional[_DirectoryResult]
+    original: Optional[str] = None
+
+
+def _get_fingerprint_prefix(
+    source_cls: type, lazy: bool, projects: dict[str, CoreProjectMixin]
+) -> str:
+    source_cls_name = f"{source_cls.__module__}.{source_cls.__qualname__}"
+    return f"{source_cls_name}\0{lazy}\0{_get_projects_digest(projects)}"
+
+
+def _scan_root(path: str, prefix: str) -> list[tuple[str, list[str], str]]:
+    return [
+        (directory, files, _get_content_fingerprint(directory, files, prefix))
+        for directory, files in _find_directories(path)
+    ]
+
+
+def _get_content_fingerprint(directory: str, files: list[str], prefix: str) -> str:
+    # Unlike the disk cache key, this leaves out the path, so that identical
+    # directories in different source directories have the same fingerprint
+    fingerprint = hashlib.sha256()
+    for item in (prefix, Path(directory).resolve().name, *sorted(files)):
+        fingerprint.update(f"{item}\0".encode())
+
+    for filename in _TEST_INFO_FILENAMES:
+        if filename in files:
+            fingerprint.update(f"{filename}\0".encode())
+            fingerprint.update(Path(directory, filename).read_bytes())
+
+    return fingerprint.hexdigest()
+
+
+def _find_originals(
+    scans: list[list[tuple[str, list[str], str]]],
+) -> dict[tuple[int, str], tuple[int, str]]:
+    # A directory is only a duplicate of one in a higher priority source directory.
+    # Identical directories in the same source directory are all categorized
+    originals = {}
+    first_by_fingerprint: dict[str, tuple[int, str]] = {}
+    for root_index, scan in enumerate(scans):
+        for directory, _, fingerprint in scan:
+            first = first_by_fingerprint.setdefault(fingerprint, (root_index, directory))
+            if first[0] != root_index:
+                originals[root_index, directory] = first
+
+    return originals
+
+
+def _merge_root_results(
+    roots: Sequence[tuple[str, dict[str, CoreProjectMixin]]],
+    results: list[list[_RootDirectory]],
+    lazy: bool,
+) -> MergedSourceCategories:
+    categories = MergedSourceCategories()
+    owners: dict[tuple[str, str], int] = {}
+    language_infos: dict[str, tuple[int, CoreLanguage]] = {}
+    sources_by_language: dict[str, list[CoreSource]] = {}
+    for root_index, ((root_path, projects), root_results) in enumerate(zip(roots, results)):
+        for project_type in projects:
+            categories.testable_by_project.setdefault(project_type, [])
+
+        bad_sources = categories.bad_sources_by_root.setdefault(root_path, [])
+        for item in root_results:
+            if item.original is not None:
+                # The sources are the same as the original's, so they are shadowed
+                categories.duplicate_directories[item.directory] = item.original
+                if item.result is not None:
+                    categories.shadowed_sources += _relocate_sources(item, lazy)
+                    bad_sources += _relocate_bad_sources(item, root_path)
+
+                continue
+
+            if item.result is None:
+                continue
+
+            bad_sources += item.result.bad_sources
+            language = item.result.language
+            if language_infos.get(language, (root_index,))[0] == root_index:
+                # Within a source directory, the last directory for a language wins,
+                # the same as categorize_sources
+                language_infos[language] = (root_index, item.result.language_info)
+
+            testable_ids = {id(source) for source in item.result.testable_sources}
+            for source in item.result.language_info.sources:
+                if owners.setdefault((language, source.project_type), root_index) != root_index:
+                    categories.shadowed_sources.append(source)
+                    continue
+
+                categories.source_roots[source.full_path] = root_path
+                sources_by_language.setdefault(language, []).append(source)
+                if id(source) in testable_ids:
+                    categories.testable_by_project[source.project_type].append(source)
+
+        categories.bad_sources += [os.path.join(root_path, path) for path in bad_sources]
+
+    categories.by_language = {
+        language: CoreLanguage(
+            sources_by_language.get(language, []),
+            language_info.test_info,
+            language_info.test_info_path,
+        )
+        for language, (_, language_info) in language_infos.items()
+    }
+    return categories
+
+
+def _relocate_sources(item: _RootDirectory, lazy: bool) -> list[CoreSource]:
+    # The duplicate directory has the same testinfo file as the original directory.
+    # Templates may use the source's path, so they are rendered again
+    path = str(Path(item.directory).resolve())
+    language_info = item.result.language_info
+    test_info_string = None
+    if language_info.test_info_path.name == "testinfo.yml":
+        test_info_string = Path(path, "testinfo.yml").read_text(encoding="utf-8")
+        if get_test_info_template(test_info_string).is_static:
+            test_info_string = None
+
+    sources = []
+    for source in language_info.sources:
+        args = (source.filename, source.language, path)
+        source_cls = type(source)
+        if test_info_string is None:
+            sources.append(source_cls.from_test_info(*args, source.test_info, source.project_type))
+        elif lazy:
+            sources.append(
+                source_cls.from_string_lazy(*args, test_info_string, source.project_type)
+            )
+        else:
+            sources.append(source_cls(*args, test_info_string, source.project_type))
+
+    return sources
+
+
+def _relocate_bad_sources(item: _RootDirectory, root_path: str) -> list[str]:
+    relative_directory = Path(item.directory).resolve().relative_to(Path(root_path).resolve())
+    return [
+        str(relative_directory / Path(bad_source).name) for bad_source in item.result.bad_sources
+    ]
+
+
+__all__ = ["MergedSourceCategories", "categorize_roots"]
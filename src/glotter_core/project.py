@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from .cache import LRUCache
+
+# Model dataclasses use slots where pickling frozen, slotted dataclasses is supported
+_SLOTS: dict[str, bool] = {"slots": True} if sys.version_info >= (3, 11) else {}
+
 
 class NamingScheme(Enum):
     """
@@ -58,6 +64,8 @@ class CoreProjectMixin:
     :ivar AcronymScheme acronym_scheme: Acronym scheme
     """
 
+    __slots__ = ()
+
     def get_project_name_by_scheme(self, naming: str | NamingScheme) -> str:
         """
         Get project name by on the specified naming scheme, the acronym scheme,
@@ -135,7 +143,7 @@ class CoreProjectMixin:
         return word
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class CoreProject(CoreProjectMixin):
     """
     Project information. This class uses :class:`CoreProjectMixin` to implement
@@ -169,4 +177,87 @@ class CoreProject(CoreProjectMixin):
             raise ValueError(f'Unknown acronym scheme: "{acronym_scheme}"') from e
 
 
-__all__ = ["AcronymScheme", "CoreProject", "CoreProjectMixin", "NamingScheme"]
+class ProjectNameTable:
+    """
+    Precomputed project names for every naming scheme. Use
+    :func:`get_project_name_table` to get a table that is shared by all callers
+    using the same projects.
+
+    :param projects: dictionary whose key is a project type and whose value is
+        information about the project
+    """
+
+    def __init__(self, projects: dict[str, CoreProjectMixin]) -> None:
+        self._projects = tuple(projects.values())
+        self._names_by_scheme: dict[NamingScheme, dict[str, str]] = {
+            naming: {} for naming in NamingScheme
+        }
+        self._reverse: dict[str, list[tuple[str, NamingScheme]]] = {}
+        for project_type, project in projects.items():
+            for naming in NamingScheme:
+                name = project.get_project_name_by_scheme(naming)
+                self._names_by_scheme[naming][project_type] = name
+                self._reverse.setdefault(name, []).append((project_type, naming))
+
+    def get_name(self, naming: NamingScheme, project_type: str) -> str:
+        """
+        Get project name for a naming scheme
+
+        :param naming: Naming scheme
+        :param project_type: Project type
+        :return: Project name
+        :raises: :exc:`KeyError` if unknown project type
+        """
+
+        return self._names_by_scheme[naming][project_type]
+
+    def get_names(self, naming: NamingScheme) -> dict[str, str]:
+        """
+        Get all project names for a naming scheme. The returned dictionary must not be
+        modified
+
+        :param naming: Naming scheme
+        :return: dictionary whose key is the project type and whose value is the
+            project name
+        """
+
+        return self._names_by_scheme[naming]
+
+    def lookup(self, name: str) -> list[tuple[str, NamingScheme]]:
+        """
+        Get the project types and naming schemes that produce a project name
+
+        :param name: Project name (without extension)
+        :return: list of project type and naming scheme pairs. Empty if no project
+            produces the name
+        """
+
+        return self._reverse.get(name, [])
+
+
+_PROJECT_NAME_TABLES = LRUCache(maxsize=16)
+
+
+def get_project_name_table(projects: dict[str, CoreProjectMixin]) -> ProjectNameTable:
+    """
+    Get the project name table for the projects. The table is built once and then
+    shared by all callers using the same projects
+
+    :param projects: dictionary whose key is a project type and whose value is
+        information about the project
+    :return: ProjectNameTable object
+    """
+
+    # The table keeps the project objects alive, so their ids identify them
+    key = tuple((project_type, id(project)) for project_type, project in projects.items())
+    return _PROJECT_NAME_TABLES.get_or_create(key, lambda: ProjectNameTable(projects))
+
+
+__all__ = [
+    "AcronymScheme",
+    "CoreProject",
+    "CoreProjectMixin",
+    "NamingScheme",
+    "ProjectNameTable",
+    "get_project_name_table",
+]
@@ -0,0 +1,157 @@
+"""pytest plugin that categorizes sources once per test session
+
+Enable the plugin with ``-p glotter_core.pytest_plugin`` on the command line or with
+``pytest_plugins = ["glotter_core.pytest_plugin"]`` in the top-level ``conftest.py``.
+The sources are categorized the first time that they are needed and saved to a
+:mod:`snapshot <glotter_core.snapshot>` file. With pytest-xdist, the controller
+process does this before it starts the workers and passes the path of the snapshot
+file to them, so the workers memory-map the file instead of categorizing the sources
+again. Each worker only decodes the languages and projects that it uses.
+
+For example, to parametrize tests over the testable sources of a project:
+
+.. code-block:: python
+
+    from glotter_core.pytest_plugin import get_source_snapshot
+
+    def pytest_generate_tests(metafunc):
+        if "source" in metafunc.fixturenames:
+            snapshot = get_source_snapshot(metafunc.config)
+            sources = snapshot.get_testable_sources("hello_world")
+            metafunc.parametrize("source", sources, ids=[s.filename for s in sources])
+
+The settings are found the same way as :class:`~glotter_core.settings.CoreSettings`,
+starting in the current directory.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from glotter_core.settings import CoreSettings
+from glotter_core.snapshot import SourceSnapshot, is_snapshot_stale, save_snapshot
+from glotter_core.source import CoreSource, categorize_sources
+
+SNAPSHOT_FILENAME = "glotter-categories.snapshot"
+
+_WORKERINPUT_KEY = "glotter_core_snapshot"
+
+
+class _SessionState:
+    def __init__(self) -> None:
+        self.snapshot_path: Optional[Path] = None
+        self.snapshots: dict[type, SourceSnapshot] = {}
+        self.tmp_dir: Optional[str] = None
+
+
+_STATE_KEY = pytest.StashKey[_SessionState]()
+
+
+def get_source_snapshot(config: pytest.Config, source_cls: type = CoreSource) -> SourceSnapshot:
+    """
+    Get the categorized sources for the test session. In a pytest-xdist worker, the
+    snapshot file that the controller saved is used. Otherwise, the sources are
+    categorized the first time this is called
+
+    :param config: pytest configuration
+    :param source_cls: source object class
+    :return: SourceSnapshot object, which stays open until the end of the session
+    """
+
+    state = config.stash[_STATE_KEY]
+    snapshot = state.snapshots.get(source_cls)
+    if snapshot is None:
+        snapshot = state.snapshots[source_cls] = SourceSnapshot(
+            _get_snapshot_path(config), source_cls
+        )
+
+    return snapshot
+
+
+@pytest.fixture(scope="session")
+def glotter_source_snapshot(pytestconfig: pytest.Config) -> SourceSnapshot:
+    """Categorized sources for the test session. See :func:`get_source_snapshot`"""
+
+    return get_source_snapshot(pytestconfig)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("glotter", "glotter2-core")
+    group.addoption(
+        "--glotter-snapshot-dir",
+        default=None,
+        help="directory to keep the categorized sources in between sessions. The "
+        "sources are only categorized again if they changed. Default is a temporary "
+        "directory that is removed at the end of the session",
+    )
+    group.addoption(
+        "--glotter-jobs",
+        type=int,
+        default=1,
+        help="number of processes to categorize the sources with",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_STATE_KEY] = _SessionState()
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    state = config.stash.get(_STATE_KEY, None)
+    if state is None:
+        return
+
+    for snapshot in state.snapshots.values():
+        snapshot.close()
+
+    state.snapshots.clear()
+    if state.tmp_dir is not None:
+        shutil.rmtree(state.tmp_dir, ignore_errors=True)
+        state.tmp_dir = None
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node: Any) -> None:
+    """Categorize the sources before starting a pytest-xdist worker, and pass the path
+    of the snapshot file to it"""
+
+    node.workerinput[_WORKERINPUT_KEY] = str(_get_snapshot_path(node.config))
+
+
+def _get_snapshot_path(config: pytest.Config) -> Path:
+    state = config.stash[_STATE_KEY]
+    if state.snapshot_path is not None:
+        return state.snapshot_path
+
+    workerinput = getattr(config, "workerinput", {})
+    if _WORKERINPUT_KEY in workerinput:
+        state.snapshot_path = Path(workerinput[_WORKERINPUT_KEY])
+        return state.snapshot_path
+
+    snapshot_dir = config.getoption("glotter_snapshot_dir")
+    if snapshot_dir is None:
+        snapshot_dir = state.tmp_dir = tempfile.mkdtemp(prefix="glotter-")
+    else:
+        Path(snapshot_dir).mkdir(parents=True, exist_ok=True)
+
+    snapshot_path = Path(snapshot_dir, SNAPSHOT_FILENAME).resolve()
+    settings = CoreSettings()
+    if is_snapshot_stale(snapshot_path, settings.source_root, settings.projects):
+        categories = categorize_sources(
+            settings.source_root,
+            settings.projects,
+            CoreSource,
+            jobs=config.getoption("glotter_jobs"),
+        )
+        save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+
+    state.snapshot_path = snapshot_path
+    return snapshot_path
+
+
+__all__ = ["SNAPSHOT_FILENAME", "get_source_snapshot", "glotter_source_snapshot"]
@@ -2,22 +2,58 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import os
+import sys
+from collections import deque
 from dataclasses import dataclass, field
+from fnmatch import fnmatch
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Optional
 from warnings import warn
 
-import yaml
-
+from .cache import atomic_write_bytes
 from .project import AcronymScheme, CoreProject
+from .trace import Tracer, trace_count, trace_span, tracing
+from .yml import load_yaml
+
+DEFAULT_MAX_DEPTH = 10
+DEFAULT_IGNORE_PATTERNS = (".*", "CVS", "_darcs", "node_modules", "__pycache__")
 
 
 @dataclass(frozen=True, init=False)
 class CoreSettings:
     """Global project settings
 
-    :raises: :exc:`ValueError` if invalid settings
+    :param settings_path: Optional path to the settings file. If specified, the
+        settings file is not searched for
+    :param max_depth: Maximum number of directory levels below the project root to
+        search for the settings file. ``None`` means no limit
+    :param ignore_patterns: Glob patterns of directory names that are not searched
+        for the settings file
+    :param snapshot: whether to use a compiled snapshot of the settings. The
+        snapshot is reused, without parsing the settings file, as long as the
+        settings file's path, modification time, and contents are unchanged
+    :param snapshot_dir: directory to store the snapshot in. Default is a ``glotter``
+        directory in the user's cache directory (``$XDG_CACHE_HOME`` or ``~/.cache``,
+        ``~/Library/Caches`` on macOS, and ``%LOCALAPPDATA%`` on Windows). The
+        snapshot is stored as JSON, so loading it cannot run code, but it replaces the
+        settings, so the directory must only be writable by trusted users
+    :param tracer: optional :class:`~glotter_core.trace.Tracer` that times each phase
+        and counts memo and snapshot hits. Default is the tracer enabled with
+        :func:`~glotter_core.trace.tracing`, if any
+    :param memo: whether to remember the settings for the rest of the process
+        and reuse remembered settings
+    :raises: :exc:`ValueError` if invalid settings or settings file does not exist
+
+    Settings are remembered for the rest of the process, keyed by the class, the
+    project root, and the search options, so repeated constructions only check that
+    the settings file and the directories that were searched for it have not changed.
+    Remembered and snapshot settings are the parsed contents of the settings file, so
+    they go through :meth:`_set_global_settings` and :meth:`_set_projects` just like a
+    freshly parsed settings file. Call :func:`clear_settings_cache` to forget them.
 
     :ivar str project_root: Root directory of project
     :ivar src source_root: Root directory for source files
@@ -32,11 +68,96 @@ class CoreSettings:
     source_root: str = ""
     projects: dict[str | CoreProject] = field(default=dict)
 
-    def __init__(self) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        settings_path: Optional[str] = None,
+        max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+        ignore_patterns: tuple[str, ...] = DEFAULT_IGNORE_PATTERNS,
+        snapshot: bool = False,
+        snapshot_dir: Optional[str] = None,
+        *,
+        tracer: Optional[Tracer] = None,
+        memo: bool = True,
+    ) -> None:
         object.__setattr__(self, "project_root", str(Path.cwd()))
-        parser = CoreSettingsParser(self.project_root)
-        self._set_global_settings(parser.yml.get("settings", {}))
-        self._set_projects(parser.yml.get("projects", {}))
+        memo_key = (
+            type(self),
+            self.project_root,
+            settings_path,
+            max_depth,
+            tuple(ignore_patterns),
+        )
+        with tracing(tracer), trace_span("settings"):
+            if not memo:
+                self._load(memo_key, snapshot, snapshot_dir)
+            elif not self._load_memo(memo_key):
+                settings_memo = self._load(memo_key, snapshot, snapshot_dir)
+                if settings_memo is not None:
+                    _SETTINGS_MEMO[memo_key] = settings_memo
+
+    def _load_memo(self, memo_key: tuple) -> bool:
+        memo = _SETTINGS_MEMO.get(memo_key)
+        if (
+            memo is None
+            or memo.signature != _get_stat_signature(memo.yml_path)
+            or memo.directory_signatures != _get_directory_signatures(memo.directories)
+        ):
+            trace_count("settings_memo_misses")
+            return False
+
+        trace_count("settings_memo_hits")
+        self._set_items(copy.deepcopy(memo.items))
+        return True
+
+    def _load(
+        self, memo_key: tuple, snapshot: bool, snapshot_dir: Optional[str]
+    ) -> Optional[_SettingsMemo]:
+        _, _, settings_path, max_depth, ignore_patterns = memo_key
+        directories: list[str] = []
+        if settings_path is None:
+            with trace_span("locate"):
+                settings_path = _locate_yml(
+                    self.project_root, max_depth, ignore_patterns, directories
+                )
+
+            if settings_path is None:
+                # Let the parser report that the settings file was not found
+                parser = CoreSettingsParser(self.project_root, max_depth=0)
+                self._set_items((parser.yml.get("settings", {}), parser.yml.get("projects", {})))
+                return None
+
+        yml_path = str(Path(settings_path).resolve())
+        snapshot_key = _get_snapshot_key(yml_path, self.project_root) if snapshot else None
+        snapshot_path = _get_snapshot_path(yml_path, snapshot_dir) if snapshot_key else None
+        items = None
+        if snapshot_path is not None:
+            items = _load_snapshot(snapshot_path, snapshot_key)
+
+        is_parsed = items is None
+        if is_parsed:
+            parser = CoreSettingsParser(self.project_root, settings_path=settings_path)
+            items = (parser.yml.get("settings", {}), parser.yml.get("projects", {}))
+
+        # Copy the items before the hooks see them, in case they modify them
+        memo_items = copy.deepcopy(items)
+        self._set_items(items)
+        if is_parsed and snapshot_path is not None:
+            with trace_span("snapshot_save"):
+                _save_snapshot(snapshot_path, snapshot_key, memo_items)
+
+        return _SettingsMemo(
+            yml_path=yml_path,
+            signature=_get_stat_signature(yml_path),
+            items=memo_items,
+            directories=tuple(directories),
+            directory_signatures=_get_directory_signatures(directories),
+        )
+
+    def _set_items(self, items: tuple[Any, Any]) -> None:
+        settings_item, projects_item = items
+        self._set_global_settings(settings_item)
+        with trace_span("projects"):
+            self._set_projects(projects_item)
 
     def _set_global_settings(self, settings_item: Any) -> None:
         if not isinstance(settings_item, dict):
@@ -61,10 +182,21 @@ class CoreSettings:
 
 @dataclass(frozen=True, init=False)
 class CoreSettingsParser:
-    """Parse the settings file (``.glotter.yml``)
+    """Parse the settings file (``.glotter.yml``). Unless a settings path is specified,
+    the project root is checked first, and then its subdirectories are searched
+    breadth-first in name order, skipping ignored directories
 
     :param project_root: Root directory of project
-    :raises: :exc:`ValueError` if setting file does not contain a dictionary
+    :param settings_path: Optional path to the settings file. If specified, the
+        settings file is not searched for
+    :param max_depth: Maximum number of directory levels below the project root to
+        search for the settings file. ``None`` means no limit
+    :param ignore_patterns: Glob patterns of directory names that are not searched
+        for the settings file. Default is hidden directories (which includes version
+        control directories like ``.git``), ``CVS``, ``_darcs``, ``node_modules``, and
+        ``__pycache__``
+    :raises: :exc:`ValueError` if setting file does not contain a dictionary or
+        specified settings file does not exist
 
     :ivar str project_root: Root directory of project
     :ivar str | None yml_path: Path to ``.glotter.yml`` file
@@ -75,9 +207,23 @@ class CoreSettingsParser:
     yml_path: str | None = None
     yml: dict[str, Any] = field(default_factory=dict, repr=False)
 
-    def __init__(self, project_root):
+    def __init__(
+        self,
+        project_root,
+        settings_path: Optional[str] = None,
+        max_depth: Optional[int] = DEFAULT_MAX_DEPTH,
+        ignore_patterns: tuple[str, ...] = DEFAULT_IGNORE_PATTERNS,
+    ):
         object.__setattr__(self, "project_root", project_root)
-        object.__setattr__(self, "yml_path", self._locate_yml())
+        if settings_path is not None:
+            if not Path(settings_path).is_file():
+                raise ValueError(f'Settings file "{settings_path}" does not exist')
+
+            object.__setattr__(self, "yml_path", str(Path(settings_path).resolve()))
+        else:
+            object.__setattr__(
+                self, "yml_path", _locate_yml(project_root, max_depth, ignore_patterns)
+            )
 
         yml = None
         if self.yml_path is not None:
@@ -95,15 +241,166 @@ class CoreSettingsParser:
         object.__setattr__(self, "yml", yml)
 
     def _parse_yml(self) -> Any:
-        contents = Path(self.yml_path).read_text(encoding="utf-8")
-        return yaml.safe_load(contents)
+        with trace_span("read"):
+            contents = Path(self.yml_path).read_text(encoding="utf-8")
+
+        with trace_span("parse"):
+            return load_yaml(contents)
+
+
+_SNAPSHOT_VERSION = 3
+
+
+@dataclass(frozen=True)
+class _SettingsMemo:
+    yml_path: str
+    signature: Optional[tuple[int, int]]
+    # The settings and projects items of the settings file
+    items: tuple[Any, Any]
+    # Directories that were searched for the settings file. Adding a settings file
+    # to one of them changes its modification time
+    directories: tuple[str, ...] = ()
+    directory_signatures: tuple[Optional[int], ...] = ()
+
+
+_SETTINGS_MEMO: dict[tuple, _SettingsMemo] = {}
+
+
+def clear_settings_cache() -> None:
+    """Forget the settings remembered by :class:`CoreSettings` in this process"""
+
+    _SETTINGS_MEMO.clear()
+
+
+def _load_snapshot(snapshot_path: Path, snapshot_key: list[Any]) -> Optional[tuple[Any, Any]]:
+    # The key is checked before anything else in the snapshot is used
+    try:
+        with trace_span("snapshot_load"):
+            data = json.loads(snapshot_path.read_bytes())
+            if not isinstance(data, dict) or data.get("key") != snapshot_key:
+                raise ValueError("Snapshot key does not match")
+
+            items = (data["settings"], data["projects"])
+    except (OSError, ValueError, KeyError, TypeError):
+        trace_count("settings_snapshot_misses")
+        return None
 
-    def _locate_yml(self) -> str | None:
-        for root, _, files in os.walk(self.project_root):
-            if ".glotter.yml" in files:
-                return str((Path(root) / ".glotter.yml").resolve())
+    trace_count("settings_snapshot_hits")
+    return items
 
+
+def _save_snapshot(snapshot_path: Path, snapshot_key: list[Any], items: tuple[Any, Any]) -> None:
+    settings_item, projects_item = items
+    data = {"key": snapshot_key, "settings": settings_item, "projects": projects_item}
+    try:
+        contents = json.dumps(data).encode("utf-8")
+    except (TypeError, ValueError):
+        # The settings file has values that JSON cannot store (e.g., dates)
+        return
+
+    if json.loads(contents) != data:
+        # JSON changed a value (e.g., a key that is not a string)
+        return
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(snapshot_path, contents)
+
+
+def _get_directory_signatures(directories: Iterable[str]) -> tuple[Optional[int], ...]:
+    signatures = []
+    for directory in directories:
+        try:
+            signatures.append(os.stat(directory).st_mtime_ns)
+        except OSError:
+            signatures.append(None)
+
+    return tuple(signatures)
+
+
+def _get_stat_signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _get_snapshot_path(yml_path: str, snapshot_dir: Optional[str]) -> Path:
+    if snapshot_dir is None:
+        snapshot_dir = _get_user_cache_dir()
+
+    path_digest = hashlib.sha256(yml_path.encode("utf-8")).hexdigest()[:16]
+    return Path(snapshot_dir, f"glotter-settings-{path_digest}.snapshot")
+
+
+def _get_user_cache_dir() -> Path:
+    if sys.platform == "win32":
+        cache_dir = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin" and not os.environ.get("XDG_CACHE_HOME"):
+        cache_dir = Path.home() / "Library" / "Caches"
+    else:
+        cache_dir = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(cache_dir, "glotter")
+
+
+def _get_snapshot_key(yml_path: str, project_root: str) -> Optional[list[Any]]:
+    # A list, so that it is the same after a round trip through JSON
+    try:
+        contents = Path(yml_path).read_bytes()
+    except OSError:
         return None
 
+    signature = _get_stat_signature(yml_path)
+    return [
+        _SNAPSHOT_VERSION,
+        yml_path,
+        project_root,
+        list(signature) if signature is not None else None,
+        hashlib.sha256(contents).hexdigest(),
+    ]
+
+
+def _locate_yml(
+    project_root: str,
+    max_depth: Optional[int],
+    ignore_patterns: tuple[str, ...],
+    searched: Optional[list[str]] = None,
+) -> str | None:
+    directories = deque([(project_root, 0)])
+    while directories:
+        directory, depth = directories.popleft()
+        if searched is not None:
+            searched.append(directory)
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        for entry in entries:
+            if entry.name == ".glotter.yml" and entry.is_file():
+                return str(Path(entry.path).resolve())
+
+        if max_depth is not None and depth >= max_depth:
+            continue
+
+        directories.extend(
+            (entry.path, depth + 1)
+            for entry in entries
+            if entry.is_dir(follow_symlinks=False)
+            and not any(fnmatch(entry.name, pattern) for pattern in ignore_patterns)
+        )
+
+    return None
+
 
-__all__ = ["CoreSettings", "CoreSettingsParser"]
+__all__ = [
+    "DEFAULT_IGNORE_PATTERNS",
+    "DEFAULT_MAX_DEPTH",
+    "CoreSettings",
+    "CoreSettingsParser",
+    "clear_settings_cache",
+]
@@ -0,0 +1,133 @@
+"""Deterministic, cost-balanced sharding of language directories"""
+
+from __future__ import annotations
+
+import heapq
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+from glotter_core.trace import DIRECTORY, Tracer
+
+
+def assign_shards(costs: Mapping[str, float], num_shards: int) -> list[list[str]]:
+    """
+    Assign directories to shards so that the total cost of each shard is about the
+    same. Directories are taken from the most to the least costly and each one is
+    assigned to the shard with the lowest total cost so far. Ties are broken by
+    directory and shard number, so the assignment only depends on the costs
+
+    :param costs: dictionary whose key is the directory and whose value is its
+        estimated cost
+    :param num_shards: number of shards
+    :return: list of directories for each shard, sorted by directory
+    :raises: :exc:`ValueError` if ``num_shards`` is less than 1
+    """
+
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+
+    shards: list[list[str]] = [[] for _ in range(num_shards)]
+    loads = [(0.0, shard) for shard in range(num_shards)]
+    for directory in sorted(costs, key=lambda directory: (-costs[directory], directory)):
+        load, shard = heapq.heappop(loads)
+        shards[shard].append(directory)
+        heapq.heappush(loads, (load + costs[directory], shard))
+
+    return [sorted(directories) for directories in shards]
+
+
+def estimate_costs(
+    file_counts: Mapping[str, int], recorded_costs: Optional[Mapping[str, float]] = None
+) -> dict[str, float]:
+    """
+    Estimate the cost of categorizing each directory. A recorded cost (e.g., from
+    :func:`get_directory_costs`) is used if there is one. Otherwise, the cost is
+    proportional to the number of files in the directory, scaled by the average
+    recorded cost per file
+
+    :param file_counts: dictionary whose key is the directory and whose value is the
+        number of files in it
+    :param recorded_costs: optional dictionary whose key is the directory and whose
+        value is its recorded cost
+    :return: dictionary whose key is the directory and whose value is its estimated
+        cost
+    """
+
+    recorded_costs = recorded_costs or {}
+    recorded = [directory for directory in file_counts if directory in recorded_costs]
+    cost_per_file = 1.0
+    recorded_files = sum(file_counts[directory] for directory in recorded)
+    if recorded_files:
+        cost_per_file = sum(recorded_costs[directory] for directory in recorded) / recorded_files
+
+    return {
+        directory: recorded_costs.get(directory, file_count * cost_per_file)
+        for directory, file_count in file_counts.items()
+    }
+
+
+def get_directory_costs(tracer: Tracer, path: str) -> dict[str, float]:
+    """
+    Get the time that it took to categorize each directory, so that it can be saved
+    (e.g., as JSON) and passed as ``shard_costs`` to
+    :func:`~glotter_core.source.categorize_sources` in later runs
+
+    :param tracer: Tracer object that was passed to
+        :func:`~glotter_core.source.categorize_sources`
+    :param path: path to source directory that was categorized
+    :return: dictionary whose key is the directory relative to the source directory
+        and whose value is the time in seconds. If a directory was timed more than
+        once, the last time is used
+    """
+
+    return {
+        _get_relative_directory(span.args["path"], path): span.duration / 1e9
+        for span in tracer.spans
+        if span.category == DIRECTORY and "path" in span.args
+    }
+
+
+@dataclass(frozen=True)
+class _ShardOptions:
+    shard: int
+    num_shards: int
+    costs: Optional[Mapping[str, float]] = None
+
+
+def _make_shard_options(
+    shard: int, num_shards: int, costs: Optional[Mapping[str, float]]
+) -> Optional[_ShardOptions]:
+    if num_shards < 1:
+        raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"shard must be from 0 to {num_shards - 1}, got {shard}")
+
+    if num_shards == 1:
+        return None
+
+    return _ShardOptions(shard, num_shards, costs)
+
+
+def _select_shard(
+    path: str, directories: Iterable[tuple[str, list[str]]], options: _ShardOptions
+) -> list[tuple[str, list[str]]]:
+    # Every runner must see all of the directories to agree on the assignment, but
+    # only the file listings are needed for that
+    by_directory = {
+        _get_relative_directory(root, path): (root, files) for root, files in directories
+    }
+    costs = estimate_costs(
+        {directory: len(files) for directory, (_, files) in by_directory.items()}, options.costs
+    )
+    selected = set(assign_shards(costs, options.num_shards)[options.shard])
+    return [item for directory, item in by_directory.items() if directory in selected]
+
+
+def _get_relative_directory(root: str, path: str) -> str:
+    return Path(os.path.relpath(root, path)).as_posix()
+
+
+__all__ = ["assign_shards", "estimate_costs", "get_directory_costs"]
@@ -0,0 +1,527 @@
+"""Binary snapshots of categorized sources"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from glotter_core.cache import atomic_write_bytes
+from glotter_core.project import CoreProjectMixin
+from glotter_core.source import (
+    CoreLanguage,
+    CoreSource,
+    CoreSourceCategories,
+    _CategorizeOptions,
+    _find_directories,
+    _get_directory_fingerprint,
+    _get_projects_digest,
+)
+from glotter_core.testinfo import ContainerInfo, FolderInfo, TestInfo, intern_info
+
+# Increment when the snapshot format changes
+SNAPSHOT_VERSION = 2
+
+_MAGIC = b"GLCS"
+_NONE = 0xFFFFFFFF
+_BYTE_ORDERS = {"little": 0, "big": 1}
+
+# Sections, each stored as an array of unsigned 32-bit integers (except the string
+# data and string types, which are bytes), and the number of integers in each record
+_STRING_OFFSETS = 0
+_STRING_DATA = 1
+_TEST_INFOS = 2
+_NOTES = 3
+_LANGUAGES = 4
+_SOURCES = 5
+_PROJECTS = 6
+_TESTABLE = 7
+_BAD_SOURCES = 8
+_FINGERPRINTS = 9
+_STRING_TYPES = 10
+_NUM_SECTIONS = 11
+_BYTE_SECTIONS = (_STRING_DATA, _STRING_TYPES)
+_RECORD_SIZES = {
+    _TEST_INFOS: 9,
+    _LANGUAGES: 5,
+    _SOURCES: 5,
+    _PROJECTS: 3,
+    _FINGERPRINTS: 2,
+}
+
+# Test information values can be any YAML scalar, so each string records the type
+# that it is converted to
+_STR = 0
+_VALUE_TYPES = {int: 1, float: 2, bool: 3}
+_VALUE_PARSERS = {1: int, 2: float, 3: lambda text: text == "True"}
+
+# Magic, version, byte order, padding, source root string, and then the offset and
+# length of each section
+_HEADER = struct.Struct(f"=4sHBxI{2 * _NUM_SECTIONS}I")
+
+
+def save_snapshot(
+    snapshot_path: str | Path,
+    categories: CoreSourceCategories,
+    source_root: str,
+    projects: dict[str, CoreProjectMixin],
+) -> None:
+    """
+    Save categorized sources to a snapshot file. Strings are stored once, and the
+    rendered test information of every source is included, so loading the snapshot
+    does not render or parse anything. The file is written atomically
+
+    The snapshot also records a fingerprint of each language directory so that
+    :func:`is_snapshot_stale` can tell if the source tree changed.
+
+    :param snapshot_path: path to the snapshot file
+    :param categories: CoreSourceCategories object. Lazy sources are rendered
+    :param source_root: path to the source directory that was categorized
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object that was used to categorize the sources
+    :raises: :exc:`ValueError` if a test information value (e.g., a note) is not a
+        string, integer, floating-point number, boolean, or ``None``
+    """
+
+    writer = _SnapshotWriter()
+    source_root = str(Path(source_root).resolve())
+    source_indexes: dict[int, int] = {}
+    for language, language_info in categories.by_language.items():
+        writer.add_language(language, language_info, source_indexes)
+
+    for project_type, sources in categories.testable_by_project.items():
+        writer.add_project(project_type, [source_indexes[id(source)] for source in sources])
+
+    for bad_source in categories.bad_sources:
+        writer.sections[_BAD_SOURCES].append(writer.add_string(bad_source))
+
+    for directory, fingerprint in _get_fingerprints(source_root, projects).items():
+        writer.sections[_FINGERPRINTS].extend(
+            [writer.add_string(directory), writer.add_string(fingerprint)]
+        )
+
+    atomic_write_bytes(snapshot_path, writer.to_bytes(writer.add_string(source_root)))
+
+
+def load_snapshot(snapshot_path: str | Path, source_cls: type = CoreSource) -> CoreSourceCategories:
+    """
+    Load categorized sources from a snapshot file
+
+    :param snapshot_path: path to the snapshot file
+    :param source_cls: source object class
+    :return: CoreSourceCategories object
+    :raises: :exc:`ValueError` if the file is not a snapshot or has an unsupported
+        version
+    """
+
+    with SourceSnapshot(snapshot_path, source_cls) as snapshot:
+        return snapshot.to_categories()
+
+
+def is_snapshot_stale(
+    snapshot_path: str | Path, source_root: str, projects: dict[str, CoreProjectMixin]
+) -> bool:
+    """
+    Check if a snapshot no longer matches the source tree. The snapshot is stale if it
+    cannot be read, was made for a different source directory or projects, or if any
+    language directory was added, removed, or changed (its file listing or its
+    ``testinfo.yml`` or ``untestable.yml`` file)
+
+    :param snapshot_path: path to the snapshot file
+    :param source_root: path to the source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :return: True if the snapshot is stale, False otherwise
+    """
+
+    source_root = str(Path(source_root).resolve())
+    try:
+        with SourceSnapshot(snapshot_path) as snapshot:
+            if snapshot.source_root != source_root:
+                return True
+
+            fingerprints = snapshot.fingerprints
+    except (OSError, ValueError):
+        return True
+
+    return fingerprints != _get_fingerprints(source_root, projects)
+
+
+class SourceSnapshot:
+    """Memory-mapped snapshot file. Records are decoded when they are first used, so
+    looking up one language or project only decodes its sources. Decoded objects are
+    kept, so each source is decoded once and shared by :meth:`get_language` and
+    :meth:`get_testable_sources`
+
+    :param snapshot_path: path to the snapshot file
+    :param source_cls: source object class
+    :raises: :exc:`ValueError` if the file is not a snapshot or has an unsupported
+        version
+    """
+
+    def __init__(self, snapshot_path: str | Path, source_cls: type = CoreSource) -> None:
+        self._source_cls = source_cls
+        with Path(snapshot_path).open("rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise ValueError(f'"{snapshot_path}" is not a snapshot') from e
+
+        try:
+            self._sections = self._read_header(snapshot_path)
+        except BaseException:
+            self._mmap.close()
+            raise
+
+        self._strings: dict[int, Any] = {}
+        self._test_infos: dict[int, TestInfo] = {}
+        self._sources: dict[int, CoreSource] = {}
+        self._languages = {
+            self._get_string(record[0]): index
+            for index, record in enumerate(self._iter_records(_LANGUAGES))
+        }
+        self._projects = {
+            self._get_string(record[0]): (record[1], record[2])
+            for record in self._iter_records(_PROJECTS)
+        }
+
+    @property
+    def source_root(self) -> str:
+        """
+        Get the path to the source directory that was categorized
+
+        :return: path to source directory
+        """
+
+        return self._get_string(self._source_root_index)
+
+    @property
+    def languages(self) -> list[str]:
+        """
+        Get the languages in the snapshot
+
+        :return: list of languages
+        """
+
+        return list(self._languages)
+
+    @property
+    def project_types(self) -> list[str]:
+        """
+        Get the project types in the snapshot
+
+        :return: list of project types
+        """
+
+        return list(self._projects)
+
+    @property
+    def fingerprints(self) -> dict[str, str]:
+        """
+        Get the language directory fingerprints that were recorded when the snapshot
+        was saved
+
+        :return: dictionary whose key is the directory and whose value is its
+            fingerprint
+        """
+
+        return {
+            self._get_string(directory): self._get_string(fingerprint)
+            for directory, fingerprint in self._iter_records(_FINGERPRINTS)
+        }
+
+    def get_language(self, language: str) -> CoreLanguage:
+        """
+        Get the information about a language
+
+        :param language: the language
+        :return: CoreLanguage object
+        :raises: :exc:`KeyError` if the language is not in the snapshot
+        """
+
+        _, test_info, test_info_path, start, count = self._get_record(
+            _LANGUAGES, self._languages[language]
+        )
+        return CoreLanguage(
+            sources=[self._get_source(index) for index in range(start, start + count)],
+            test_info=self._get_test_info(test_info),
+            test_info_path=Path(self._get_string(test_info_path)),
+        )
+
+    def get_testable_sources(self, project_type: str) -> list[CoreSource]:
+        """
+        Get the testable sources for a project type
+
+        :param project_type: the project type
+        :return: list of source objects
+        :raises: :exc:`KeyError` if the project type is not in the snapshot
+        """
+
+        start, count = self._projects[project_type]
+        testable = self._get_section(_TESTABLE)
+        return [self._get_source(testable[index]) for index in range(start, start + count)]
+
+    def to_categories(self) -> CoreSourceCategories:
+        """
+        Decode all of the categorized sources
+
+        :return: CoreSourceCategories object
+        """
+
+        return CoreSourceCategories(
+            testable_by_project={
+                project_type: self.get_testable_sources(project_type)
+                for project_type in self._projects
+            },
+            by_language={language: self.get_language(language) for language in self._languages},
+            bad_sources=[self._get_string(index) for index in self._get_section(_BAD_SOURCES)],
+        )
+
+    def close(self) -> None:
+        """Close the snapshot file. Objects that were already decoded can still be used"""
+
+        for view in [*self._sections, self._view]:
+            view.release()
+
+        self._mmap.close()
+
+    def __enter__(self) -> SourceSnapshot:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _read_header(self, snapshot_path: str | Path) -> list[memoryview]:
+        try:
+            magic, version, byte_order, source_root, *sections = _HEADER.unpack_from(self._mmap)
+        except struct.error:
+            magic = version = byte_order = None
+
+        if magic != _MAGIC:
+            raise ValueError(f'"{snapshot_path}" is not a snapshot')
+
+        if version != SNAPSHOT_VERSION or byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError(
+                f'Snapshot "{snapshot_path}" has unsupported version {version} '
+                f"or byte order {byte_order}"
+            )
+
+        view = self._view = memoryview(self._mmap)
+        result = []
+        for section in range(_NUM_SECTIONS):
+            offset, length = sections[2 * section : 2 * section + 2]
+            data = view[offset : offset + length]
+            result.append(data if section in _BYTE_SECTIONS else data.cast("I"))
+
+        self._source_root_index = source_root
+        return result
+
+    def _get_section(self, section: int) -> memoryview:
+        return self._sections[section]
+
+    def _get_record(self, section: int, index: int) -> list[int]:
+        size = _RECORD_SIZES[section]
+        return self._sections[section][index * size : (index + 1) * size].tolist()
+
+    def _iter_records(self, section: int) -> Iterator[list[int]]:
+        size = _RECORD_SIZES[section]
+        values = self._sections[section].tolist()
+        for start in range(0, len(values), size):
+            yield values[start : start + size]
+
+    def _get_string(self, index: int) -> Optional[str]:
+        return self._get_value(index)
+
+    def _get_value(self, index: int) -> Any:
+        if index == _NONE:
+            return None
+
+        value = self._strings.get(index)
+        if value is None:
+            offsets = self._sections[_STRING_OFFSETS]
+            text = str(self._sections[_STRING_DATA][offsets[index] : offsets[index + 1]], "utf-8")
+            value_type = self._sections[_STRING_TYPES][index]
+            if value_type == _STR:
+                value = sys.intern(text)
+            else:
+                value = _VALUE_PARSERS[value_type](text)
+
+            self._strings[index] = value
+
+        return value
+
+    def _get_test_info(self, index: int) -> TestInfo:
+        test_info = self._test_infos.get(index)
+        if test_info is None:
+            values = [self._get_value(value) for value in self._get_record(_TEST_INFOS, index)[:7]]
+            image, tag, cmd, build, extension, naming, display_name = values
+            notes_start, notes_count = self._get_record(_TEST_INFOS, index)[7:]
+            notes = self._sections[_NOTES][notes_start : notes_start + notes_count]
+            test_info = self._test_infos[index] = intern_info(
+                TestInfo(
+                    container_info=intern_info(
+                        ContainerInfo(image=image, tag=tag, cmd=cmd, build=build)
+                    ),
+                    file_info=intern_info(FolderInfo(extension, naming)),
+                    language_display_name=display_name,
+                    notes=[self._get_value(note) for note in notes],
+                )
+            )
+
+        return test_info
+
+    def _get_source(self, index: int) -> CoreSource:
+        source = self._sources.get(index)
+        if source is None:
+            filename, language, path, project_type, test_info = self._get_record(_SOURCES, index)
+            source = self._sources[index] = self._source_cls.from_test_info(
+                self._get_string(filename),
+                self._get_string(language),
+                self._get_string(path),
+                self._get_test_info(test_info),
+                self._get_string(project_type),
+            )
+
+        return source
+
+
+class _SnapshotWriter:
+    def __init__(self) -> None:
+        self.sections = [
+            array("B" if section in _BYTE_SECTIONS else "I") for section in range(_NUM_SECTIONS)
+        ]
+        self._strings: dict[tuple[type, str], int] = {}
+        self._string_data: list[bytes] = []
+        self._string_offset = 0
+        self._test_infos: dict[int, int] = {}
+        self._num_sources = 0
+        self.sections[_STRING_OFFSETS].append(0)
+
+    def add_string(self, string: Optional[str]) -> int:
+        return self.add_value(string)
+
+    def add_value(self, value: Any) -> int:
+        if value is None:
+            return _NONE
+
+        value_type = _STR if isinstance(value, str) else _VALUE_TYPES.get(type(value))
+        if value_type is None:
+            raise ValueError(
+                f"Cannot save {value!r} in a snapshot because it is not a string, integer, "
+                "floating-point number, or boolean"
+            )
+
+        text = value if value_type == _STR else repr(value)
+        key = (type(value), text)
+        index = self._strings.get(key)
+        if index is None:
+            data = text.encode("utf-8")
+            index = self._strings[key] = len(self._string_data)
+            self._string_data.append(data)
+            self._string_offset += len(data)
+            self.sections[_STRING_OFFSETS].append(self._string_offset)
+            self.sections[_STRING_TYPES].append(value_type)
+
+        return index
+
+    def add_test_info(self, test_info: TestInfo) -> int:
+        # Equal TestInfo objects are usually shared, so they are deduplicated by identity
+        index = self._test_infos.get(id(test_info))
+        if index is None:
+            container_info = test_info.container_info
+            file_info = test_info.file_info
+            notes = self.sections[_NOTES]
+            index = self._test_infos[id(test_info)] = len(self._test_infos)
+            self.sections[_TEST_INFOS].extend(
+                [
+                    self.add_value(container_info.image),
+                    self.add_value(container_info.tag),
+                    self.add_value(container_info.cmd),
+                    self.add_value(container_info.build),
+                    self.add_value(file_info.extension),
+                    self.add_string(file_info.naming.value),
+                    self.add_value(test_info.language_display_name),
+                    len(notes),
+                    len(test_info.notes),
+                ]
+            )
+            notes.extend(self.add_value(note) for note in test_info.notes)
+
+        return index
+
+    def add_language(
+        self, language: str, language_info: CoreLanguage, source_indexes: dict[int, int]
+    ) -> None:
+        self.sections[_LANGUAGES].extend(
+            [
+                self.add_string(language),
+                self.add_test_info(language_info.test_info),
+                self.add_string(str(language_info.test_info_path)),
+                self._num_sources,
+                len(language_info.sources),
+            ]
+        )
+        for source in language_info.sources:
+            source_indexes[id(source)] = self._num_sources
+            self._num_sources += 1
+            self.sections[_SOURCES].extend(
+                [
+                    self.add_string(source.filename),
+                    self.add_string(source.language),
+                    self.add_string(source.path),
+                    self.add_string(source.project_type),
+                    self.add_test_info(source.test_info),
+                ]
+            )
+
+    def add_project(self, project_type: str, source_indexes: list[int]) -> None:
+        testable = self.sections[_TESTABLE]
+        self.sections[_PROJECTS].extend(
+            [self.add_string(project_type), len(testable), len(source_indexes)]
+        )
+        testable.extend(source_indexes)
+
+    def to_bytes(self, source_root: int) -> bytes:
+        chunks = [
+            b"".join(self._string_data) if section == _STRING_DATA else values.tobytes()
+            for section, values in enumerate(self.sections)
+        ]
+        offset = _HEADER.size
+        offsets = []
+        for section, chunk in enumerate(chunks):
+            offsets.extend([offset, len(chunk)])
+            # Keep the integer sections aligned
+            chunks[section] += b"\0" * (-len(chunk) % 4)
+            offset += len(chunks[section])
+
+        header = _HEADER.pack(
+            _MAGIC, SNAPSHOT_VERSION, _BYTE_ORDERS[sys.byteorder], source_root, *offsets
+        )
+        return header + b"".join(chunks)
+
+
+def _get_fingerprints(source_root: str, projects: dict[str, CoreProjectMixin]) -> dict[str, str]:
+    options = _CategorizeOptions(
+        orig_path=Path(source_root),
+        projects=projects,
+        source_cls=CoreSource,
+        lazy=False,
+        cache_dir=None,
+        projects_digest=_get_projects_digest(projects),
+    )
+    return {
+        str(Path(root).relative_to(source_root)): _get_directory_fingerprint(root, files, options)
+        for root, files in _find_directories(source_root)
+    }
+
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "SourceSnapshot",
+    "is_snapshot_stale",
+    "load_snapshot",
+    "save_snapshot",
+]
@@ -1,23 +1,36 @@
 """Source information"""
 
+import hashlib
 import os
-from dataclasses import dataclass, field
+import sys
+from dataclasses import dataclass, field, fields
+from functools import lru_cache, partial
 from pathlib import Path
-
-import yaml
-
-from glotter_core.project import CoreProjectMixin, NamingScheme
-from glotter_core.testinfo import TestInfo
-
-
-@dataclass(frozen=True)
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Union
+
+from glotter_core.cache import DiskCache
+from glotter_core.project import _SLOTS, CoreProjectMixin, get_project_name_table
+from glotter_core.shard import _make_shard_options, _select_shard, _ShardOptions
+from glotter_core.testinfo import (
+    ContainerInfo,
+    TestInfo,
+    get_intern_cache_stats,
+    get_template_cache_stats,
+    get_test_info_template,
+)
+from glotter_core.trace import DIRECTORY, Tracer, trace_count, trace_span, tracing
+from glotter_core.yml import load_yaml
+
+
+@dataclass(frozen=True, **_SLOTS)
 class CoreSource:
     """Metadata about a source file
 
     :param filename: filename including extension
     :param language: the language of the source
     :param path: path to the file excluding name
-    :param str test_info: a string in yaml format containing testinfo for a directory
+    :param str test_info: a string in yaml format containing testinfo for a directory,
+        or a TestInfo object that was already parsed
     :param project_type: name of project for this source
 
     :ivar filename: filename including extension
@@ -32,9 +45,110 @@ class CoreSource:
     path: str
     test_info: str = field(repr=False)
     project_type: str
+    _test_info_string: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "test_info", TestInfo.from_string(self.test_info, self))
+        # Many sources share the same language, path, and project type, so share
+        # one copy of each string
+        for name in ("language", "path", "project_type"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+
+        # Always assign this, since a dataclass subclass's __init__ does not assign
+        # init=False fields, and with slots there is no class attribute to fall back on
+        if isinstance(self.test_info, _UnrenderedTestInfo):
+            object.__setattr__(self, "_test_info_string", str(self.test_info))
+            object.__delattr__(self, "test_info")
+        elif isinstance(self.test_info, TestInfo):
+            # Already parsed by from_test_info
+            object.__setattr__(self, "_test_info_string", None)
+        else:
+            object.__setattr__(self, "_test_info_string", None)
+            test_info = get_test_info_template(self.test_info).render(self)
+            object.__setattr__(self, "test_info", test_info)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails, which is how a lazy test_info is
+        # rendered and parsed on first access
+        if name == "test_info" and self._test_info_string is not None:
+            test_info = get_test_info_template(self._test_info_string).render(self)
+            object.__setattr__(self, "test_info", test_info)
+            object.__setattr__(self, "_test_info_string", None)
+            return test_info
+
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @classmethod
+    def from_string_lazy(
+        cls,
+        filename: str,
+        language: str,
+        path: str,
+        test_info: str,
+        project_type: str,
+        **kwargs: Any,
+    ) -> "CoreSource":
+        """
+        Create a source object whose testinfo string is not rendered and parsed until
+        ``test_info`` is first accessed
+
+        :param filename: filename including extension
+        :param language: the language of the source
+        :param path: path to the file excluding name
+        :param test_info: a string in yaml format containing testinfo for a directory
+        :param project_type: name of project for this source
+        :param kwargs: other fields of a subclass
+        :return: a new source object
+        """
+
+        return cls(filename, language, path, _UnrenderedTestInfo(test_info), project_type, **kwargs)
+
+    @classmethod
+    def from_test_info(
+        cls,
+        filename: str,
+        language: str,
+        path: str,
+        test_info: TestInfo,
+        project_type: str,
+        **kwargs: Any,
+    ) -> "CoreSource":
+        """
+        Create a source object from an already parsed TestInfo object. Nothing is
+        rendered or parsed
+
+        :param filename: filename including extension
+        :param language: the language of the source
+        :param path: path to the file excluding name
+        :param test_info: TestInfo object
+        :param project_type: name of project for this source
+        :param kwargs: other fields of a subclass
+        :return: a new source object
+        """
+
+        return cls(filename, language, path, test_info, project_type, **kwargs)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickle a lazy source without rendering its test_info
+        state = dict(getattr(self, "__dict__", {}))
+        for source_field in fields(self):
+            try:
+                state[source_field.name] = object.__getattribute__(self, source_field.name)
+            except AttributeError:
+                pass
+
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def unrendered_test_info(self) -> Optional[str]:
+        """Returns the testinfo string of a lazy source whose test information has not
+        been rendered yet. ``None`` if it has been rendered"""
+        return self._test_info_string
 
     @property
     def full_path(self) -> str:
@@ -52,7 +166,14 @@ class CoreSource:
         return "".join(Path(self.filename).suffixes)
 
 
-@dataclass
+class _UnrenderedTestInfo(str):
+    # Marks a testinfo string that is rendered and parsed when it is first accessed.
+    # A marker rather than a field, so that dataclass subclasses can add fields
+    # without defaults
+    __slots__ = ()
+
+
+@dataclass(**_SLOTS)
 class CoreLanguage:
     """
     Information about a language
@@ -87,8 +208,18 @@ class CoreSourceCategories:
 _IGNORED_FILENAMES = {"untestable.yml", "testinfo.yml", "README.md"}
 
 
-def categorize_sources(
-    path: str, projects: dict[str, CoreProjectMixin], source_cls: type
+def categorize_sources(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    lazy: bool = False,
+    jobs: Optional[int] = 1,
+    *,
+    cache_dir: Optional[str] = None,
+    tracer: Optional[Tracer] = None,
+    shard: int = 0,
+    num_shards: int = 1,
+    shard_costs: Optional[Mapping[str, float]] = None,
 ) -> CoreSourceCategories:
     """
     Categorize sources
@@ -97,89 +228,512 @@ def categorize_sources(
     :param projects: dictionary whose key is a project type and whose value is a
         CoreProjectMixin object
     :param source_cls: source object class
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed. Sources stay unrendered
+        unless their test information must be rendered to decide whether they are
+        testable (see
+        :attr:`~glotter_core.testinfo.TestInfoTemplate.has_static_testability`).
+        Default is to render and parse it immediately
+    :param jobs: number of processes used to categorize directories. ``None`` uses
+        the number of CPUs. Default is to categorize directories in this process.
+        When more than one process is used, ``projects`` and ``source_cls`` must be
+        picklable
+    :param cache_dir: optional directory in which to cache the result for each
+        language directory. A cached result is reused as long as the directory's file
+        listing, its ``testinfo.yml`` or ``untestable.yml`` file, and the projects
+        are unchanged. The directory can be shared by several processes. Default is
+        not to cache results
+    :param tracer: optional :class:`~glotter_core.trace.Tracer` that times each phase
+        and each directory, and counts cache hits. Default is the tracer enabled with
+        :func:`~glotter_core.trace.tracing`, if any
+    :param shard: which shard of the language directories to categorize, from 0 to
+        ``num_shards - 1``
+    :param num_shards: number of shards to split the language directories into.
+        Every directory is assigned to exactly one shard, the same way on every
+        machine (see :func:`~glotter_core.shard.assign_shards`), and only the
+        directories in ``shard`` are read. Default is not to split them
+    :param shard_costs: optional dictionary whose key is a language directory
+        relative to ``path`` and whose value is its recorded cost (e.g., from
+        :func:`~glotter_core.shard.get_directory_costs`), used to balance the shards.
+        Default is to estimate the cost from the number of files
     :return: CoreSourceCategories object containing information of the source
         categories
+    :raises: :exc:`ValueError` if ``jobs`` is less than 1, ``num_shards`` is less than
+        1, or ``shard`` is out of range
     """
 
-    categories = CoreSourceCategories()
-    categories.testable_by_project = {k: [] for k in projects}
-    orig_path = Path(path).resolve()
-    for root, _, files in os.walk(path):
-        current_path = Path(root).resolve()
-        test_info_string = ""
-        test_info_filename = ""
-        if "testinfo.yml" in files:
-            test_info_filename = "testinfo.yml"
+    shard_options = _make_shard_options(shard, num_shards, shard_costs)
+    with tracing(tracer) as current_tracer, trace_span("categorize_sources", path=path):
+        cache_stats = _get_cache_stats() if current_tracer is not None else {}
+        results = _iter_directory_results(
+            path, _make_options(path, projects, source_cls, lazy, cache_dir), jobs, shard_options
+        )
+        categories = _merge_directory_results(results, projects)
+        for name, (hits, misses) in cache_stats.items():
+            new_hits, new_misses = _get_cache_stats()[name]
+            current_tracer.count(f"{name}_hits", new_hits - hits)
+            current_tracer.count(f"{name}_misses", new_misses - misses)
+
+    return categories
+
+
+def _get_cache_stats() -> dict[str, tuple[int, int]]:
+    return {
+        name: (stats.hits, stats.misses)
+        for name, stats in (
+            ("template_cache", get_template_cache_stats()),
+            ("intern_cache", get_intern_cache_stats()),
+        )
+    }
+
+
+@dataclass(frozen=True)
+class SourceFound:
+    """
+    A source that was found by :func:`iter_sources`
+
+    :ivar source: source object
+    :ivar is_testable: whether the source is testable
+    """
+
+    source: CoreSource
+    is_testable: bool
+
+
+@dataclass(frozen=True)
+class BadSourceFound:
+    """
+    A file that was found by :func:`iter_sources` that does not belong to a project
+
+    :ivar path: path to the file relative to the source directory
+    """
+
+    path: str
+
+
+@dataclass(frozen=True)
+class LanguageFound:
+    """
+    A language that was found by :func:`iter_sources`. It is produced after the
+    sources and bad sources in the language's directory
+
+    :ivar language: the language
+    :ivar language_info: CoreLanguage object
+    """
+
+    language: str
+    language_info: CoreLanguage
+
+
+def iter_sources(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    lazy: bool = False,
+    jobs: Optional[int] = 1,
+    *,
+    cache_dir: Optional[str] = None,
+    shard: int = 0,
+    num_shards: int = 1,
+    shard_costs: Optional[Mapping[str, float]] = None,
+) -> Iterator[Union[SourceFound, BadSourceFound, LanguageFound]]:
+    """
+    Generate sources one directory at a time. This produces the same information as
+    :func:`categorize_sources` without keeping it all in memory
+
+    For each language directory, a :class:`SourceFound` object is produced for each
+    source, then a :class:`BadSourceFound` object for each file that does not belong
+    to a project, and then a :class:`LanguageFound` object
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :param jobs: number of processes used to categorize directories. ``None`` uses
+        the number of CPUs. When more than one process is used, all directories are
+        found before the first result is produced
+    :param cache_dir: optional directory in which to cache the result for each
+        language directory
+    :param shard: which shard of the language directories to categorize
+    :param num_shards: number of shards to split the language directories into. When
+        there is more than one, all directories are found before the first result is
+        produced
+    :param shard_costs: optional dictionary of recorded costs used to balance the
+        shards
+    :return: generator of SourceFound, BadSourceFound, and LanguageFound objects
+    :raises: :exc:`ValueError` if ``jobs`` is less than 1, ``num_shards`` is less than
+        1, or ``shard`` is out of range
+    """
+
+    results = _iter_directory_results(
+        path,
+        _make_options(path, projects, source_cls, lazy, cache_dir),
+        jobs,
+        _make_shard_options(shard, num_shards, shard_costs),
+    )
+    return _iter_found(results)
+
+
+@dataclass(frozen=True)
+class _CategorizeOptions:
+    orig_path: Path
+    projects: dict[str, CoreProjectMixin]
+    source_cls: type
+    lazy: bool = False
+    cache_dir: Optional[str] = None
+    projects_digest: str = ""
+
+
+@dataclass
+class _DirectoryResult:
+    language: str
+    language_info: CoreLanguage
+    testable_sources: list[CoreSource]
+    bad_sources: list[str]
+
+
+def _make_options(
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    lazy: bool,
+    cache_dir: Optional[str],
+) -> _CategorizeOptions:
+    return _CategorizeOptions(
+        orig_path=Path(path).resolve(),
+        projects=projects,
+        source_cls=source_cls,
+        lazy=lazy,
+        # Resolved, so that a relative directory means the same after a chdir
+        cache_dir=str(Path(cache_dir).resolve()) if cache_dir else None,
+        projects_digest=_get_projects_digest(projects) if cache_dir else "",
+    )
+
+
+def _iter_directory_results(
+    path: str,
+    options: _CategorizeOptions,
+    jobs: Optional[int],
+    shard_options: Optional[_ShardOptions] = None,
+) -> Iterator[_DirectoryResult]:
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+
+    categorize_directory = _get_directory_categorizer(options)
+    directories = _trace_iterator(_find_shard_directories(path, shard_options), "walk")
+    if jobs == 1:
+        results = (categorize_directory(root, files) for root, files in directories)
+    else:
+        results = _categorize_in_processes(categorize_directory, list(directories), jobs)
+
+    return (result for result in results if result is not None)
+
+
+def _get_directory_categorizer(
+    options: _CategorizeOptions,
+) -> Callable[[str, list[str]], Optional[_DirectoryResult]]:
+    return partial(
+        _trace_directory,
+        categorize_directory=(
+            _categorize_directory_cached if options.cache_dir else _categorize_directory
+        ),
+        options=options,
+    )
+
+
+def _trace_directory(
+    root: str,
+    files: list[str],
+    categorize_directory: Callable[..., Optional[_DirectoryResult]],
+    options: _CategorizeOptions,
+) -> Optional[_DirectoryResult]:
+    with trace_span("directory", DIRECTORY, path=root):
+        return categorize_directory(root, files, options)
+
+
+def _trace_iterator(iterator: Iterator[Any], name: str) -> Iterator[Any]:
+    while True:
+        with trace_span(name):
+            item = next(iterator, _MISSING)
+
+        if item is _MISSING:
+            return
+
+        yield item
+
+
+def _find_directories(path: str) -> Iterator[tuple[str, list[str]]]:
+    return (
+        (root, files)
+        for root, _, files in os.walk(path)
+        if "testinfo.yml" in files or "untestable.yml" in files
+    )
+
+
+def _find_shard_directories(
+    path: str, shard_options: Optional[_ShardOptions]
+) -> Iterator[tuple[str, list[str]]]:
+    if shard_options is None:
+        yield from _find_directories(path)
+    else:
+        yield from _select_shard(path, _find_directories(path), shard_options)
+
+
+def _categorize_in_processes(
+    categorize_directory: Callable[[str, list[str]], Optional[_DirectoryResult]],
+    directories: list[tuple[str, list[str]]],
+    jobs: int,
+) -> Iterator[Optional[_DirectoryResult]]:
+    from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+
+    chunksize = max(1, len(directories) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(
+            categorize_directory,
+            [root for root, _ in directories],
+            [files for _, files in directories],
+            chunksize=chunksize,
+        )
+
+
+def _iter_found(
+    results: Iterable[_DirectoryResult],
+) -> Iterator[Union[SourceFound, BadSourceFound, LanguageFound]]:
+    for result in results:
+        testable_ids = {id(source) for source in result.testable_sources}
+        for source in result.language_info.sources:
+            yield SourceFound(source, id(source) in testable_ids)
+
+        for bad_source in result.bad_sources:
+            yield BadSourceFound(bad_source)
+
+        yield LanguageFound(result.language, result.language_info)
+
+
+def _categorize_directory(
+    root: str, files: list[str], options: _CategorizeOptions
+) -> Optional[_DirectoryResult]:
+    projects = options.projects
+    current_path = Path(root).resolve()
+    language = current_path.name
+    test_info_string = ""
+    test_info_filename = ""
+    test_info = None
+    if "testinfo.yml" in files:
+        test_info_filename = "testinfo.yml"
+        with trace_span("read"):
             test_info_string = Path(current_path, test_info_filename).read_text(encoding="utf-8")
-        elif "untestable.yml" in files:
-            test_info_filename = "untestable.yml"
-            test_info_string = _convert_untestable_to_testinfo(current_path, files, projects)
-
-        if test_info_string:
-            language = current_path.name
-            test_info = TestInfo.from_dict(yaml.safe_load(test_info_string), language)
-            folder_info = test_info.file_info
-            folder_project_names = folder_info.get_project_mappings(
-                projects, include_extension=True
-            )
-            sources = []
-            test_info_path = Path(current_path, test_info_filename)
-            for project_type, project_name in folder_project_names.items():
-                if project_name in files:
-                    source = source_cls(
+    elif "untestable.yml" in files:
+        test_info_filename = "untestable.yml"
+        with trace_span("untestable"):
+            test_info = _get_untestable_test_info(current_path, files, projects, language)
+
+    is_static = True
+    has_static_testability = True
+    if test_info is None:
+        if not test_info_string:
+            return None
+
+        with trace_span("parse"):
+            template = get_test_info_template(test_info_string)
+            test_info = TestInfo.from_dict(template.data, language)
+            is_static = template.is_static
+            has_static_testability = template.has_static_testability
+
+    folder_info = test_info.file_info
+    with trace_span("project_names"):
+        folder_project_names = folder_info.get_project_mappings(projects, include_extension=True)
+
+    sources = []
+    testable_sources = []
+    test_info_path = Path(current_path, test_info_filename)
+    with trace_span("construct"):
+        for project_type, project_name in folder_project_names.items():
+            if project_name in files:
+                if not is_static and options.lazy:
+                    source = options.source_cls.from_string_lazy(
+                        project_name, language, str(current_path), test_info_string, project_type
+                    )
+                elif not is_static:
+                    source = options.source_cls(
                         filename=project_name,
                         language=language,
                         path=str(current_path),
                         test_info=test_info_string,
                         project_type=project_type,
                     )
-                    sources.append(source)
-                    if source.test_info.is_testable:
-                        categories.testable_by_project[project_type].append(source)
-
-            categories.by_language[language] = CoreLanguage(sources, test_info, test_info_path)
+                else:
+                    # Untestable test information and testinfo files without
+                    # templates are the same for every source, so there is nothing
+                    # to render
+                    source = options.source_cls.from_test_info(
+                        project_name, language, str(current_path), test_info, project_type
+                    )
 
-            invalid_filenames = set(files) - (
-                set(folder_project_names.values()) | _IGNORED_FILENAMES
+                sources.append(source)
+                # Unless the template cannot change whether the container is empty,
+                # testability is only known once the test information is rendered
+                if has_static_testability:
+                    is_testable = test_info.is_testable
+                else:
+                    is_testable = source.test_info.is_testable
+
+                if is_testable:
+                    testable_sources.append(source)
+
+    invalid_filenames = set(files) - (set(folder_project_names.values()) | _IGNORED_FILENAMES)
+    return _DirectoryResult(
+        language=language,
+        language_info=CoreLanguage(sources, test_info, test_info_path),
+        testable_sources=testable_sources,
+        bad_sources=[
+            str(current_path.relative_to(options.orig_path) / filename)
+            for filename in sorted(invalid_filenames)
+        ],
+    )
+
+
+# Increment when the cached directory result format changes
+_CACHE_VERSION = 1
+_TEST_INFO_FILENAMES = ("testinfo.yml", "untestable.yml")
+_MISSING = object()
+
+
+def _categorize_directory_cached(
+    root: str, files: list[str], options: _CategorizeOptions
+) -> Optional[_DirectoryResult]:
+    cache = _get_disk_cache(options.cache_dir)
+    with trace_span("fingerprint"):
+        key = _get_directory_fingerprint(root, files, options)
+
+    with trace_span("disk_cache_get"):
+        result = cache.get(key, _MISSING)
+
+    if result is _MISSING:
+        trace_count("disk_cache_misses")
+        result = _categorize_directory(root, files, options)
+        with trace_span("disk_cache_set"):
+            cache.set(key, result)
+    else:
+        trace_count("disk_cache_hits")
+
+    return result
+
+
+@lru_cache(maxsize=None)
+def _get_disk_cache(cache_dir: str) -> DiskCache:
+    return DiskCache(cache_dir)
+
+
+def _get_directory_fingerprint(root: str, files: list[str], options: _CategorizeOptions) -> str:
+    source_cls = options.source_cls
+    fingerprint = hashlib.sha256()
+    for item in (
+        _CACHE_VERSION,
+        str(Path(root).resolve()),
+        str(options.orig_path),
+        f"{source_cls.__module__}.{source_cls.__qualname__}",
+        options.lazy,
+        options.projects_digest,
+        *sorted(files),
+    ):
+        fingerprint.update(f"{item}\0".encode())
+
+    for filename in _TEST_INFO_FILENAMES:
+        if filename in files:
+            file_path = Path(root, filename)
+            stat = file_path.stat()
+            content_digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+            fingerprint.update(
+                f"{filename}\0{stat.st_mtime_ns}\0{stat.st_size}\0{content_digest}\0".encode()
             )
-            categories.bad_sources += [
-                str(current_path.relative_to(orig_path) / filename)
-                for filename in invalid_filenames
-            ]
+
+    return fingerprint.hexdigest()
+
+
+def _get_projects_digest(projects: dict[str, CoreProjectMixin]) -> str:
+    items = [
+        (project_type, list(project.words), list(project.acronyms), str(project.acronym_scheme))
+        for project_type, project in projects.items()
+    ]
+    return hashlib.sha256(repr(items).encode()).hexdigest()
+
+
+def _merge_directory_results(
+    results: Iterable[Optional[_DirectoryResult]], projects: dict[str, CoreProjectMixin]
+) -> CoreSourceCategories:
+    categories = CoreSourceCategories()
+    categories.testable_by_project = {k: [] for k in projects}
+    for result in results:
+        if result is None:
+            continue
+
+        for source in result.testable_sources:
+            categories.testable_by_project[source.project_type].append(source)
+
+        categories.by_language[result.language] = result.language_info
+        categories.bad_sources += result.bad_sources
 
     return categories
 
 
-def _convert_untestable_to_testinfo(
-    current_path: Path, files: list[str], projects: dict[str, CoreProjectMixin]
-) -> str:
+def _get_unrendered_container_info(
+    source: CoreSource, test_info: TestInfo
+) -> Optional[ContainerInfo]:
+    # A lazy source that has not been rendered has the image and tag of its language's
+    # unrendered test information, unless its template changes them. None means that
+    # the source's own test information must be used
+    test_info_string = source.unrendered_test_info
+    if test_info_string is None:
+        return None
+
+    if not get_test_info_template(test_info_string).has_static_testability:
+        return None
+
+    return test_info.container_info
+
+
+def _get_untestable_test_info(
+    current_path: Path, files: list[str], projects: dict[str, CoreProjectMixin], language: str
+) -> Optional[TestInfo]:
     with Path(current_path, "untestable.yml").open(encoding="utf-8") as f:
-        untestable_data = yaml.safe_load(f)
+        untestable_data = load_yaml(f)
 
     notes = untestable_data[0]["reason"]
+    name_table = get_project_name_table(projects)
     for filename in files:
         if filename in _IGNORED_FILENAMES:
             continue
 
         base_filename = filename.split(".")[0]
         extension = "".join(Path(filename).suffixes)
+        if base_filename + extension != filename:
+            continue
+
         project_type = base_filename.lower().replace("-", "").replace("_", "")
-        if project_type in projects and len(projects[project_type].words) > 1:
-            for naming_scheme in NamingScheme:
-                expected_filename = (
-                    projects[project_type].get_project_name_by_scheme(naming_scheme) + extension
-                )
-                if filename == expected_filename:
-                    test_info_dict = {
-                        "folder": {
-                            "extension": extension,
-                            "naming": naming_scheme.value,
-                        },
-                        "notes": [notes],
-                    }
-                    return yaml.dump(test_info_dict, sort_keys=False)
-
-    return ""
-
-
-__all__ = ["CoreLanguage", "CoreSource", "CoreSourceCategories", "categorize_sources"]
+        for name_project_type, naming_scheme in name_table.lookup(base_filename):
+            if name_project_type == project_type and len(projects[project_type].words) > 1:
+                test_info_dict = {
+                    "folder": {"extension": extension, "naming": naming_scheme.value},
+                    "notes": [notes],
+                }
+                return TestInfo.from_dict(test_info_dict, language)
+
+    return None
+
+
+__all__ = [
+    "BadSourceFound",
+    "CoreLanguage",
+    "CoreSource",
+    "CoreSourceCategories",
+    "LanguageFound",
+    "SourceFound",
+    "categorize_sources",
+    "iter_sources",
+]
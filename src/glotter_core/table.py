@@ -0,0 +1,314 @@
+"""Columnar source table"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Any, Iterable, Iterator, Mapping, Optional, Union
+
+from glotter_core.source import CoreSource, CoreSourceCategories, _get_unrendered_container_info
+from glotter_core.testinfo import TestInfo
+
+COLUMNS = ("language", "path", "project_type", "extension", "image")
+
+
+class SourceTable:
+    """Columnar table of sources. Each row is a source. Repeated strings (language,
+    path, project type, extension, and container image) are stored once in a
+    dictionary per column, and each row stores an integer code in a compact
+    :mod:`array`-backed column
+
+    A table is usually created from categorized sources with
+    :meth:`from_categories`. Tables created by :meth:`filter` share the column
+    dictionaries with the table they were created from.
+
+    :ivar filenames: filename of each row
+    :ivar testable: whether each row is testable (1) or not (0)
+    """
+
+    def __init__(self) -> None:
+        self.filenames: list[str] = []
+        self.testable = array("b")
+        self._codes = {column: array("I") for column in COLUMNS}
+        self._dictionaries = {column: _Dictionary() for column in COLUMNS}
+        self._test_info_codes = array("I")
+        self._test_infos = _Dictionary()
+        self._source_cls_codes = array("I")
+        self._source_classes = _Dictionary()
+
+    @classmethod
+    def from_categories(cls, categories: CoreSourceCategories) -> SourceTable:
+        """
+        Create a table from categorized sources
+
+        :param categories: CoreSourceCategories object
+        :return: a new SourceTable object
+        """
+
+        testable_ids = {
+            id(source) for sources in categories.testable_by_project.values() for source in sources
+        }
+        table = cls()
+        for language_info in categories.by_language.values():
+            for source in language_info.sources:
+                container_info = _get_unrendered_container_info(source, language_info.test_info)
+                image = container_info.image if container_info is not None else None
+                table.append(source, id(source) in testable_ids, image=image)
+
+        return table
+
+    def append(self, source: CoreSource, is_testable: bool, image: Optional[str] = None) -> None:
+        """
+        Add a source to the end of the table
+
+        :param source: source object
+        :param is_testable: whether the source is testable
+        :param image: container image of the source. Default is to get it from the
+            source's test information, which renders it if the source is lazy
+        """
+
+        if image is None:
+            image = source.test_info.container_info.image
+
+        values = {
+            "language": source.language,
+            "path": source.path,
+            "project_type": source.project_type,
+            "extension": source.extension,
+            "image": image,
+        }
+        for column, value in values.items():
+            self._codes[column].append(self._dictionaries[column].encode(value))
+
+        self.filenames.append(source.filename)
+        self.testable.append(int(is_testable))
+
+        # Keep the testinfo string of a lazy source that has not been rendered yet, so
+        # that sources in the same directory share one entry
+        test_info = source.unrendered_test_info
+        if test_info is None:
+            test_info = source.test_info
+
+        self._test_info_codes.append(self._test_infos.encode(test_info))
+        self._source_cls_codes.append(self._source_classes.encode(type(source)))
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    def get_value(self, row: int, column: str) -> str:
+        """
+        Get the value of a column for a row
+
+        :param row: row number
+        :param column: column name. One of :const:`COLUMNS`
+        :return: value
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        return self._dictionaries[_check_column(column)].values[self._codes[column][row]]
+
+    def get_values(self, column: str) -> list[str]:
+        """
+        Get the distinct values of a column
+
+        :param column: column name. One of :const:`COLUMNS`
+        :return: distinct values in the order that they were first added
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        return list(self._dictionaries[_check_column(column)].values)
+
+    def select(self, testable: Optional[bool] = None, **criteria: str) -> array:
+        """
+        Select rows that match all of the criteria
+
+        :param testable: optional testable flag to match
+        :param criteria: column name and value to match -- e.g., ``language="python"``
+        :return: array of matching row numbers
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        conditions = []
+        for column, value in criteria.items():
+            code = self._dictionaries[_check_column(column)].codes.get(value)
+            if code is None:
+                return array("I")
+
+            conditions.append((self._codes[column], code))
+
+        if testable is not None:
+            conditions.append((self.testable, int(testable)))
+
+        rows = range(len(self))
+        for codes, code in conditions:
+            rows = [row for row in rows if codes[row] == code]
+
+        return array("I", rows)
+
+    def filter(self, testable: Optional[bool] = None, **criteria: str) -> SourceTable:
+        """
+        Create a table of the rows that match all of the criteria
+
+        :param testable: optional testable flag to match
+        :param criteria: column name and value to match -- e.g., ``language="python"``
+        :return: a new SourceTable object
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        rows = self.select(testable, **criteria)
+        table = SourceTable()
+        table._dictionaries = self._dictionaries
+        table._test_infos = self._test_infos
+        table._source_classes = self._source_classes
+        table.filenames = [self.filenames[row] for row in rows]
+        table.testable = array("b", (self.testable[row] for row in rows))
+        table._codes = {
+            column: array("I", (codes[row] for row in rows))
+            for column, codes in self._codes.items()
+        }
+        table._test_info_codes = array("I", (self._test_info_codes[row] for row in rows))
+        table._source_cls_codes = array("I", (self._source_cls_codes[row] for row in rows))
+        return table
+
+    def count_by(self, column: str) -> dict[str, int]:
+        """
+        Count the rows for each value of a column
+
+        :param column: column name. One of :const:`COLUMNS`
+        :return: dictionary whose key is the value and whose value is the number of
+            rows, in the order that the values were first added
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        counts = Counter(self._codes[_check_column(column)])
+        values = self._dictionaries[column].values
+        return {values[code]: counts[code] for code in sorted(counts)}
+
+    def group_rows(self, column: str, rows: Optional[Iterable[int]] = None) -> dict[str, array]:
+        """
+        Group rows by the value of a column
+
+        :param column: column name. One of :const:`COLUMNS`
+        :param rows: optional rows to group. Default is all rows
+        :return: dictionary whose key is the value and whose value is an array of row
+            numbers, in the order that the values were first added
+        :raises: :exc:`ValueError` if unknown column
+        """
+
+        codes = self._codes[_check_column(column)]
+        groups: dict[int, array] = {}
+        for row in range(len(self)) if rows is None else rows:
+            groups.setdefault(codes[row], array("I")).append(row)
+
+        values = self._dictionaries[column].values
+        return {values[code]: groups[code] for code in sorted(groups)}
+
+    def get_source(self, row: int, source_cls: Optional[type] = None) -> CoreSource:
+        """
+        Create the source object for a row. Test information that was already parsed
+        is reused, and test information of lazy sources stays lazy
+
+        :param row: row number
+        :param source_cls: optional source object class. Default is the class of the
+            source that the row was added from
+        :return: source object
+        """
+
+        if source_cls is None:
+            source_cls = self._source_classes.values[self._source_cls_codes[row]]
+
+        args = (
+            self.filenames[row],
+            self.get_value(row, "language"),
+            self.get_value(row, "path"),
+        )
+        project_type = self.get_value(row, "project_type")
+        test_info = self._test_infos.values[self._test_info_codes[row]]
+        if isinstance(test_info, TestInfo):
+            return source_cls.from_test_info(*args, test_info, project_type)
+
+        return source_cls.from_string_lazy(*args, test_info, project_type)
+
+    def to_sources(
+        self, rows: Optional[Iterable[int]] = None, source_cls: Optional[type] = None
+    ) -> list[CoreSource]:
+        """
+        Create source objects
+
+        :param rows: optional rows to create. Default is all rows
+        :param source_cls: optional source object class. Default is the class of the
+            source that each row was added from
+        :return: list of source objects
+        """
+
+        return [
+            self.get_source(row, source_cls) for row in (range(len(self)) if rows is None else rows)
+        ]
+
+    @property
+    def testable_by_project(self) -> Mapping[str, list[CoreSource]]:
+        """
+        Get a view of the testable sources by project type. Unlike
+        :attr:`CoreSourceCategories.testable_by_project`, only project types that
+        have testable sources are included. Source objects of the same class as the
+        ones that were added are created each time a project type is looked up
+
+        :return: mapping whose key is the project type and whose value is a list of
+            source objects
+        """
+
+        return _SourceGroups(self, self.group_rows("project_type", self.select(testable=True)))
+
+    @property
+    def by_language(self) -> Mapping[str, list[CoreSource]]:
+        """
+        Get a view of the sources by language. Source objects of the same class as the
+        ones that were added are created each time a language is looked up
+
+        :return: mapping whose key is the language and whose value is a list of source
+            objects
+        """
+
+        return _SourceGroups(self, self.group_rows("language"))
+
+
+class _SourceGroups(Mapping):
+    def __init__(self, table: SourceTable, groups: dict[str, array]) -> None:
+        self._table = table
+        self._groups = groups
+
+    def __getitem__(self, key: str) -> list[CoreSource]:
+        return self._table.to_sources(self._groups[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._groups)
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+
+class _Dictionary:
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.codes: dict[Any, int] = {}
+
+    def encode(self, value: Union[str, TestInfo, type]) -> int:
+        # TestInfo objects are shared rather than hashed, so they are keyed by identity.
+        # So are source classes
+        key = value if isinstance(value, str) else id(value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(value)
+
+        return code
+
+
+def _check_column(column: str) -> str:
+    if column not in COLUMNS:
+        raise ValueError(f'Unknown column "{column}"')
+
+    return column
+
+
+__all__ = ["COLUMNS", "SourceTable"]
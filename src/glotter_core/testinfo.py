@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import hashlib
+import re
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
 
-import yaml
-from jinja2 import BaseLoader, Environment
+from .cache import CacheStats, LRUCache
+from .project import _SLOTS, CoreProjectMixin, NamingScheme, get_project_name_table
+from .trace import trace_span
+from .yml import load_yaml, load_yaml_with_nodes
 
-from .project import CoreProjectMixin, NamingScheme
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+    from yaml.nodes import Node
 
+DEFAULT_TEMPLATE_CACHE_SIZE = 1024
+DEFAULT_INTERN_CACHE_SIZE = 4096
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, **_SLOTS)
 class ContainerInfo:
     """Configuration for a container to run for a directory
 
@@ -34,17 +45,18 @@ class ContainerInfo:
         :param dictionary: the dictionary representing ContainerInfo
         :return: a new ContainerInfo object
         """
-        image = dictionary.get("image", "")
-        tag = dictionary.get("tag", "")
+        # Images and tags are repeated across languages, so share one copy of each
+        image = _intern_string(dictionary.get("image", ""))
+        tag = _intern_string(dictionary.get("tag", ""))
         cmd = dictionary.get("cmd", "")
         build = dictionary.get("build")
-        return ContainerInfo(image=image, tag=tag, cmd=cmd, build=build)
+        return intern_info(ContainerInfo(image=image, tag=tag, cmd=cmd, build=build))
 
     def __bool__(self) -> bool:
         return bool(self.image and self.tag and self.cmd)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class FolderInfo:
     """Metadata about sources in a directory
 
@@ -77,11 +89,11 @@ class FolderInfo:
         :param include_extension: whether to include the extension in the source name
         :return: a dict where the key is a project type and the value is the source name
         """
-        extension = self.extension if include_extension else ""
-        return {
-            project_type: f"{project.get_project_name_by_scheme(self.naming)}{extension}"
-            for project_type, project in projects.items()
-        }
+        names = get_project_name_table(projects).get_names(self.naming)
+        if not include_extension:
+            return dict(names)
+
+        return {project_type: f"{name}{self.extension}" for project_type, name in names.items()}
 
     @classmethod
     def from_dict(cls, dictionary: dict[str, str]) -> FolderInfo:
@@ -91,10 +103,10 @@ class FolderInfo:
         :param dictionary: the dictionary representing FileInfo
         :return: a new FileInfo
         """
-        return FolderInfo(dictionary["extension"], dictionary["naming"])
+        return intern_info(FolderInfo(dictionary["extension"], dictionary["naming"]))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class TestInfo:
     """An object representation of a testinfo file
 
@@ -127,14 +139,16 @@ class TestInfo:
         :param language: language of source object
         :return: a new TestInfo object
         """
-        language_display_name = dictionary.get(
-            "language_display_name", _get_language_display_name(language)
+        language_display_name = _intern_string(
+            dictionary.get("language_display_name", _get_language_display_name(language))
         )
-        return TestInfo(
-            container_info=ContainerInfo.from_dict(dictionary.get("container", {})),
-            file_info=FolderInfo.from_dict(dictionary["folder"]),
-            language_display_name=language_display_name,
-            notes=dictionary.get("notes", []),
+        return intern_info(
+            TestInfo(
+                container_info=ContainerInfo.from_dict(dictionary.get("container", {})),
+                file_info=FolderInfo.from_dict(dictionary["folder"]),
+                language_display_name=language_display_name,
+                notes=dictionary.get("notes", []),
+            )
         )
 
     @classmethod
@@ -148,10 +162,12 @@ class TestInfo:
         :param language: language of source
         :return: a new TestInfo
         """
-        template = Environment(loader=BaseLoader).from_string(string)
-        template_string = template.render(source=source)
-        info_yaml = yaml.safe_load(template_string)
-        return cls.from_dict(info_yaml, source.language)
+        with trace_span("render"):
+            template_string = get_template(string).render(source=source)
+
+        with trace_span("parse"):
+            info_yaml = load_yaml(template_string)
+            return cls.from_dict(info_yaml, source.language)
 
     @property
     def is_testable(self) -> bool:
@@ -164,6 +180,443 @@ class TestInfo:
         return bool(self.container_info)
 
 
+_TEMPLATE_CACHE = LRUCache(maxsize=DEFAULT_TEMPLATE_CACHE_SIZE)
+
+
+def get_template(string: str) -> Template:
+    """
+    Get a compiled Jinja2 template for a string. Compiled templates are shared by all
+    callers in the process and are keyed by a hash of the string contents, so
+    identical testinfo files share one compiled template
+
+    :param string: template contents
+    :return: compiled template
+    """
+
+    key = hashlib.sha256(string.encode("utf-8")).digest()
+    return _TEMPLATE_CACHE.get_or_create(key, lambda: _get_environment().from_string(string))
+
+
+@lru_cache(maxsize=None)
+def _get_environment() -> Environment:
+    # Jinja2 is imported on first use because it is slow to import
+    from jinja2 import BaseLoader, Environment  # noqa: PLC0415
+
+    return Environment(loader=BaseLoader)
+
+
+def get_template_cache_stats() -> CacheStats:
+    """
+    Get statistics for the compiled template cache
+
+    :return: CacheStats object
+    """
+
+    return _TEMPLATE_CACHE.stats
+
+
+def clear_template_cache() -> None:
+    """Remove all compiled templates and TestInfoTemplate objects, and reset the
+    template cache statistics"""
+
+    _TEMPLATE_CACHE.clear()
+    _TEST_INFO_TEMPLATE_CACHE.clear()
+
+
+def set_template_cache_size(maxsize: Optional[int]) -> None:
+    """
+    Set the maximum number of compiled templates and TestInfoTemplate objects to keep
+
+    :param maxsize: maximum number of templates. ``None`` means unbounded
+    """
+
+    _TEMPLATE_CACHE.resize(maxsize)
+    _TEST_INFO_TEMPLATE_CACHE.resize(maxsize)
+
+
+class TestInfoTemplate:
+    """
+    A testinfo file that is parsed once and then rendered for each source. Use
+    :func:`get_test_info_template` to get a template that is shared by all callers
+    with the same testinfo file
+
+    Only the string fields that contain Jinja2 syntax (usually ``container.cmd`` and
+    ``container.build``) are rendered for each source, and nothing is parsed again. A
+    file without any Jinja2 syntax is not rendered at all. If Jinja2 syntax appears
+    outside of a single-line string field (e.g., a loop that produces YAML keys), or if
+    a rendered field would change how the whole rendered file is parsed (e.g., it
+    contains a quote), the whole file is rendered and parsed by
+    :meth:`TestInfo.from_string`, so the result is always the same as that of
+    :meth:`TestInfo.from_string`
+
+    :param string: contents of a testinfo file
+    """
+
+    __test__ = False  # Indicate this is not a test
+
+    def __init__(self, string: str) -> None:
+        self.string = string
+        self._data: Any = None
+        self._error: Optional[Exception] = None
+        self._fields: Optional[list[_TemplatedField]] = None
+        self._template: Optional[Template] = None
+        try:
+            self._data, node = load_yaml_with_nodes(string)
+        except Exception as e:
+            # The whole file may still be valid YAML once it is rendered
+            self._error = e
+            return
+
+        self._fields = _find_templated_fields(string, node, self._data)
+
+    @property
+    def data(self) -> Any:
+        """
+        Get the contents of the testinfo file without rendering it
+
+        :return: parsed contents
+        :raises: the YAML error if the testinfo file is not valid YAML before it is
+            rendered
+        """
+
+        if self._error is not None:
+            raise self._error
+
+        return self._data
+
+    @property
+    def is_static(self) -> bool:
+        """
+        Indicate if the test information is the same for every source in a language
+        because the testinfo file does not contain any Jinja2 syntax
+
+        :return: True if the testinfo file does not need to be rendered, False
+            otherwise
+        """
+
+        return self._fields == []
+
+    @property
+    def has_static_testability(self) -> bool:
+        """
+        Indicate if every source in a language is testable exactly when the unrendered
+        testinfo file is, so that testability is known without rendering. That is the
+        case when ``container.image`` and ``container.tag`` do not contain any Jinja2
+        syntax, and ``container.cmd`` either does not contain any or contains text
+        other than whitespace and only ``{{ }}`` expressions
+
+        :return: True if testability does not depend on the source, False otherwise
+        """
+
+        if self._fields is None:
+            return False
+
+        for templated_field in self._fields:
+            if templated_field.path in _TESTABILITY_PATHS:
+                return False
+
+            if templated_field.path == _CMD_PATH and not _has_literal_text(
+                templated_field.template
+            ):
+                return False
+
+        return True
+
+    def render(self, source) -> TestInfo:
+        """
+        Create a TestInfo object for a source
+
+        :param source: a source object to use for jinja2 template rendering
+        :return: TestInfo object that is equal to the one that
+            :meth:`TestInfo.from_string` would create
+        """
+
+        if self._fields is None:
+            return TestInfo.from_string(self.string, source)
+
+        data = self._data
+        if self._fields:
+            if self._template is None:
+                # Compile the fields together when they are first rendered
+                try:
+                    self._template = get_template(
+                        _FIELD_SEPARATOR.join(
+                            templated_field.template for templated_field in self._fields
+                        )
+                    )
+                except Exception:
+                    # Let the whole file report the error
+                    self._fields = None
+                    return TestInfo.from_string(self.string, source)
+
+            with trace_span("render"):
+                values = self._template.render(source=source).split(_FIELD_SEPARATOR)
+
+            if len(values) != len(self._fields):
+                return TestInfo.from_string(self.string, source)
+
+            for templated_field, value in zip(self._fields, values):
+                if not _is_verbatim(value, templated_field.style):
+                    return TestInfo.from_string(self.string, source)
+
+                data = _replace_value(data, templated_field.path, value)
+
+        return TestInfo.from_dict(data, source.language)
+
+
+@dataclass(frozen=True)
+class _TemplatedField:
+    path: tuple[Any, ...]
+    template: str
+    style: str
+
+
+_TEST_INFO_TEMPLATE_CACHE = LRUCache(maxsize=DEFAULT_TEMPLATE_CACHE_SIZE)
+
+# Separates the templated fields when they are rendered together. YAML does not allow
+# this character to appear literally, and fields that contain it (e.g., from a "\0"
+# escape) are not rendered separately
+_FIELD_SEPARATOR = "\0"
+_SYNTAX_RE = re.compile(r"\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}", re.DOTALL)
+_SYNTAX_STARTS = ("{{", "{%", "{#")
+# A source is testable when these fields are not empty
+_TESTABILITY_PATHS = (("container", "image"), ("container", "tag"))
+_CMD_PATH = ("container", "cmd")
+# Whitespace control removes whitespace outside of the field
+_WHITESPACE_CONTROL = ("{{-", "{%-", "{#-", "-}}", "-%}", "-#}")
+_BLOCK_STYLES = ("|", ">")
+_PLAIN_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
+
+
+def get_test_info_template(string: str) -> TestInfoTemplate:
+    """
+    Get the TestInfoTemplate object for the contents of a testinfo file. Objects are
+    shared by all callers in the process and are keyed by a hash of the contents
+
+    :param string: contents of a testinfo file
+    :return: TestInfoTemplate object
+    """
+
+    key = hashlib.sha256(string.encode("utf-8")).digest()
+    return _TEST_INFO_TEMPLATE_CACHE.get_or_create(key, lambda: TestInfoTemplate(string))
+
+
+def _find_templated_fields(
+    string: str, node: Optional[Node], data: Any
+) -> Optional[list[_TemplatedField]]:
+    # Find the string fields with Jinja2 syntax. Return None if the fields cannot be
+    # rendered separately. That is the case when the Jinja2 syntax in the file is not
+    # exactly the Jinja2 syntax in the fields (e.g., syntax in a key, comment, or
+    # aliased node, or an escape sequence inside an expression), or when a field is
+    # not a complete template by itself (e.g., a loop that spans several fields)
+    if any(syntax in string for syntax in _WHITESPACE_CONTROL):
+        return None
+
+    fields: list[_TemplatedField] = []
+    if node is not None and not _walk_nodes(node, data, (), fields):
+        return None
+
+    syntax = [
+        match
+        for templated_field in fields
+        for match in _SYNTAX_RE.findall(templated_field.template)
+    ]
+    if syntax != _SYNTAX_RE.findall(string):
+        return None
+
+    for templated_field in fields:
+        # Block scalars would be folded differently once rendered
+        template = templated_field.template
+        if (
+            templated_field.style in _BLOCK_STYLES
+            or _FIELD_SEPARATOR in template
+            or not template.isprintable()
+            or (("{%" in template or "{#" in template) and not _is_complete_template(template))
+        ):
+            return None
+
+    return fields
+
+
+def _has_literal_text(template: str) -> bool:
+    # Text outside of expressions is rendered as is, so the field is never empty
+    if any(not match.startswith("{{") for match in _SYNTAX_RE.findall(template)):
+        return False
+
+    text = _SYNTAX_RE.sub("", template)
+    return bool(text.strip()) and not any(start in text for start in _SYNTAX_STARTS)
+
+
+def _is_complete_template(template: str) -> bool:
+    try:
+        _get_environment().parse(template)
+    except Exception:
+        return False
+
+    return True
+
+
+def _walk_nodes(
+    node: Node, data: Any, path: tuple[Any, ...], fields: list[_TemplatedField]
+) -> bool:
+    from yaml.nodes import MappingNode, ScalarNode, SequenceNode  # noqa: PLC0415
+
+    if isinstance(node, ScalarNode):
+        if isinstance(data, str) and any(start in data for start in _SYNTAX_STARTS):
+            # Line breaks inside a scalar are folded, which would remove leading
+            # whitespace from a rendered expression at the start of a line
+            if node.start_mark.line != node.end_mark.line:
+                return False
+
+            fields.append(_TemplatedField(path, data, node.style or ""))
+
+        return True
+
+    if isinstance(node, SequenceNode):
+        return (
+            isinstance(data, list)
+            and len(data) == len(node.value)
+            and all(
+                _walk_nodes(item_node, item, (*path, index), fields)
+                for index, (item_node, item) in enumerate(zip(node.value, data))
+            )
+        )
+
+    # Mappings with merge keys, duplicate keys, or keys that are not strings are not
+    # supported
+    return (
+        isinstance(node, MappingNode)
+        and isinstance(data, dict)
+        and len(data) == len(node.value)
+        and all(
+            isinstance(key_node, ScalarNode)
+            and key_node.value == key
+            and _walk_nodes(value_node, value, (*path, key), fields)
+            for (key_node, value_node), (key, value) in zip(node.value, data.items())
+        )
+    )
+
+
+def _is_verbatim(value: str, style: str) -> bool:
+    # Check if a rendered field has the same value when the whole file is rendered
+    # and parsed. Characters that end or escape a quoted scalar, or that end,
+    # comment, or change the type of a plain scalar, are not
+    if not value.isprintable():
+        return False
+
+    if style == '"':
+        return '"' not in value and "\\" not in value
+
+    if style == "'":
+        return "'" not in value
+
+    return (
+        value == value.strip()
+        and value[:1] not in _PLAIN_INDICATORS
+        and not value.endswith(":")
+        and ": " not in value
+        and " #" not in value
+        and not any(char in value for char in ",[]{}")
+        and _resolve_plain_scalar(value) == "tag:yaml.org,2002:str"
+    )
+
+
+def _resolve_plain_scalar(value: str) -> str:
+    from yaml.nodes import ScalarNode  # noqa: PLC0415
+
+    return _get_resolver().resolve(ScalarNode, value, (True, False))
+
+
+@lru_cache(maxsize=None)
+def _get_resolver() -> Any:
+    from yaml.resolver import Resolver  # noqa: PLC0415
+
+    return Resolver()
+
+
+def _replace_value(data: Any, path: tuple[Any, ...], value: str) -> Any:
+    # Copy the containers along the path, so the parsed file is not modified
+    if not path:
+        return value
+
+    key, *rest = path
+    copy = list(data) if isinstance(data, list) else dict(data)
+    copy[key] = _replace_value(data[key], tuple(rest), value)
+    return copy
+
+
+_INTERN_CACHE = LRUCache(maxsize=DEFAULT_INTERN_CACHE_SIZE)
+_Info = TypeVar("_Info", ContainerInfo, FolderInfo, TestInfo)
+
+
+def intern_info(info: _Info) -> _Info:
+    """
+    Get the shared instance that is equal to a ContainerInfo, FolderInfo, or TestInfo
+    object. The ``from_dict`` methods use this, so equal objects created from testinfo
+    files share one instance. Since shared objects may be referenced by many sources,
+    they (including the ``notes`` list) must not be modified
+
+    :param info: ContainerInfo, FolderInfo, or TestInfo object
+    :return: shared object that is equal to ``info``. If the object cannot be hashed
+        (e.g., ``notes`` contains a dictionary), ``info`` is returned
+    """
+
+    try:
+        return _INTERN_CACHE.get_or_create(_get_intern_key(info), lambda: info)
+    except TypeError:
+        return info
+
+
+def _get_intern_key(info: _Info) -> tuple[Any, ...]:
+    # 1 == 1.0 == True and they have the same hash, so include the type of every value.
+    # Otherwise, "tag: 1.0" could be replaced by a shared object with "tag: 1"
+    if isinstance(info, ContainerInfo):
+        values = (info.image, info.tag, info.cmd, info.build)
+        return (ContainerInfo, *((type(value), value) for value in values))
+
+    if isinstance(info, FolderInfo):
+        return (FolderInfo, (type(info.extension), info.extension), info.naming)
+
+    return (
+        TestInfo,
+        _get_intern_key(info.container_info),
+        _get_intern_key(info.file_info),
+        (type(info.language_display_name), info.language_display_name),
+        tuple((type(note), note) for note in info.notes),
+    )
+
+
+def _intern_string(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def get_intern_cache_stats() -> CacheStats:
+    """
+    Get statistics for the shared ContainerInfo, FolderInfo, and TestInfo objects.
+    The hit ratio is the fraction of objects that were replaced by a shared object
+
+    :return: CacheStats object
+    """
+
+    return _INTERN_CACHE.stats
+
+
+def clear_intern_cache() -> None:
+    """Forget the shared objects and reset the statistics"""
+
+    _INTERN_CACHE.clear()
+
+
+def set_intern_cache_size(maxsize: Optional[int]) -> None:
+    """
+    Set the maximum number of shared objects to keep
+
+    :param maxsize: maximum number of objects. ``None`` means unbounded
+    """
+
+    _INTERN_CACHE.resize(maxsize)
+
+
 LANGUAGE_TEXT_TO_SYMBOL = {"plus": "+", "sharp": "#", "star": "*"}
 
 
@@ -176,4 +629,20 @@ def _get_language_display_name(language: str) -> str:
     return separator.join(tokens).title()
 
 
-__all__ = ["ContainerInfo", "FolderInfo", "TestInfo"]
+__all__ = [
+    "DEFAULT_INTERN_CACHE_SIZE",
+    "DEFAULT_TEMPLATE_CACHE_SIZE",
+    "ContainerInfo",
+    "FolderInfo",
+    "TestInfo",
+    "TestInfoTemplate",
+    "clear_intern_cache",
+    "clear_template_cache",
+    "get_intern_cache_stats",
+    "get_template",
+    "get_template_cache_stats",
+    "get_test_info_template",
+    "intern_info",
+    "set_intern_cache_size",
+    "set_template_cache_size",
+]
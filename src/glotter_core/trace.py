@@ -0,0 +1,269 @@
+"""Opt-in timing of scan phases"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, Optional
+
+DIRECTORY = "directory"
+PHASE = "phase"
+
+
+@dataclass(frozen=True)
+class TraceSpan:
+    """A timed span
+
+    :ivar name: name of the span (e.g., ``parse``)
+    :ivar category: :const:`PHASE` or :const:`DIRECTORY`
+    :ivar start: start time in nanoseconds (:func:`time.perf_counter_ns`)
+    :ivar duration: duration in nanoseconds, including nested spans
+    :ivar self_duration: duration in nanoseconds, excluding nested spans
+    :ivar thread_id: ID of the thread that the span ran in
+    :ivar args: additional information (e.g., the directory path)
+    """
+
+    name: str
+    category: str
+    start: int
+    duration: int
+    self_duration: int
+    thread_id: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class Tracer:
+    """Collect timed spans and counters. Pass a tracer to
+    :func:`~glotter_core.source.categorize_sources` or
+    :class:`~glotter_core.settings.CoreSettings`, or enable it for a block of code with
+    :func:`tracing`. When no tracer is enabled, tracing costs one context variable
+    lookup per span
+
+    Spans are only collected in the process and context where the tracer is enabled,
+    so directories that are categorized in other processes (``jobs`` greater than 1)
+    are not timed individually.
+
+    :ivar spans: list of TraceSpan objects in the order that they finished
+    :ivar counters: counters (e.g., cache hits) by name
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[TraceSpan] = []
+        self.counters: Counter[str] = Counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = PHASE, **args: Any) -> Iterator[None]:
+        """
+        Time a block of code
+
+        :param name: name of the span
+        :param category: :const:`PHASE` or :const:`DIRECTORY`
+        :param args: additional information to record
+        """
+
+        stack = self._get_stack()
+        stack.append(0)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            child_duration = stack.pop()
+            if stack:
+                stack[-1] += duration
+
+            span = TraceSpan(
+                name=name,
+                category=category,
+                start=start,
+                duration=duration,
+                self_duration=duration - child_duration,
+                thread_id=threading.get_ident(),
+                args=args,
+            )
+            with self._lock:
+                self.spans.append(span)
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Increment a counter
+
+        :param name: name of the counter
+        :param n: amount to increment by
+        """
+
+        with self._lock:
+            self.counters[name] += n
+
+    def summary(self, num_slowest: int = 10) -> dict[str, Any]:
+        """
+        Summarize the spans and counters
+
+        :param num_slowest: number of slowest directories to include
+        :return: dictionary with the following items:
+
+            - ``phases``: dictionary whose key is the span name and whose value is a
+              dictionary with the ``count``, ``total`` seconds (including nested
+              spans), and ``self`` seconds (excluding nested spans)
+            - ``counters``: dictionary of counters
+            - ``slowest_directories``: list of ``(path, seconds)`` tuples, slowest
+              first
+        """
+
+        phases: dict[str, dict[str, Any]] = {}
+        for span in self.spans:
+            phase = phases.setdefault(span.name, {"count": 0, "total": 0.0, "self": 0.0})
+            phase["count"] += 1
+            phase["total"] += span.duration / 1e9
+            phase["self"] += span.self_duration / 1e9
+
+        directories = sorted(
+            (span for span in self.spans if span.category == DIRECTORY),
+            key=lambda span: span.duration,
+            reverse=True,
+        )
+        return {
+            "phases": phases,
+            "counters": dict(self.counters),
+            "slowest_directories": [
+                (span.args.get("path", span.name), span.duration / 1e9)
+                for span in directories[:num_slowest]
+            ],
+        }
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """
+        Convert the spans and counters to the Chrome trace event format, which can
+        be opened in a trace viewer such as Perfetto or ``chrome://tracing``
+
+        :return: dictionary that can be written as JSON
+        """
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": span.duration / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.args,
+            }
+            for span in self.spans
+        ]
+        if self.counters and self.spans:
+            end = max(span.start + span.duration for span in self.spans)
+            events.append(
+                {
+                    "name": "counters",
+                    "ph": "C",
+                    "ts": end / 1000,
+                    "pid": pid,
+                    "args": dict(self.counters),
+                }
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        """
+        Write the spans and counters to a file in the Chrome trace event format
+
+        :param path: path to file
+        """
+
+        Path(path).write_text(json.dumps(self.to_chrome_trace()), encoding="utf-8")
+
+    def _get_stack(self) -> list[int]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+
+_CURRENT_TRACER: ContextVar[Optional[Tracer]] = ContextVar("glotter_core_tracer", default=None)
+_NULL_SPAN = nullcontext()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """
+    Get the tracer that is enabled in the current context
+
+    :return: Tracer object. ``None`` if tracing is not enabled
+    """
+
+    return _CURRENT_TRACER.get()
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer]) -> Iterator[Optional[Tracer]]:
+    """
+    Enable a tracer for a block of code
+
+    :param tracer: Tracer object. ``None`` leaves the current tracer enabled
+    :return: the tracer that is enabled
+    """
+
+    if tracer is None:
+        yield _CURRENT_TRACER.get()
+        return
+
+    token = _CURRENT_TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _CURRENT_TRACER.reset(token)
+
+
+def trace_span(name: str, category: str = PHASE, **args: Any) -> ContextManager[None]:
+    """
+    Time a block of code with the enabled tracer, if any
+
+    :param name: name of the span
+    :param category: :const:`PHASE` or :const:`DIRECTORY`
+    :param args: additional information to record
+    :return: context manager
+    """
+
+    tracer = _CURRENT_TRACER.get()
+    if tracer is None:
+        return _NULL_SPAN
+
+    return tracer.span(name, category, **args)
+
+
+def trace_count(name: str, n: int = 1) -> None:
+    """
+    Increment a counter of the enabled tracer, if any
+
+    :param name: name of the counter
+    :param n: amount to increment by
+    """
+
+    tracer = _CURRENT_TRACER.get()
+    if tracer is not None:
+        tracer.count(name, n)
+
+
+__all__ = [
+    "DIRECTORY",
+    "PHASE",
+    "TraceSpan",
+    "Tracer",
+    "get_tracer",
+    "trace_count",
+    "trace_span",
+    "tracing",
+]
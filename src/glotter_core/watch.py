@@ -0,0 +1,480 @@
+"""Watch a source directory and keep its categories up to date"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .project import CoreProjectMixin
+from .source import (
+    CoreSource,
+    CoreSourceCategories,
+    _categorize_directory,
+    _CategorizeOptions,
+    _DirectoryResult,
+    _merge_directory_results,
+)
+
+_TEST_INFO_FILENAMES = ("testinfo.yml", "untestable.yml")
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SourceChanges:
+    """
+    Changes to the sources since the last check
+
+    :ivar added: list of source objects that were added
+    :ivar removed: list of source objects that were removed
+    :ivar changed: list of source objects whose information changed (e.g., because
+        ``testinfo.yml`` changed). These are the new source objects
+    :ivar added_bad_sources: list of filenames that no longer belong to a project
+    :ivar removed_bad_sources: list of filenames that are no longer bad sources
+    :ivar errors: dictionary whose key is a directory and whose value is the error that
+        occurred when categorizing it. The previous information for the directory is kept
+    """
+
+    added: list[CoreSource] = field(default_factory=list)
+    removed: list[CoreSource] = field(default_factory=list)
+    changed: list[CoreSource] = field(default_factory=list)
+    added_bad_sources: list[str] = field(default_factory=list)
+    removed_bad_sources: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added
+            or self.removed
+            or self.changed
+            or self.added_bad_sources
+            or self.removed_bad_sources
+            or self.errors
+        )
+
+
+class SourceWatcher:
+    """Keep a :class:`~glotter_core.source.CoreSourceCategories` object up to date as
+    files change. Only directories whose file listing or ``testinfo.yml``/``untestable.yml``
+    file changed are categorized again.
+
+    Changes are found either by polling (comparing :func:`os.scandir` snapshots) or, on
+    Linux, with inotify. If a directory cannot be watched with inotify (e.g., because
+    the limit on the number of watches is reached), the watcher falls back to polling.
+
+    When the watcher is started, errors raised while checking for changes, including
+    errors raised by the callback, are logged and watching continues.
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param callback: function called with a :class:`SourceChanges` object whenever
+        sources change. When the watcher is started, it is called from the watcher
+        thread
+    :param interval: maximum number of seconds to wait for changes in each check
+    :param backend: ``"polling"``, ``"inotify"``, or ``"auto"``. ``"auto"`` uses inotify
+        if it is available and can be initialized, and polling otherwise
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :raises: :exc:`ValueError` if invalid backend
+
+    :ivar categories: CoreSourceCategories object that is kept up to date
+    :ivar backend: name of the backend being used
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        path: str,
+        projects: dict[str, CoreProjectMixin],
+        source_cls: type,
+        callback: Callable[[SourceChanges], None],
+        *,
+        interval: float = 1.0,
+        backend: str = "auto",
+        lazy: bool = False,
+    ) -> None:
+        self._root = str(path)
+        self._projects = projects
+        self._callback = callback
+        self._interval = interval
+        self._options = _CategorizeOptions(
+            orig_path=Path(path).resolve(), projects=projects, source_cls=source_cls, lazy=lazy
+        )
+        self._backend = _create_backend(backend)
+        self.backend = self._backend.name
+        self._signatures: dict[str, tuple] = {}
+        self._subdirs: dict[str, list[str]] = {}
+        self._results: dict[str, _DirectoryResult] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.categories = CoreSourceCategories()
+        self._refresh(self._root, recursive=True, changes=SourceChanges())
+        self._update_categories()
+
+    def poll(self, timeout: float = 0.0) -> SourceChanges:
+        """
+        Wait for changes, apply them to the categories, and call the callback if there
+        are any changes
+
+        :param timeout: maximum number of seconds to wait for changes
+        :return: SourceChanges object
+        """
+
+        changes = SourceChanges()
+        dirty = self._backend.wait(timeout)
+        if dirty is None:
+            self._refresh(self._root, recursive=True, changes=changes)
+        else:
+            for root in sorted(dirty):
+                if root == self._root or root in self._signatures:
+                    self._refresh(root, recursive=False, changes=changes)
+
+        if changes:
+            self._update_categories()
+            self._callback(changes)
+
+        return changes
+
+    def start(self) -> None:
+        """Start watching in a background thread"""
+
+        if self._thread is not None:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="glotter-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and release the backend resources"""
+
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._backend.close()
+
+    def __enter__(self) -> SourceWatcher:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.poll(self._interval)
+            except Exception:
+                # E.g., the callback raised. Keep watching rather than let the
+                # thread die silently
+                _logger.exception("Error while watching %s", self._root)
+
+    def _refresh(self, root: str, recursive: bool, changes: SourceChanges) -> None:
+        # Watch a new directory before scanning it, so that changes made while it is
+        # being scanned are not missed
+        if root not in self._signatures:
+            self._watch(root)
+
+        try:
+            files, subdirs, signature = _scan_directory(root)
+        except (FileNotFoundError, NotADirectoryError):
+            self._forget(root, changes)
+            return
+
+        if self._signatures.get(root) != signature:
+            self._signatures[root] = signature
+            self._update_result(root, files, changes)
+
+        old_subdirs = self._subdirs.get(root, [])
+        self._subdirs[root] = subdirs
+        for subdir in set(old_subdirs) - set(subdirs):
+            self._forget(subdir, changes)
+
+        for subdir in subdirs:
+            if recursive or subdir not in self._signatures:
+                self._refresh(subdir, recursive, changes)
+
+    def _watch(self, root: str) -> None:
+        try:
+            self._backend.watch(root)
+        except (FileNotFoundError, NotADirectoryError):
+            # The directory is gone, which scanning it finds
+            pass
+        except OSError:
+            # E.g., the limit on the number of inotify watches is reached. Polling
+            # checks every directory, so nothing is missed
+            self._backend.close()
+            self._backend = _PollingBackend()
+            self.backend = self._backend.name
+
+    def _forget(self, root: str, changes: SourceChanges) -> None:
+        self._backend.unwatch(root)
+        self._signatures.pop(root, None)
+        self._set_result(root, None, changes)
+        for subdir in self._subdirs.pop(root, []):
+            self._forget(subdir, changes)
+
+    def _update_result(self, root: str, files: list[str], changes: SourceChanges) -> None:
+        result = None
+        if any(filename in files for filename in _TEST_INFO_FILENAMES):
+            try:
+                result = _categorize_directory(root, files, self._options)
+            except Exception as e:
+                changes.errors[root] = str(e)
+                return
+
+        self._set_result(root, result, changes)
+
+    def _set_result(
+        self, root: str, result: Optional[_DirectoryResult], changes: SourceChanges
+    ) -> None:
+        old_result = self._results.pop(root, None)
+        if result is not None:
+            self._results[root] = result
+
+        old_sources = _get_sources_by_path(old_result)
+        new_sources = _get_sources_by_path(result)
+        changes.added += [new_sources[p] for p in new_sources if p not in old_sources]
+        changes.removed += [old_sources[p] for p in old_sources if p not in new_sources]
+        changes.changed += [
+            new_sources[p]
+            for p in new_sources
+            if p in old_sources and new_sources[p] != old_sources[p]
+        ]
+
+        old_bad_sources = old_result.bad_sources if old_result else []
+        new_bad_sources = result.bad_sources if result else []
+        changes.added_bad_sources += [p for p in new_bad_sources if p not in old_bad_sources]
+        changes.removed_bad_sources += [p for p in old_bad_sources if p not in new_bad_sources]
+
+    def _update_categories(self) -> None:
+        categories = _merge_directory_results(self._iter_results(self._root), self._projects)
+        self.categories.testable_by_project = categories.testable_by_project
+        self.categories.by_language = categories.by_language
+        self.categories.bad_sources = categories.bad_sources
+
+    def _iter_results(self, root: str) -> Iterator[_DirectoryResult]:
+        # Visit directories in the same order as os.walk
+        if root in self._results:
+            yield self._results[root]
+
+        for subdir in self._subdirs.get(root, []):
+            yield from self._iter_results(subdir)
+
+
+def watch_sources(  # noqa: PLR0913
+    path: str,
+    projects: dict[str, CoreProjectMixin],
+    source_cls: type,
+    callback: Callable[[SourceChanges], None],
+    *,
+    interval: float = 1.0,
+    backend: str = "auto",
+    lazy: bool = False,
+) -> SourceWatcher:
+    """
+    Categorize sources and start watching them for changes in a background thread.
+    Call :meth:`SourceWatcher.stop` to stop watching
+
+    :param path: path to source directory
+    :param projects: dictionary whose key is a project type and whose value is a
+        CoreProjectMixin object
+    :param source_cls: source object class
+    :param callback: function called from the watcher thread with a
+        :class:`SourceChanges` object whenever sources change
+    :param interval: maximum number of seconds to wait for changes in each check
+    :param backend: ``"polling"``, ``"inotify"``, or ``"auto"``
+    :param lazy: whether to create source objects whose test information is not
+        rendered and parsed until it is first accessed
+    :return: started SourceWatcher object
+    :raises: :exc:`ValueError` if invalid backend
+    """
+
+    watcher = SourceWatcher(
+        path, projects, source_cls, callback, interval=interval, backend=backend, lazy=lazy
+    )
+    watcher.start()
+    return watcher
+
+
+def _scan_directory(root: str) -> tuple[list[str], list[str], tuple]:
+    files = []
+    subdirs = []
+    test_info_stats = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            else:
+                files.append(entry.name)
+                if entry.name in _TEST_INFO_FILENAMES:
+                    stat = entry.stat()
+                    test_info_stats.append((entry.name, stat.st_mtime_ns, stat.st_size))
+
+    return files, subdirs, (frozenset(files), tuple(sorted(test_info_stats)))
+
+
+def _get_sources_by_path(result: Optional[_DirectoryResult]) -> dict[str, CoreSource]:
+    if result is None:
+        return {}
+
+    return {source.full_path: source for source in result.language_info.sources}
+
+
+def _create_backend(backend: str) -> _PollingBackend | _InotifyBackend:
+    if backend == "polling":
+        return _PollingBackend()
+
+    if backend == "inotify":
+        if not _InotifyBackend.is_available():
+            raise ValueError("inotify backend is only available on Linux")
+
+        return _InotifyBackend()
+
+    if backend == "auto":
+        if _InotifyBackend.is_available():
+            try:
+                return _InotifyBackend()
+            except OSError:
+                # E.g., the limit on the number of inotify instances is reached
+                pass
+
+        return _PollingBackend()
+
+    raise ValueError(f'Unknown watch backend: "{backend}"')
+
+
+class _PollingBackend:
+    name = "polling"
+
+    def __init__(self) -> None:
+        self._closed = threading.Event()
+
+    def watch(self, root: str) -> None:
+        pass
+
+    def unwatch(self, root: str) -> None:
+        pass
+
+    def wait(self, timeout: float) -> None:
+        # None means that any directory could have changed
+        self._closed.wait(timeout)
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    _IN_MODIFY = 0x00000002
+    _IN_ATTRIB = 0x00000004
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_FROM = 0x00000040
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_DELETE = 0x00000200
+    _IN_DELETE_SELF = 0x00000400
+    _IN_MOVE_SELF = 0x00000800
+    _IN_Q_OVERFLOW = 0x00004000
+    _IN_IGNORED = 0x00008000
+    _IN_ONLYDIR = 0x01000000
+    _MASK = (
+        _IN_MODIFY
+        | _IN_ATTRIB
+        | _IN_CLOSE_WRITE
+        | _IN_MOVED_FROM
+        | _IN_MOVED_TO
+        | _IN_CREATE
+        | _IN_DELETE
+        | _IN_DELETE_SELF
+        | _IN_MOVE_SELF
+        | _IN_ONLYDIR
+    )
+    _EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self._paths: dict[int, str] = {}
+        self._wds: dict[str, int] = {}
+
+    @staticmethod
+    def is_available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def watch(self, root: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), self._MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), root)
+
+        self._paths[wd] = root
+        self._wds[root] = wd
+
+    def unwatch(self, root: str) -> None:
+        wd = self._wds.pop(root, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            # Fails if the directory was deleted, since that already removed the watch
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def wait(self, timeout: float) -> Optional[set[str]]:
+        if self._fd < 0:
+            return set()
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        dirty = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, name_len = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += self._EVENT_HEADER.size + name_len
+                if mask & self._IN_Q_OVERFLOW:
+                    return None
+
+                path = self._paths.get(wd)
+                if path is not None:
+                    dirty.add(path)
+                    if mask & (self._IN_DELETE_SELF | self._IN_MOVE_SELF):
+                        dirty.add(os.path.dirname(path))
+
+                if mask & self._IN_IGNORED:
+                    self._paths.pop(wd, None)
+                    if path is not None and self._wds.get(path) == wd:
+                        del self._wds[path]
+
+        return dirty
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+__all__ = ["SourceChanges", "SourceWatcher", "watch_sources"]
@@ -0,0 +1,111 @@
+"""YAML loading. The libyaml-based loader is used if PyYAML was built with libyaml.
+Otherwise, the pure-Python one is used"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import IO, Any, Optional, Union
+
+LIBYAML = "libyaml"
+PYTHON = "python"
+
+_backend: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def _get_backends() -> dict[str, type]:
+    # PyYAML is imported on first use because it is slow to import
+    import yaml  # noqa: PLC0415
+
+    backends = {}
+    if hasattr(yaml, "CSafeLoader"):
+        backends[LIBYAML] = yaml.CSafeLoader
+
+    backends[PYTHON] = yaml.SafeLoader
+    return backends
+
+
+def _get_loader() -> type:
+    backends = _get_backends()
+    return backends[_backend or next(iter(backends))]
+
+
+def get_yaml_backend() -> str:
+    """
+    Get the YAML backend in use
+
+    :return: :const:`LIBYAML` or :const:`PYTHON`
+    """
+
+    return _backend or get_available_yaml_backends()[0]
+
+
+def get_available_yaml_backends() -> list[str]:
+    """
+    Get the available YAML backends, fastest first
+
+    :return: list of backends
+    """
+
+    return list(_get_backends())
+
+
+def set_yaml_backend(backend: Optional[str] = None) -> None:
+    """
+    Set the YAML backend
+
+    :param backend: :const:`LIBYAML`, :const:`PYTHON`, or ``None`` to use the fastest
+        available backend
+    :raises: :exc:`ValueError` if backend is not available
+    """
+
+    global _backend  # noqa: PLW0603
+
+    if backend is not None and backend not in _get_backends():
+        raise ValueError(f'YAML backend "{backend}" is not available')
+
+    _backend = backend
+
+
+def load_yaml(stream: Union[str, bytes, IO]) -> Any:
+    """
+    Safely load YAML
+
+    :param stream: YAML string, bytes, or file object
+    :return: loaded data
+    """
+
+    import yaml  # noqa: PLC0415
+
+    return yaml.load(stream, Loader=_get_loader())
+
+
+def load_yaml_with_nodes(stream: Union[str, bytes, IO]) -> tuple[Any, Any]:
+    """
+    Safely load YAML and also get the node graph that it was constructed from. The
+    nodes record details that the loaded data does not, such as the style of each
+    scalar (plain, single-quoted, double-quoted, literal, or folded)
+
+    :param stream: YAML string, bytes, or file object
+    :return: loaded data and root node. The root node is ``None`` if there is no
+        document
+    """
+
+    loader = _get_loader()(stream)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node) if node is not None else None
+        return data, node
+    finally:
+        loader.dispose()
+
+
+__all__ = [
+    "LIBYAML",
+    "PYTHON",
+    "get_available_yaml_backends",
+    "get_yaml_backend",
+    "load_yaml",
+    "load_yaml_with_nodes",
+    "set_yaml_backend",
+]
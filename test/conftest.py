@@ -1,10 +1,16 @@
 import os
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import Callable, ContextManager, Generator
 
 import pytest
 
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+
+pytest_plugins = ["pytester"]
+
 
 @pytest.fixture
 def tmp_dir() -> Generator[str, None, None]:
@@ -20,3 +26,40 @@ def tmp_dir_chdir(tmp_dir) -> Generator[str, None, None]:
         yield tmp_dir
     finally:
         os.chdir(curr_cwd)
+
+
+@pytest.fixture(name="cd")
+def cd_fixture() -> Callable[[str], ContextManager[None]]:
+    """Context manager that changes the current directory and changes it back"""
+
+    return _cd
+
+
+@pytest.fixture(name="get_settings")
+def get_settings_fixture() -> Callable[[str], CoreSettings]:
+    """Create settings for the project in a directory"""
+
+    return _get_settings
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def categories(request):
+    settings = _get_settings("test/data/sample-programs-repo")
+    return categorize_sources(
+        settings.source_root, settings.projects, CoreSource, lazy=request.param
+    )
+
+
+@contextmanager
+def _cd(path: str) -> Generator[None, None, None]:
+    orig_cwd = os.getcwd()
+    try:
+        os.chdir(path)
+        yield
+    finally:
+        os.chdir(orig_cwd)
+
+
+def _get_settings(path: str) -> CoreSettings:
+    with _cd(path):
+        return CoreSettings()
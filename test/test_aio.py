@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from glotter_core.aio import aiter_sources, categorize_sources_async
+from glotter_core.source import (
+    BadSourceFound,
+    CoreSource,
+    LanguageFound,
+    SourceFound,
+    categorize_sources,
+    iter_sources,
+)
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+@pytest.mark.parametrize("concurrency", [1, 2, 8])
+def test_categorize_sources_async_matches_categorize_sources(repo, concurrency, get_settings):
+    settings = get_settings(f"test/data/{repo}")
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+
+    categories = asyncio.run(
+        categorize_sources_async(
+            settings.source_root, settings.projects, CoreSource, concurrency=concurrency
+        )
+    )
+
+    assert categories == expected_categories
+    assert list(categories.by_language) == list(expected_categories.by_language)
+
+
+def test_categorize_sources_async_executor(get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        categories = asyncio.run(
+            categorize_sources_async(
+                settings.source_root, settings.projects, CoreSource, executor=executor
+            )
+        )
+
+        # Executor that is passed in is not shut down
+        assert executor.submit(lambda: 42).result() == 42
+
+    assert categories == expected_categories
+
+
+@pytest.mark.parametrize("concurrency", [0, -1])
+def test_categorize_sources_async_bad_concurrency(concurrency):
+    with pytest.raises(ValueError) as exc:
+        asyncio.run(
+            categorize_sources_async(
+                "test/data/sample-programs-repo", {}, CoreSource, concurrency=concurrency
+            )
+        )
+
+    assert "concurrency must be at least 1" in str(exc.value)
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+def test_aiter_sources_matches_iter_sources(repo, get_settings):
+    settings = get_settings(f"test/data/{repo}")
+    expected_events = list(iter_sources(settings.source_root, settings.projects, CoreSource))
+
+    async def _collect():
+        return [
+            event
+            async for event in aiter_sources(
+                settings.source_root, settings.projects, CoreSource, concurrency=2
+            )
+        ]
+
+    events = asyncio.run(_collect())
+
+    assert _group_by_language(events) == _group_by_language(expected_events)
+
+
+def test_aiter_sources_stop_early(get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+
+    async def _first():
+        events = aiter_sources(settings.source_root, settings.projects, CoreSource)
+        try:
+            return await events.__anext__()
+        finally:
+            await events.aclose()
+
+    assert isinstance(asyncio.run(_first()), (SourceFound, BadSourceFound, LanguageFound))
+
+
+def _group_by_language(events: list) -> dict[str, tuple[list, list, list]]:
+    groups = {}
+    sources = []
+    bad_sources = []
+    for event in events:
+        if isinstance(event, SourceFound):
+            sources.append((event.source, event.is_testable))
+        elif isinstance(event, BadSourceFound):
+            bad_sources.append(event.path)
+        else:
+            groups[event.language] = (sources, bad_sources, event.language_info)
+            sources = []
+            bad_sources = []
+
+    return groups
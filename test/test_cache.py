@@ -0,0 +1,152 @@
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+import glotter_core.cache as cache_module
+from glotter_core.cache import CacheStats, DiskCache, LRUCache, atomic_write_bytes
+
+
+def test_lru_cache_get_or_create_counts_hits_and_misses():
+    cache = LRUCache(maxsize=2)
+    calls = []
+
+    def factory(value):
+        def _create():
+            calls.append(value)
+            return value
+
+        return _create
+
+    assert cache.get_or_create("a", factory(1)) == 1
+    assert cache.get_or_create("a", factory(2)) == 1
+    assert cache.get_or_create("b", factory(3)) == 3
+
+    assert calls == [1, 3]
+    assert cache.stats == CacheStats(hits=1, misses=2, size=2, maxsize=2)
+    assert cache.stats.hit_ratio == pytest.approx(1 / 3)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("b", lambda: 2)
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("c", lambda: 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_lru_cache_unbounded():
+    cache = LRUCache(maxsize=None)
+    for n in range(100):
+        cache.get_or_create(n, lambda n=n: n)
+
+    assert len(cache) == 100
+
+
+def test_lru_cache_resize_evicts():
+    cache = LRUCache(maxsize=3)
+    for n in range(3):
+        cache.get_or_create(n, lambda n=n: n)
+
+    cache.resize(1)
+
+    assert len(cache) == 1
+    assert 2 in cache
+    assert cache.stats.maxsize == 1
+
+
+def test_lru_cache_clear():
+    cache = LRUCache()
+    cache.get_or_create("a", lambda: 1)
+    cache.get_or_create("a", lambda: 1)
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.stats == CacheStats(hits=0, misses=0, size=0, maxsize=1024)
+    assert cache.stats.hit_ratio == 0.0
+
+
+def test_disk_cache_get_and_set(tmp_dir):
+    cache = DiskCache(Path(tmp_dir, "cache"))
+    missing = object()
+
+    assert cache.get("abc", missing) is missing
+    cache.set("abc", {"value": [1, 2, 3]})
+    cache.set("def", None)
+
+    assert cache.get("abc") == {"value": [1, 2, 3]}
+    assert cache.get("def", missing) is None
+    assert cache.stats == CacheStats(hits=2, misses=1, size=2)
+    assert DiskCache(Path(tmp_dir, "cache")).get("abc") == {"value": [1, 2, 3]}
+
+
+def test_disk_cache_set_is_atomic(tmp_dir, monkeypatch):
+    cache = DiskCache(tmp_dir)
+    cache.set("abc", "old")
+
+    def _dump(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(pickle, "dumps", _dump)
+    with pytest.raises(RuntimeError):
+        cache.set("abc", "new")
+
+    assert cache.get("abc") == "old"
+    assert sorted(path.name for path in Path(tmp_dir).iterdir()) == ["abc.pickle"]
+
+
+def test_disk_cache_directory_removed(tmp_dir):
+    cache_dir = Path(tmp_dir, "cache")
+    cache = DiskCache(cache_dir)
+    shutil.rmtree(cache_dir)
+
+    cache.set("abc", 1)
+
+    assert cache.get("abc") == 1
+
+
+def test_disk_cache_write_failure_is_a_miss(tmp_dir, monkeypatch):
+    cache = DiskCache(tmp_dir)
+
+    def _write(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache_module, "atomic_write_bytes", _write)
+    cache.set("abc", 1)
+
+    assert cache.get("abc", "default") == "default"
+
+
+def test_disk_cache_corrupt_entry_is_a_miss(tmp_dir):
+    cache = DiskCache(tmp_dir)
+    Path(tmp_dir, "abc.pickle").write_bytes(b"not a pickle")
+
+    assert cache.get("abc", "default") == "default"
+    assert cache.stats.misses == 1
+
+
+def test_disk_cache_clear(tmp_dir):
+    cache = DiskCache(tmp_dir)
+    cache.set("abc", 1)
+    cache.get("abc")
+
+    cache.clear()
+
+    assert cache.get("abc") is None
+    assert cache.stats == CacheStats(hits=0, misses=1, size=0)
+
+
+def test_atomic_write_bytes(tmp_dir):
+    path = Path(tmp_dir, "file.bin")
+    atomic_write_bytes(path, b"old")
+    atomic_write_bytes(path, b"new")
+
+    assert path.read_bytes() == b"new"
+    assert [p.name for p in Path(tmp_dir).iterdir()] == ["file.bin"]
@@ -0,0 +1,133 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import glotter_core.source as source_module
+from glotter_core.changes import find_affected_sources
+from glotter_core.project import CoreProject
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.trace import Tracer
+
+PROJECTS = {
+    "helloworld": CoreProject({"words": ["hello", "world"]}),
+    "rot13": CoreProject({"words": ["rot13"]}),
+}
+
+
+@pytest.fixture
+def repo_root(tmp_dir) -> Path:
+    repo_root = Path(tmp_dir, "repo")
+    shutil.copytree("test/data/sample-programs-repo", repo_root)
+    return repo_root
+
+
+def _find(repo_root: Path, changed_paths: list[str], **kwargs):
+    return find_affected_sources(
+        str(repo_root / "archive"),
+        PROJECTS,
+        CoreSource,
+        changed_paths,
+        base_dir=str(repo_root),
+        **kwargs,
+    )
+
+
+def _get_found(affected) -> list[tuple[str, bool]]:
+    return [(found.source.filename, found.is_testable) for found in affected.sources]
+
+
+def test_find_affected_sources_changed_source(repo_root):
+    affected = _find(repo_root, ["archive/p/python/rot13.py", "README.md"])
+
+    assert not affected.full_rebuild
+    assert _get_found(affected) == [("rot13.py", True)]
+    assert affected.bad_sources == []
+    assert list(affected.languages) == ["python"]
+    expected = categorize_sources(str(repo_root / "archive"), PROJECTS, CoreSource)
+    assert affected.languages["python"] == expected.by_language["python"]
+    assert affected.testable_sources == expected.testable_by_project["rot13"]
+
+
+def test_find_affected_sources_untestable_source(repo_root):
+    affected = _find(repo_root, ["archive/m/mathematica/hello-world.nb"])
+
+    assert _get_found(affected) == [("hello-world.nb", False)]
+    assert affected.testable_sources == []
+
+
+def test_find_affected_sources_changed_test_info(repo_root):
+    affected = _find(repo_root, ["archive/p/python/testinfo.yml"])
+
+    assert sorted(_get_found(affected)) == [("hello_world.py", True), ("rot13.py", True)]
+    assert affected.bad_sources == [os.path.join("p", "python", "foo.py")]
+
+
+def test_find_affected_sources_new_bad_source(repo_root):
+    Path(repo_root, "archive", "c", "c-plus-plus", "goodbye.cpp").write_text("")
+
+    affected = _find(
+        repo_root,
+        ["archive/c/c-plus-plus/goodbye.cpp", "archive/m/mathematica/hello-world.nb"],
+    )
+
+    assert affected.bad_sources == [os.path.join("c", "c-plus-plus", "goodbye.cpp")]
+    assert sorted(affected.languages) == ["c-plus-plus", "mathematica"]
+
+
+def test_find_affected_sources_deleted_files(repo_root):
+    Path(repo_root, "archive", "p", "python", "rot13.py").unlink()
+    shutil.rmtree(Path(repo_root, "archive", "c"))
+
+    affected = _find(
+        repo_root, ["archive/p/python/rot13.py", "archive/c/c-plus-plus/hello-world.cpp"]
+    )
+
+    assert affected.sources == []
+    assert list(affected.languages) == ["python"]
+    assert [source.filename for source in affected.languages["python"].sources] == [
+        "hello_world.py"
+    ]
+
+
+def test_find_affected_sources_settings_changed(repo_root):
+    affected = _find(repo_root, ["archive/p/python/rot13.py", ".glotter.yml"])
+
+    assert affected.full_rebuild
+    assert affected.sources == []
+    assert affected.languages == {}
+
+
+def test_find_affected_sources_relative_to_current_directory(repo_root, monkeypatch):
+    monkeypatch.chdir(repo_root)
+
+    affected = find_affected_sources(
+        "archive", PROJECTS, CoreSource, [str(repo_root / "archive" / "p" / "python" / "rot13.py")]
+    )
+
+    assert _get_found(affected) == [("rot13.py", True)]
+
+
+def test_find_affected_sources_does_not_walk(repo_root, monkeypatch):
+    def fail_walk(*args, **kwargs):
+        raise AssertionError("os.walk should not be called")
+
+    monkeypatch.setattr(source_module.os, "walk", fail_walk)
+    read_paths = []
+    orig_read_text = Path.read_text
+
+    def read_text(self, *args, **kwargs):
+        read_paths.append(self)
+        return orig_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", read_text)
+    tracer = Tracer()
+
+    affected = _find(repo_root, ["archive/p/python/rot13.py"], tracer=tracer)
+
+    assert _get_found(affected) == [("rot13.py", True)]
+    assert [path.parent.name for path in read_paths] == ["python"]
+    assert [span.args["path"] for span in tracer.spans if span.name == "directory"] == [
+        str((repo_root / "archive" / "p" / "python").resolve())
+    ]
@@ -0,0 +1,59 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time budgets in microseconds. These are deliberately generous so
+# that slow CI machines pass. The lists of modules that must not be imported catch
+# regressions precisely
+IMPORT_BUDGETS_US = {
+    "glotter_core.project": 100_000,
+    "glotter_core.source": 150_000,
+}
+HEAVY_MODULES = [
+    "concurrent.futures.process",
+    "jinja2",
+    "multiprocessing",
+    "pickle",
+    "tempfile",
+    "yaml",
+]
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\s*)(\S+)$")
+
+
+def _get_import_times(module: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match:
+            import_times[match.group(4)] = int(match.group(2))
+
+    return import_times
+
+
+@pytest.mark.parametrize("module", list(IMPORT_BUDGETS_US))
+def test_import_does_not_import_heavy_modules(module):
+    import_times = _get_import_times(module)
+
+    assert module in import_times
+    imported_heavy_modules = [
+        name
+        for name in import_times
+        if any(name == heavy or name.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+    ]
+    assert imported_heavy_modules == []
+
+
+@pytest.mark.parametrize(("module", "budget_us"), list(IMPORT_BUDGETS_US.items()))
+def test_import_time_within_budget(module, budget_us):
+    # Take the best of several runs to reduce noise
+    elapsed_us = min(_get_import_times(module)[module] for _ in range(3))
+
+    assert elapsed_us <= budget_us
@@ -0,0 +1,157 @@
+from pathlib import Path
+
+import pytest
+
+from glotter_core.index import SourceIndex
+from glotter_core.settings import CoreSettings
+from glotter_core.source import (
+    CoreLanguage,
+    CoreSource,
+    CoreSourceCategories,
+    categorize_sources,
+)
+from glotter_core.testinfo import (
+    TestInfo,
+    clear_template_cache,
+    get_template_cache_stats,
+    get_test_info_template,
+)
+
+
+def test_get(categories):
+    index = SourceIndex(categories)
+
+    source = index.get("python", "rot13")
+    assert source is not None
+    assert source.filename == "rot13.py"
+    assert index.get("python", "bogus") is None
+    assert index.get_by_path(source.full_path) is source
+    assert source.full_path in index
+
+
+def test_find(categories):
+    index = SourceIndex(categories)
+    all_sources = [
+        source
+        for language_info in categories.by_language.values()
+        for source in language_info.sources
+    ]
+    testable_sources = [
+        source for sources in categories.testable_by_project.values() for source in sources
+    ]
+
+    assert len(index) == len(all_sources)
+    assert index.find() == all_sources
+    assert index.find(extension=".nb") == categories.by_language["mathematica"].sources
+    assert index.find(image="python") == categories.by_language["python"].sources
+    assert _sorted(index.find(testable=True)) == _sorted(testable_sources)
+    assert index.find(language="python", project_type="rot13") == [index.get("python", "rot13")]
+    assert index.find(project_type="rot13", testable=True) == [
+        source for source in testable_sources if source.project_type == "rot13"
+    ]
+    assert index.find(image="python", tag="bogus") == []
+    assert index.count_by("language") == {
+        language: len(language_info.sources)
+        for language, language_info in categories.by_language.items()
+    }
+
+
+def test_lazy_sources_are_not_rendered(cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    clear_template_cache()
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy=True)
+    index = SourceIndex(categories)
+
+    assert index.find(image="python")
+    assert get_template_cache_stats().misses == 0
+    assert all(
+        source.unrendered_test_info is not None
+        for source in categories.by_language["python"].sources
+    )
+
+
+def test_lazy_sources_templated_image(tmp_dir):
+    test_info_string = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+
+container:
+  image: "python-{{ source.name }}"
+  tag: "3.12-alpine"
+  cmd: "python {{ source.name }}.py"
+"""
+    sources = [
+        CoreSource.from_string_lazy(filename, "python", tmp_dir, test_info_string, project_type)
+        for filename, project_type in [("hello_world.py", "helloworld"), ("rot13.py", "rot13")]
+    ]
+    test_info = TestInfo.from_dict(get_test_info_template(test_info_string).data, "python")
+    categories = CoreSourceCategories(
+        by_language={"python": CoreLanguage(sources, test_info, Path(tmp_dir, "testinfo.yml"))}
+    )
+    index = SourceIndex(categories)
+
+    assert index.find(image="python-rot13") == [sources[1]]
+    assert index.count_by("image") == {"python-hello_world": 1, "python-rot13": 1}
+
+
+def test_update_is_incremental(categories, monkeypatch):
+    index = SourceIndex(categories)
+    python_info = categories.by_language["python"]
+    rot13 = index.get("python", "rot13")
+
+    added = []
+    orig_add = SourceIndex.add
+
+    def _add(self, source, *args, **kwargs):
+        added.append(source.filename)
+        orig_add(self, source, *args, **kwargs)
+
+    monkeypatch.setattr(SourceIndex, "add", _add)
+
+    index.update(categories)
+    assert added == []
+
+    categories.by_language["python"] = CoreLanguage(
+        sources=[source for source in python_info.sources if source is not rot13],
+        test_info=python_info.test_info,
+        test_info_path=python_info.test_info_path,
+    )
+    for sources in categories.testable_by_project.values():
+        if rot13 in sources:
+            sources.remove(rot13)
+
+    index.update(categories)
+    assert added == []
+    assert index.get("python", "rot13") is None
+    assert rot13.full_path not in index
+
+    del categories.by_language["mathematica"]
+    index.update(categories)
+    assert index.find(extension=".nb") == []
+    assert "mathematica" not in index.count_by("language")
+
+
+def test_remove_and_add(categories):
+    index = SourceIndex(categories)
+    source = index.get("python", "rot13")
+
+    assert index.remove(source.full_path) is source
+    assert index.remove(source.full_path) is None
+    assert index.find(language="python", project_type="rot13") == []
+
+    index.add(source, is_testable=False)
+    assert index.find(language="python", project_type="rot13", testable=False) == [source]
+
+
+def test_count_by_unknown_key(categories):
+    with pytest.raises(ValueError) as exc:
+        SourceIndex(categories).count_by("bogus")
+
+    assert 'Unknown key "bogus"' in str(exc.value)
+
+
+def _sorted(sources: list[CoreSource]) -> list[CoreSource]:
+    return sorted(sources, key=lambda source: source.full_path)
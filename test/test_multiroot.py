@@ -0,0 +1,295 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+import glotter_core.source as source_module
+from glotter_core.multiroot import categorize_roots
+from glotter_core.project import CoreProject
+from glotter_core.source import CoreSource, categorize_sources
+
+PROJECTS = {
+    "helloworld": CoreProject({"words": ["hello", "world"]}),
+    "rot13": CoreProject({"words": ["rot13"]}),
+}
+FORK_PROJECTS = {
+    **PROJECTS,
+    "fizzbuzz": CoreProject({"words": ["fizz", "buzz"]}),
+}
+FORK_PYTHON_TEST_INFO = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+
+container:
+  image: "python"
+  tag: "3.13-alpine"
+  cmd: "python {{ source.name }}{{ source.extension }}"
+"""
+
+
+@pytest.fixture
+def public_root(tmp_dir) -> Path:
+    public_root = Path(tmp_dir, "public")
+    shutil.copytree("test/data/sample-programs-repo/archive", public_root)
+    return public_root
+
+
+@pytest.fixture
+def fork_root(tmp_dir) -> Path:
+    # A fork that changes the Python test information, removes the Python rot13
+    # program, adds a project, and leaves the other languages alone
+    fork_root = Path(tmp_dir, "fork")
+    shutil.copytree("test/data/sample-programs-repo/archive", fork_root)
+    python_dir = fork_root / "p" / "python"
+    Path(python_dir, "testinfo.yml").write_text(FORK_PYTHON_TEST_INFO, encoding="utf-8")
+    Path(python_dir, "rot13.py").unlink()
+    Path(python_dir, "fizz_buzz.py").write_text("", encoding="utf-8")
+    return fork_root
+
+
+@pytest.fixture
+def categorized_dirs(monkeypatch) -> list[str]:
+    categorized_dirs = []
+    orig_categorize_directory = source_module._categorize_directory
+
+    def categorize_directory(root, files, options):
+        categorized_dirs.append(root)
+        return orig_categorize_directory(root, files, options)
+
+    monkeypatch.setattr(source_module, "_categorize_directory", categorize_directory)
+    return categorized_dirs
+
+
+def test_categorize_roots_single_root(public_root):
+    categories = categorize_roots([(str(public_root), PROJECTS)], CoreSource)
+
+    expected = categorize_sources(str(public_root), PROJECTS, CoreSource)
+    assert categories.testable_by_project == expected.testable_by_project
+    assert categories.by_language == expected.by_language
+    assert categories.bad_sources == [
+        os.path.join(str(public_root), path) for path in expected.bad_sources
+    ]
+    assert categories.bad_sources_by_root == {str(public_root): expected.bad_sources}
+    assert categories.shadowed_sources == []
+    assert categories.duplicate_directories == {}
+    assert all(
+        categories.get_root(source) == str(public_root)
+        for language_info in categories.by_language.values()
+        for source in language_info.sources
+    )
+
+
+def test_categorize_roots_priority(public_root, fork_root):
+    categories = categorize_roots(
+        [(str(fork_root), FORK_PROJECTS), (str(public_root), PROJECTS)], CoreSource
+    )
+
+    python = categories.by_language["python"]
+    assert sorted((source.filename, categories.get_root(source)) for source in python.sources) == [
+        ("fizz_buzz.py", str(fork_root)),
+        ("hello_world.py", str(fork_root)),
+        ("rot13.py", str(public_root)),
+    ]
+    assert python.test_info.container_info.tag == "3.13-alpine"
+    assert python.test_info_path == (fork_root / "p" / "python" / "testinfo.yml").resolve()
+    # The projects are different, so no directories are duplicates
+    assert categories.duplicate_directories == {}
+    assert sorted(source.full_path for source in categories.shadowed_sources) == [
+        str((public_root / path).resolve())
+        for path in [
+            "c/c-plus-plus/hello-world.cpp",
+            "m/mathematica/hello-world.nb",
+            "p/python/hello_world.py",
+        ]
+    ]
+    assert sorted(categories.testable_by_project) == ["fizzbuzz", "helloworld", "rot13"]
+    assert [source.filename for source in categories.testable_by_project["fizzbuzz"]] == [
+        "fizz_buzz.py"
+    ]
+    assert sorted(
+        (source.filename, categories.get_root(source))
+        for source in categories.testable_by_project["helloworld"]
+    ) == [("hello-world.cpp", str(fork_root)), ("hello_world.py", str(fork_root))]
+
+
+def test_categorize_roots_reverse_priority(public_root, fork_root):
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(fork_root), FORK_PROJECTS)], CoreSource
+    )
+
+    python = categories.by_language["python"]
+    assert sorted((source.filename, categories.get_root(source)) for source in python.sources) == [
+        ("fizz_buzz.py", str(fork_root)),
+        ("hello_world.py", str(public_root)),
+        ("rot13.py", str(public_root)),
+    ]
+    assert python.test_info.container_info.tag == "3.12-alpine"
+
+
+def test_categorize_roots_identical_directories_categorized_once(
+    public_root, tmp_dir, categorized_dirs
+):
+    mirror_root = Path(tmp_dir, "mirror")
+    shutil.copytree(public_root, mirror_root)
+
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(mirror_root), PROJECTS)], CoreSource
+    )
+
+    assert (
+        sorted(Path(directory).parent.parent for directory in categorized_dirs) == [public_root] * 3
+    )
+    assert sorted(categories.duplicate_directories.items()) == sorted(
+        (
+            os.path.join(str(mirror_root), letter, language),
+            os.path.join(str(public_root), letter, language),
+        )
+        for letter, language in [("c", "c-plus-plus"), ("m", "mathematica"), ("p", "python")]
+    )
+    expected = categorize_sources(str(public_root), PROJECTS, CoreSource)
+    assert categories.testable_by_project == expected.testable_by_project
+    assert categories.bad_sources_by_root == {
+        str(public_root): expected.bad_sources,
+        str(mirror_root): expected.bad_sources,
+    }
+    expected_shadowed = categorize_sources(str(mirror_root), PROJECTS, CoreSource)
+    assert sorted(categories.shadowed_sources, key=lambda source: source.full_path) == sorted(
+        (
+            source
+            for language_info in expected_shadowed.by_language.values()
+            for source in language_info.sources
+        ),
+        key=lambda source: source.full_path,
+    )
+    assert all(categories.get_root(source) is None for source in categories.shadowed_sources)
+
+
+def test_categorize_roots_changed_directories_categorized(public_root, fork_root, categorized_dirs):
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(fork_root), PROJECTS)], CoreSource
+    )
+
+    assert sorted(
+        os.path.relpath(directory, Path(directory).parent.parent.parent)
+        for directory in categorized_dirs
+    ) == sorted(
+        [
+            os.path.join("public", "c", "c-plus-plus"),
+            os.path.join("public", "m", "mathematica"),
+            os.path.join("public", "p", "python"),
+            os.path.join("fork", "p", "python"),
+        ]
+    )
+    assert sorted(categories.duplicate_directories) == [
+        os.path.join(str(fork_root), "c", "c-plus-plus"),
+        os.path.join(str(fork_root), "m", "mathematica"),
+    ]
+    assert sorted(source.full_path for source in categories.shadowed_sources) == [
+        str((fork_root / path).resolve())
+        for path in [
+            "c/c-plus-plus/hello-world.cpp",
+            "m/mathematica/hello-world.nb",
+            "p/python/hello_world.py",
+        ]
+    ]
+
+
+def test_categorize_roots_different_projects_not_deduplicated(
+    public_root, tmp_dir, categorized_dirs
+):
+    mirror_root = Path(tmp_dir, "mirror")
+    shutil.copytree(public_root, mirror_root)
+
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(mirror_root), FORK_PROJECTS)], CoreSource
+    )
+
+    assert len(categorized_dirs) == 6
+    assert categories.duplicate_directories == {}
+    assert len(categories.shadowed_sources) == 4
+
+
+def test_categorize_roots_with_executor(public_root, fork_root):
+    roots = [(str(fork_root), FORK_PROJECTS), (str(public_root), PROJECTS)]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        categories = categorize_roots(roots, CoreSource, executor=executor)
+
+    assert categories.by_language == categorize_roots(roots, CoreSource).by_language
+
+
+def test_categorize_roots_lazy_duplicate_directories(public_root, tmp_dir):
+    mirror_root = Path(tmp_dir, "mirror")
+    shutil.copytree(public_root, mirror_root)
+
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(mirror_root), PROJECTS)], CoreSource, lazy=True
+    )
+
+    expected = categorize_sources(str(mirror_root), PROJECTS, CoreSource)
+    assert sorted(categories.shadowed_sources, key=lambda source: source.full_path) == sorted(
+        (
+            source
+            for language_info in expected.by_language.values()
+            for source in language_info.sources
+        ),
+        key=lambda source: source.full_path,
+    )
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_categorize_roots_duplicate_directories_render_own_path(public_root, tmp_dir, lazy):
+    Path(public_root, "p", "python", "testinfo.yml").write_text(
+        FORK_PYTHON_TEST_INFO.replace(
+            "{{ source.name }}{{ source.extension }}", "{{ source.full_path }}"
+        ),
+        encoding="utf-8",
+    )
+    mirror_root = Path(tmp_dir, "mirror")
+    shutil.copytree(public_root, mirror_root)
+
+    categories = categorize_roots(
+        [(str(public_root), PROJECTS), (str(mirror_root), PROJECTS)], CoreSource, lazy=lazy
+    )
+
+    python_dir = os.path.join(str(mirror_root), "p", "python")
+    assert categories.duplicate_directories[python_dir] == os.path.join(
+        str(public_root), "p", "python"
+    )
+    shadowed_cmds = sorted(
+        source.test_info.container_info.cmd
+        for source in categories.shadowed_sources
+        if source.language == "python"
+    )
+    assert shadowed_cmds == [
+        f"python {Path(python_dir, filename).resolve()}"
+        for filename in ["hello_world.py", "rot13.py"]
+    ]
+
+
+def test_categorize_roots_lazy(public_root, fork_root):
+    categories = categorize_roots(
+        [(str(fork_root), FORK_PROJECTS), (str(public_root), PROJECTS)], CoreSource, lazy=True
+    )
+
+    assert sorted(categories.testable_by_project) == ["fizzbuzz", "helloworld", "rot13"]
+    assert [source.filename for source in categories.testable_by_project["rot13"]] == ["rot13.py"]
+
+
+@pytest.mark.parametrize(
+    "kwargs,message",
+    [
+        ({"concurrency": 0}, "concurrency must be at least 1, got 0"),
+        ({}, "is given more than once"),
+    ],
+)
+def test_categorize_roots_bad_arguments(public_root, kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        categorize_roots(
+            [(str(public_root), PROJECTS), (str(public_root / "."), PROJECTS)],
+            CoreSource,
+            **kwargs,
+        )
@@ -1,6 +1,15 @@
+import pickle
+import sys
+
 import pytest
 
-from glotter_core.project import AcronymScheme, CoreProject, NamingScheme
+from glotter_core.project import (
+    AcronymScheme,
+    CoreProject,
+    NamingScheme,
+    ProjectNameTable,
+    get_project_name_table,
+)
 
 project_scheme_permutation_map = [
     {
@@ -196,6 +205,17 @@ def test_acronym_scheme_bad():
         CoreProject({"words": ["whatever"], "acronym_scheme": "bad"})
 
 
+def test_core_project_pickle():
+    project = CoreProject({"words": ["hello", "world"], "acronyms": ["io"]})
+    assert pickle.loads(pickle.dumps(project)) == project
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="slots require Python 3.11+")
+def test_core_project_has_no_instance_dict():
+    project = CoreProject({"words": ["hello", "world"]})
+    assert not hasattr(project, "__dict__")
+
+
 @pytest.mark.parametrize(
     ("words", "acronyms", "naming_scheme", "acronym_scheme", "expected"),
     [perm[1:] for perm in get_project_scheme_permutations()],
@@ -267,3 +287,47 @@ def test_get_project_name_by_scheme_bad():
 def test_get_display_name(value, expected_display_name):
     project = CoreProject(value)
     assert project.display_name == expected_display_name
+
+
+NAME_TABLE_PROJECTS = {
+    "helloworld": CoreProject({"words": ["hello", "world"]}),
+    "fileinputoutput": CoreProject(
+        {"words": ["file", "input", "output"], "acronyms": ["io"], "acronym_scheme": "upper"}
+    ),
+    "rot13": CoreProject({"words": ["rot13"]}),
+}
+
+
+@pytest.mark.parametrize("naming", list(NamingScheme), ids=[n.value for n in NamingScheme])
+def test_project_name_table_matches_project_names(naming):
+    table = ProjectNameTable(NAME_TABLE_PROJECTS)
+
+    expected_names = {
+        project_type: project.get_project_name_by_scheme(naming)
+        for project_type, project in NAME_TABLE_PROJECTS.items()
+    }
+    assert table.get_names(naming) == expected_names
+    assert list(table.get_names(naming)) == list(NAME_TABLE_PROJECTS)
+    for project_type, name in expected_names.items():
+        assert table.get_name(naming, project_type) == name
+
+
+def test_project_name_table_lookup():
+    table = ProjectNameTable(NAME_TABLE_PROJECTS)
+
+    assert table.lookup("hello_world") == [("helloworld", NamingScheme.underscore)]
+    assert table.lookup("HelloWorld") == [("helloworld", NamingScheme.pascal)]
+    assert table.lookup("rot13") == [
+        ("rot13", NamingScheme.hyphen),
+        ("rot13", NamingScheme.underscore),
+        ("rot13", NamingScheme.camel),
+        ("rot13", NamingScheme.lower),
+    ]
+    assert table.lookup("bogus") == []
+
+
+def test_get_project_name_table_is_shared():
+    table = get_project_name_table(NAME_TABLE_PROJECTS)
+
+    assert get_project_name_table(dict(NAME_TABLE_PROJECTS)) is table
+    assert get_project_name_table({"rot13": NAME_TABLE_PROJECTS["rot13"]}) is not table
@@ -0,0 +1,102 @@
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import glotter_core.pytest_plugin as plugin
+from glotter_core.pytest_plugin import SNAPSHOT_FILENAME, get_source_snapshot
+from glotter_core.snapshot import SourceSnapshot
+from glotter_core.source import CoreSource
+
+TEST_FILE = """
+from glotter_core.pytest_plugin import get_source_snapshot
+
+
+def pytest_generate_tests(metafunc):
+    if "source" in metafunc.fixturenames:
+        sources = get_source_snapshot(metafunc.config).get_testable_sources("helloworld")
+        metafunc.parametrize("source", sources, ids=[s.filename for s in sources])
+
+
+def test_source(source):
+    assert source.project_type == "helloworld"
+
+
+def test_fixture(glotter_source_snapshot):
+    assert "python" in glotter_source_snapshot.languages
+"""
+
+
+@pytest.fixture
+def repo(pytester):
+    shutil.copytree(
+        Path(__file__).parent / "data" / "sample-programs-repo", pytester.path, dirs_exist_ok=True
+    )
+    pytester.makepyfile(test_glotter=TEST_FILE)
+    return pytester
+
+
+@pytest.fixture
+def categorize_calls(monkeypatch):
+    calls = []
+    categorize_sources = plugin.categorize_sources
+
+    def _categorize_sources(*args, **kwargs):
+        calls.append(args)
+        return categorize_sources(*args, **kwargs)
+
+    monkeypatch.setattr(plugin, "categorize_sources", _categorize_sources)
+    return calls
+
+
+def test_plugin_parametrizes_tests(repo, categorize_calls):
+    result = repo.runpytest("-p", "glotter_core.pytest_plugin", "-v")
+
+    result.assert_outcomes(passed=3)
+    result.stdout.fnmatch_lines(["*test_source?hello_world.py?*PASSED*", "*test_fixture PASSED*"])
+    assert len(categorize_calls) == 1
+
+
+def test_plugin_reuses_snapshot_dir(repo, categorize_calls, tmp_dir):
+    args = ["-p", "glotter_core.pytest_plugin", f"--glotter-snapshot-dir={tmp_dir}"]
+    repo.runpytest(*args).assert_outcomes(passed=3)
+    repo.runpytest(*args).assert_outcomes(passed=3)
+
+    assert len(categorize_calls) == 1
+    assert Path(tmp_dir, SNAPSHOT_FILENAME).exists()
+
+    python_dir = repo.path / "archive" / "p" / "python"
+    (python_dir / "hello_world.py").unlink()
+    repo.runpytest(*args).assert_outcomes(passed=2)
+    assert len(categorize_calls) == 2
+
+
+def test_plugin_shares_snapshot_with_workers(repo, categorize_calls):
+    controller_config = repo.parseconfigure("-p", "glotter_core.pytest_plugin")
+    nodes = [SimpleNamespace(config=controller_config, workerinput={}) for _ in range(3)]
+    for node in nodes:
+        plugin.pytest_configure_node(node)
+
+    snapshot_paths = {node.workerinput["glotter_core_snapshot"] for node in nodes}
+    assert len(snapshot_paths) == 1
+    assert len(categorize_calls) == 1
+
+    worker_snapshots = []
+    for node in nodes:
+        worker_config = repo.parseconfigure("-p", "glotter_core.pytest_plugin")
+        worker_config.workerinput = node.workerinput
+        snapshot = get_source_snapshot(worker_config)
+        assert isinstance(snapshot, SourceSnapshot)
+        assert snapshot is get_source_snapshot(worker_config)
+        assert get_source_snapshot(worker_config, CoreSource) is snapshot
+        worker_snapshots.append(snapshot)
+
+    assert len(categorize_calls) == 1
+    sources = [snapshot.get_testable_sources("helloworld") for snapshot in worker_snapshots]
+    assert sources[0] == sources[1] == sources[2]
+
+    snapshot_path = Path(snapshot_paths.pop())
+    assert snapshot_path.exists()
+    plugin.pytest_unconfigure(controller_config)
+    assert not snapshot_path.exists()
@@ -1,4 +1,6 @@
 import json
+import os
+import pickle
 import shutil
 from pathlib import Path
 from typing import Any
@@ -6,8 +8,9 @@ from typing import Any
 import pytest
 import yaml
 
+import glotter_core.settings as settings_module
 from glotter_core.project import AcronymScheme, CoreProject
-from glotter_core.settings import CoreSettings, CoreSettingsParser
+from glotter_core.settings import CoreSettings, CoreSettingsParser, clear_settings_cache
 
 TEST_DATA_DIR = Path("test/data").resolve()
 
@@ -109,3 +112,260 @@ def test_settings_when_bad_yml(filename: str, expected_error: str, tmp_dir_chdir
         CoreSettings()
 
     assert expected_error in str(exc.value)
+
+
+def _write_glotter_yml(tmp_dir: str, path: str, contents: str = "") -> Path:
+    yml_path = Path(tmp_dir) / path / ".glotter.yml"
+    yml_path.parent.mkdir(parents=True, exist_ok=True)
+    yml_path.write_text(contents, encoding="utf-8")
+    return yml_path
+
+
+@pytest.mark.parametrize(
+    ("paths", "expected"),
+    [
+        pytest.param(["a", ""], "", id="root-first"),
+        pytest.param(["a/b/c", "z"], "z", id="breadth-first"),
+        pytest.param(["b", "a"], "a", id="name-order"),
+        pytest.param([".git", "node_modules", "x/y"], "x/y", id="ignored-dirs"),
+    ],
+)
+def test_settings_parser_search_order(paths: list[str], expected: str, tmp_dir: str):
+    for path in paths:
+        _write_glotter_yml(tmp_dir, path)
+
+    settings_parser = CoreSettingsParser(tmp_dir)
+
+    assert settings_parser.yml_path == str(Path(tmp_dir) / expected / ".glotter.yml")
+
+
+@pytest.mark.parametrize(
+    ("path", "kwargs"),
+    [
+        pytest.param(".hidden", {}, id="hidden"),
+        pytest.param("build/out", {"ignore_patterns": ("build*",)}, id="custom-ignore"),
+        pytest.param("a/b/c", {"max_depth": 2}, id="too-deep"),
+    ],
+)
+def test_settings_parser_does_not_find_glotter_yml(
+    path: str, kwargs: dict[str, Any], tmp_dir: str, recwarn
+):
+    _write_glotter_yml(tmp_dir, path)
+
+    settings_parser = CoreSettingsParser(tmp_dir, **kwargs)
+
+    assert settings_parser.yml_path == tmp_dir
+    assert ".glotter.yml not found" in str(recwarn.pop(UserWarning).message)
+
+
+def test_settings_parser_max_depth(tmp_dir: str):
+    _write_glotter_yml(tmp_dir, "a/b/c")
+
+    settings_parser = CoreSettingsParser(tmp_dir, max_depth=3)
+
+    assert settings_parser.yml_path == str(Path(tmp_dir) / "a" / "b" / "c" / ".glotter.yml")
+
+
+def test_settings_parser_settings_path(tmp_dir: str):
+    glotter_yml = (TEST_DATA_DIR / "good_glotter.yml").read_text(encoding="utf-8")
+    _write_glotter_yml(tmp_dir, "", "projects: {}\n")
+    yml_path = _write_glotter_yml(tmp_dir, "other", glotter_yml)
+
+    settings_parser = CoreSettingsParser(tmp_dir, settings_path=str(yml_path))
+
+    assert settings_parser.yml_path == str(yml_path)
+    assert settings_parser.yml == read_yaml_test_data("good_glotter.yml")
+
+
+def test_settings_parser_settings_path_does_not_exist(tmp_dir: str):
+    with pytest.raises(ValueError) as exc:
+        CoreSettingsParser(tmp_dir, settings_path=str(Path(tmp_dir) / "missing.yml"))
+
+    assert "does not exist" in str(exc.value)
+
+
+def test_settings_with_settings_path(tmp_dir_chdir: str):
+    yml_path = Path("config", "glotter.yml")
+    yml_path.parent.mkdir()
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", yml_path)
+
+    settings = CoreSettings(settings_path=str(yml_path))
+
+    expected_project_items = read_json_test_data("good_glotter.json")["projects"]
+    assert settings.projects == {
+        name: CoreProject(project) for name, project in expected_project_items.items()
+    }
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("settings file should not be parsed")
+
+
+def test_settings_are_remembered(tmp_dir_chdir: str, monkeypatch):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    settings = CoreSettings()
+
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "CoreSettingsParser", _fail)
+        m.setattr(settings_module, "_locate_yml", _fail)
+        remembered_settings = CoreSettings()
+
+    assert remembered_settings == settings
+    assert remembered_settings.projects is not settings.projects
+
+    with Path(".glotter.yml").open("a", encoding="utf-8") as f:
+        f.write("  extra:\n    words: [extra]\n")
+
+    changed_settings = CoreSettings()
+    assert "extra" in changed_settings.projects
+
+    clear_settings_cache()
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "CoreSettingsParser", _fail)
+        with pytest.raises(AssertionError):
+            CoreSettings()
+
+
+def test_remembered_projects_are_not_shared(tmp_dir_chdir: str):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    settings = CoreSettings()
+    project_names = list(settings.projects)
+
+    settings.projects.pop(project_names[0])
+
+    assert list(CoreSettings().projects) == project_names
+
+
+def test_remembered_settings_use_new_shallower_settings_file(tmp_dir_chdir: str):
+    Path("sub").mkdir()
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", Path("sub", ".glotter.yml"))
+    settings = CoreSettings()
+    assert settings.projects
+
+    Path(".glotter.yml").write_text("projects:\n  foo:\n    words: [foo]\n", encoding="utf-8")
+    os.utime(".", ns=(0, 0))
+
+    assert CoreSettings().projects == {"foo": CoreProject({"words": ["foo"]})}
+
+
+def test_settings_not_remembered(tmp_dir_chdir: str, monkeypatch):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    clear_settings_cache()
+    CoreSettings(memo=False)
+
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "CoreSettingsParser", _fail)
+        with pytest.raises(AssertionError):
+            CoreSettings(memo=False)
+
+        with pytest.raises(AssertionError):
+            CoreSettings()
+
+
+class _Project(CoreProject):
+    pass
+
+
+class _ProjectSettings(CoreSettings):
+    def _set_projects(self, projects_item):
+        projects = {name: _Project(project) for name, project in projects_item.items()}
+        object.__setattr__(self, "projects", projects)
+
+
+def _get_project_types(settings: CoreSettings) -> set[type]:
+    return {type(project) for project in settings.projects.values()}
+
+
+def test_remembered_settings_use_hooks(tmp_dir_chdir: str, monkeypatch):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    clear_settings_cache()
+    assert _get_project_types(CoreSettings()) == {CoreProject}
+
+    assert _get_project_types(_ProjectSettings()) == {_Project}
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "CoreSettingsParser", _fail)
+        assert _get_project_types(_ProjectSettings()) == {_Project}
+        assert _get_project_types(CoreSettings()) == {CoreProject}
+
+
+def test_snapshot_settings_use_hooks(tmp_dir_chdir: str, monkeypatch):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    clear_settings_cache()
+    CoreSettings(snapshot=True, snapshot_dir=tmp_dir_chdir)
+
+    clear_settings_cache()
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "load_yaml", _fail)
+        settings = _ProjectSettings(snapshot=True, snapshot_dir=tmp_dir_chdir)
+
+    assert _get_project_types(settings) == {_Project}
+
+
+@pytest.fixture
+def user_cache_dir(tmp_dir_chdir: str, monkeypatch) -> Path:
+    user_cache_dir = Path(tmp_dir_chdir, "user-cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(user_cache_dir))
+    monkeypatch.setenv("LOCALAPPDATA", str(user_cache_dir))
+    return user_cache_dir / "glotter"
+
+
+@pytest.mark.parametrize("use_snapshot_dir", [False, True], ids=["user-cache-dir", "snapshot-dir"])
+def test_settings_snapshot(use_snapshot_dir: bool, tmp_dir_chdir: str, user_cache_dir, monkeypatch):
+    shutil.copy(TEST_DATA_DIR / "good_glotter_with_source_and_acronyms.yml", ".glotter.yml")
+    snapshot_dir = str(Path(tmp_dir_chdir, "cache")) if use_snapshot_dir else None
+    clear_settings_cache()
+    settings = CoreSettings(snapshot=True, snapshot_dir=snapshot_dir)
+
+    assert len(list(Path(snapshot_dir or user_cache_dir).iterdir())) == 1
+    assert sorted(path.name for path in Path(tmp_dir_chdir).iterdir()) == sorted(
+        [".glotter.yml", "cache" if use_snapshot_dir else "user-cache"]
+    )
+
+    clear_settings_cache()
+    with monkeypatch.context() as m:
+        m.setattr(settings_module, "load_yaml", _fail)
+        snapshot_settings = CoreSettings(snapshot=True, snapshot_dir=snapshot_dir)
+
+    assert snapshot_settings == settings
+
+    Path(".glotter.yml").write_text("projects:\n  foo:\n    words: [foo]\n", encoding="utf-8")
+    clear_settings_cache()
+    changed_settings = CoreSettings(snapshot=True, snapshot_dir=snapshot_dir)
+    assert changed_settings.projects == {"foo": CoreProject({"words": ["foo"]})}
+
+
+class _RunsCode:
+    def __reduce__(self):
+        return (Path("pwned").write_text, ("pwned",))
+
+
+@pytest.mark.parametrize(
+    "snapshot_contents",
+    [
+        b"junk",
+        json.dumps({"key": ["wrong"], "acronym_scheme": "lower", "projects": {}}).encode(),
+        pickle.dumps((None, _RunsCode())),
+    ],
+    ids=["junk", "wrong-key", "pickle"],
+)
+def test_settings_bad_snapshot_is_ignored(tmp_dir_chdir: str, snapshot_contents: bytes):
+    shutil.copy(TEST_DATA_DIR / "good_glotter.yml", ".glotter.yml")
+    snapshot_path = settings_module._get_snapshot_path(
+        str(Path(".glotter.yml").resolve()), tmp_dir_chdir
+    )
+    snapshot_path.write_bytes(snapshot_contents)
+    clear_settings_cache()
+
+    settings = CoreSettings(snapshot=True, snapshot_dir=tmp_dir_chdir)
+
+    expected_project_items = read_json_test_data("good_glotter.json")["projects"]
+    assert settings.projects == {
+        name: CoreProject(project) for name, project in expected_project_items.items()
+    }
+    assert not Path("pwned").exists()
+
+
+def test_settings_not_remembered_when_glotter_yml_does_not_exist(tmp_dir_chdir: str):
+    for _ in range(2):
+        with pytest.warns(UserWarning, match=".glotter.yml not found"):
+            CoreSettings()
@@ -0,0 +1,205 @@
+import asyncio
+import os
+
+import pytest
+
+import glotter_core.source as source_module
+from glotter_core.aio import aiter_sources, categorize_sources_async
+from glotter_core.shard import assign_shards, estimate_costs, get_directory_costs
+from glotter_core.source import (
+    CoreSource,
+    LanguageFound,
+    categorize_sources,
+    iter_sources,
+)
+from glotter_core.trace import Tracer
+
+
+def test_assign_shards_balances_costs():
+    costs = {"a": 7, "b": 5, "c": 4, "d": 3, "e": 3, "f": 2}
+
+    shards = assign_shards(costs, 3)
+
+    assert shards == [["a", "f"], ["b", "e"], ["c", "d"]]
+    assert [sum(costs[directory] for directory in shard) for shard in shards] == [9, 8, 7]
+
+
+def test_assign_shards_is_deterministic():
+    costs = {f"x/lang-{i}": float(i % 5) for i in range(100)}
+    reversed_costs = dict(reversed(list(costs.items())))
+
+    shards = assign_shards(costs, 7)
+
+    assert shards == assign_shards(reversed_costs, 7)
+    assert sorted(directory for shard in shards for directory in shard) == sorted(costs)
+
+
+def test_assign_shards_more_shards_than_directories():
+    assert assign_shards({"a": 1, "b": 1}, 4) == [["a"], ["b"], [], []]
+
+
+@pytest.mark.parametrize("num_shards", [0, -1])
+def test_assign_shards_bad_num_shards(num_shards):
+    with pytest.raises(ValueError) as exc:
+        assign_shards({"a": 1}, num_shards)
+
+    assert f"num_shards must be at least 1, got {num_shards}" in str(exc.value)
+
+
+def test_estimate_costs():
+    file_counts = {"a": 2, "b": 4, "c": 3}
+
+    assert estimate_costs(file_counts) == {"a": 2, "b": 4, "c": 3}
+    assert estimate_costs(file_counts, {"a": 1.0, "b": 5.0, "z": 100.0}) == {
+        "a": 1.0,
+        "b": 5.0,
+        "c": 3.0,
+    }
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+@pytest.mark.parametrize("num_shards", [1, 2, 3, 10])
+def test_categorize_sources_shards_partition_languages(repo, num_shards, get_settings):
+    settings = get_settings(f"test/data/{repo}")
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+
+    shard_categories = [
+        categorize_sources(
+            settings.source_root,
+            settings.projects,
+            CoreSource,
+            shard=shard,
+            num_shards=num_shards,
+        )
+        for shard in range(num_shards)
+    ]
+
+    languages = [language for c in shard_categories for language in c.by_language]
+    assert sorted(languages) == sorted(expected_categories.by_language)
+    for categories in shard_categories:
+        for language, language_info in categories.by_language.items():
+            assert language_info == expected_categories.by_language[language]
+
+        assert set(categories.testable_by_project) == set(settings.projects)
+
+    for project_type, sources in expected_categories.testable_by_project.items():
+        shard_sources = [s for c in shard_categories for s in c.testable_by_project[project_type]]
+        assert sorted(shard_sources, key=_get_full_path) == sorted(sources, key=_get_full_path)
+
+    bad_sources = [bad_source for c in shard_categories for bad_source in c.bad_sources]
+    assert sorted(bad_sources) == sorted(expected_categories.bad_sources)
+
+
+def test_categorize_sources_shard_only_reads_its_directories(monkeypatch, get_settings):
+    settings = get_settings("test/data/untestable")
+    roots = []
+    categorize_directory = source_module._categorize_directory
+
+    def _categorize_directory(root, files, options):
+        roots.append(os.path.basename(root))
+        return categorize_directory(root, files, options)
+
+    monkeypatch.setattr(source_module, "_categorize_directory", _categorize_directory)
+    categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, shard=1, num_shards=3
+    )
+
+    assert len(roots) == 2
+    assert set(categories.by_language) <= set(roots)
+
+
+def test_categorize_sources_shard_costs(get_settings):
+    settings = get_settings("test/data/untestable")
+    directories = sorted(f"u/{language}" for language in os.listdir(settings.source_root + "/u"))
+    shard_costs = {directory: 1.0 for directory in directories}
+    shard_costs[directories[0]] = 100.0
+
+    categories = categorize_sources(
+        settings.source_root,
+        settings.projects,
+        CoreSource,
+        shard=0,
+        num_shards=2,
+        shard_costs=shard_costs,
+    )
+
+    assert list(categories.by_language) == [directories[0].split("/")[1]]
+
+
+def test_iter_sources_shard(get_settings):
+    settings = get_settings("test/data/untestable")
+    expected_languages = set(
+        categorize_sources(
+            settings.source_root, settings.projects, CoreSource, shard=0, num_shards=2
+        ).by_language
+    )
+
+    events = iter_sources(
+        settings.source_root, settings.projects, CoreSource, shard=0, num_shards=2
+    )
+
+    assert {event.language for event in events if isinstance(event, LanguageFound)} == (
+        expected_languages
+    )
+
+
+def test_async_shard(get_settings):
+    settings = get_settings("test/data/untestable")
+    expected_categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, shard=1, num_shards=2
+    )
+
+    async def _collect_languages():
+        return {
+            event.language
+            async for event in aiter_sources(
+                settings.source_root, settings.projects, CoreSource, shard=1, num_shards=2
+            )
+            if isinstance(event, LanguageFound)
+        }
+
+    categories = asyncio.run(
+        categorize_sources_async(
+            settings.source_root, settings.projects, CoreSource, shard=1, num_shards=2
+        )
+    )
+    assert categories == expected_categories
+    assert asyncio.run(_collect_languages()) == set(expected_categories.by_language)
+
+
+@pytest.mark.parametrize(
+    ("shard", "num_shards", "expected_error"),
+    [
+        (0, 0, "num_shards must be at least 1, got 0"),
+        (2, 2, "shard must be from 0 to 1, got 2"),
+        (-1, 2, "shard must be from 0 to 1, got -1"),
+    ],
+)
+def test_bad_shard(shard, num_shards, expected_error, get_settings):
+    settings = get_settings("test/data/untestable")
+    for func in [categorize_sources, iter_sources]:
+        with pytest.raises(ValueError) as exc:
+            func(
+                settings.source_root,
+                settings.projects,
+                CoreSource,
+                shard=shard,
+                num_shards=num_shards,
+            )
+
+        assert expected_error in str(exc.value)
+
+
+def test_get_directory_costs(get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    tracer = Tracer()
+    categorize_sources(settings.source_root, settings.projects, CoreSource, tracer=tracer)
+
+    costs = get_directory_costs(tracer, settings.source_root)
+
+    assert sorted(costs) == ["c/c-plus-plus", "m/mathematica", "p/python"]
+    assert all(cost > 0 for cost in costs.values())
+
+
+def _get_full_path(source: CoreSource) -> str:
+    return source.full_path
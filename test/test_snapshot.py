@@ -0,0 +1,163 @@
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+import glotter_core.snapshot as snapshot_module
+from glotter_core.snapshot import (
+    SourceSnapshot,
+    is_snapshot_stale,
+    load_snapshot,
+    save_snapshot,
+)
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.testinfo import clear_template_cache, get_template_cache_stats
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_load_snapshot_matches_categories(tmp_dir, repo, lazy, get_settings):
+    settings = get_settings(f"test/data/{repo}")
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy=lazy)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+
+    clear_template_cache()
+    loaded_categories = load_snapshot(snapshot_path)
+
+    assert get_template_cache_stats().misses == 0
+    assert loaded_categories == categories
+    assert list(loaded_categories.by_language) == list(categories.by_language)
+    assert list(loaded_categories.testable_by_project) == list(categories.testable_by_project)
+
+
+def test_snapshot_shares_objects(tmp_dir, get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+
+    with SourceSnapshot(snapshot_path) as snapshot:
+        assert snapshot.languages == list(categories.by_language)
+        assert snapshot.project_types == list(categories.testable_by_project)
+        assert snapshot.source_root == settings.source_root
+        python_sources = snapshot.get_language("python").sources
+        rot13 = next(source for source in python_sources if source.project_type == "rot13")
+        assert any(source is rot13 for source in snapshot.get_testable_sources("rot13"))
+        assert python_sources[0].path is python_sources[1].path
+        with pytest.raises(KeyError):
+            snapshot.get_language("bogus")
+
+    # Decoded objects can be used after the snapshot is closed
+    assert rot13.test_info.container_info.image == "python"
+
+
+def test_snapshot_strings_are_deduplicated(tmp_dir, get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+
+    data = snapshot_path.read_bytes()
+    python_path = categories.by_language["python"].sources[0].path.encode("utf-8")
+    assert len(re.findall(re.escape(python_path) + rb"(?!/)", data)) == 1
+
+
+@pytest.mark.parametrize("contents", [b"", b"bogus", b"GLCS" + b"\xff" * 200])
+def test_load_snapshot_bad_file(tmp_dir, contents):
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    snapshot_path.write_bytes(contents)
+
+    with pytest.raises(ValueError):
+        load_snapshot(snapshot_path)
+
+
+def test_load_snapshot_unsupported_version(tmp_dir, monkeypatch, get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+    monkeypatch.setattr(snapshot_module, "SNAPSHOT_VERSION", snapshot_module.SNAPSHOT_VERSION + 1)
+
+    with pytest.raises(ValueError) as exc:
+        load_snapshot(snapshot_path)
+
+    assert "unsupported version" in str(exc.value)
+    assert is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+
+
+def test_is_snapshot_stale(tmp_dir, get_settings):
+    repo = Path(tmp_dir, "repo")
+    shutil.copytree("test/data/sample-programs-repo", repo)
+    settings = get_settings(str(repo))
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+
+    assert is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+    assert not is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+    assert is_snapshot_stale(snapshot_path, str(Path(tmp_dir)), settings.projects)
+    assert is_snapshot_stale(
+        snapshot_path, settings.source_root, {"rot13": settings.projects["rot13"]}
+    )
+
+    python_dir = Path(settings.source_root, "p", "python")
+    (python_dir / "junk.py").write_text("", encoding="utf-8")
+    assert is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+
+    (python_dir / "junk.py").unlink()
+    assert not is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+
+    new_dir = Path(settings.source_root, "g", "go")
+    new_dir.mkdir(parents=True)
+    (new_dir / "testinfo.yml").write_text(
+        (python_dir / "testinfo.yml").read_text(encoding="utf-8"), encoding="utf-8"
+    )
+    assert is_snapshot_stale(snapshot_path, settings.source_root, settings.projects)
+
+
+def test_snapshot_non_string_values(tmp_dir, get_settings):
+    repo = Path(tmp_dir, "repo")
+    shutil.copytree("test/data/sample-programs-repo", repo)
+    for language_dir, tag, notes in [
+        (repo / "archive" / "p" / "python", "3.11", "[1, true, 1.0, note]"),
+        (repo / "archive" / "c" / "c-plus-plus", "17", "[]"),
+    ]:
+        test_info_path = language_dir / "testinfo.yml"
+        test_info = re.sub(r'tag: ".*"', f"tag: {tag}", test_info_path.read_text(encoding="utf-8"))
+        test_info_path.write_text(f"{test_info}\nnotes: {notes}\n", encoding="utf-8")
+
+    settings = get_settings(str(repo))
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    snapshot_path = Path(tmp_dir, "categories.snapshot")
+    save_snapshot(snapshot_path, categories, settings.source_root, settings.projects)
+
+    loaded_categories = load_snapshot(snapshot_path)
+
+    assert loaded_categories == categories
+    python = loaded_categories.by_language["python"]
+    assert python.test_info.container_info.tag == 3.11
+    assert [type(note) for note in python.test_info.notes] == [int, bool, float, str]
+    assert type(python.sources[0].test_info.container_info.tag) is float
+    assert type(loaded_categories.by_language["c-plus-plus"].test_info.container_info.tag) is int
+
+
+def test_save_snapshot_unsupported_value(tmp_dir, get_settings):
+    repo = Path(tmp_dir, "repo")
+    shutil.copytree("test/data/sample-programs-repo", repo)
+    test_info_path = repo / "archive" / "p" / "python" / "testinfo.yml"
+    with test_info_path.open("a", encoding="utf-8") as f:
+        f.write("\nnotes:\n  - {not: a string}\n")
+
+    settings = get_settings(str(repo))
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+
+    with pytest.raises(ValueError, match="Cannot save"):
+        save_snapshot(
+            Path(tmp_dir, "categories.snapshot"),
+            categories,
+            settings.source_root,
+            settings.projects,
+        )
@@ -1,14 +1,32 @@
-import os
-from contextlib import contextmanager
+import pickle
+import shutil
+import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Generator
 
 import pytest
 import yaml
 
+import glotter_core.source as source_module
+from glotter_core.project import CoreProject
 from glotter_core.settings import CoreSettings
-from glotter_core.source import CoreLanguage, CoreSource, CoreSourceCategories, categorize_sources
-from glotter_core.testinfo import ContainerInfo, FolderInfo, TestInfo
+from glotter_core.source import (
+    BadSourceFound,
+    CoreLanguage,
+    CoreSource,
+    CoreSourceCategories,
+    LanguageFound,
+    SourceFound,
+    categorize_sources,
+    iter_sources,
+)
+from glotter_core.testinfo import (
+    ContainerInfo,
+    FolderInfo,
+    TestInfo,
+    clear_template_cache,
+    get_template_cache_stats,
+)
 
 EXTENSION_NO_BUILD = ".py"
 NAMING_NO_BUILD = "underscore"
@@ -106,6 +124,22 @@ def test_basename_and_extension(filename, expected_name, expected_extension):
     assert src.extension == expected_extension
 
 
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_categorize_sources_untestable_does_not_render(lazy, cd):
+    with cd("test/data/untestable"):
+        settings = CoreSettings()
+
+    clear_template_cache()
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy)
+
+    assert get_template_cache_stats().misses == 0
+    assert "untestable-undetectable" not in categories.by_language
+    for language_info in categories.by_language.values():
+        for source in language_info.sources:
+            assert source.test_info is language_info.test_info
+            assert not source.test_info.is_testable
+
+
 @pytest.mark.parametrize(
     ("filename", "language", "test_info_string", "expected_test_info"),
     [
@@ -134,7 +168,7 @@ def test_test_info_matches_test_info_string(
     assert src.test_info == expected_test_info
 
 
-def test_categorize_sources():
+def test_categorize_sources(cd):
     with cd("test/data/sample-programs-repo"):
         settings = CoreSettings()
 
@@ -220,7 +254,7 @@ def test_categorize_sources():
     assert set(categories.bad_sources) == set(expected_categories.bad_sources)
 
 
-def test_categorize_sources_untestable():
+def test_categorize_sources_untestable(cd):
     with cd("test/data/untestable"):
         settings = CoreSettings()
 
@@ -347,6 +381,438 @@ def test_categorize_sources_untestable():
     assert set(categories.bad_sources) == set(expected_categories.bad_sources)
 
 
+@pytest.mark.parametrize(
+    ("filename", "language", "test_info_string", "expected_test_info"),
+    [
+        pytest.param(
+            "hello_world.py",
+            "python",
+            TEST_INFO_STRING_NO_BUILD,
+            EXPECTED_TEST_INFO_NO_BUILD,
+            id="no-build",
+        ),
+        pytest.param(
+            "hello-world.go", "go", TEST_INFO_STRING_BUILD, EXPECTED_TEST_INFO_BUILD, id="build"
+        ),
+    ],
+)
+def test_lazy_test_info_matches_eager_test_info(
+    filename, language, test_info_string, expected_test_info
+):
+    source_kwargs = {
+        "filename": filename,
+        "language": language,
+        "path": "some-path",
+        "test_info": test_info_string,
+        "project_type": "someproject",
+    }
+    clear_template_cache()
+    lazy_src = CoreSource.from_string_lazy(**source_kwargs)
+    assert get_template_cache_stats().misses == 0
+
+    assert lazy_src.test_info == expected_test_info
+    assert lazy_src.test_info is lazy_src.test_info
+    assert get_template_cache_stats().misses == 1
+    assert lazy_src == CoreSource(**source_kwargs)
+
+
+def test_lazy_source_unrendered_test_info():
+    src = CoreSource.from_string_lazy(
+        filename="hello_world.py",
+        language="python",
+        path="some-path",
+        test_info=TEST_INFO_STRING_NO_BUILD,
+        project_type="someproject",
+    )
+    assert src.unrendered_test_info == TEST_INFO_STRING_NO_BUILD
+
+    assert src.test_info == EXPECTED_TEST_INFO_NO_BUILD
+    assert src.unrendered_test_info is None
+
+
+def test_lazy_source_unknown_attribute():
+    src = CoreSource.from_string_lazy(
+        filename="hello_world.py",
+        language="python",
+        path="some-path",
+        test_info=TEST_INFO_STRING_NO_BUILD,
+        project_type="someproject",
+    )
+    with pytest.raises(AttributeError):
+        _ = src.bogus
+
+
+def test_lazy_source_pickle_does_not_render():
+    source_kwargs = {
+        "filename": "hello_world.py",
+        "language": "python",
+        "path": "some-path",
+        "test_info": TEST_INFO_STRING_NO_BUILD,
+        "project_type": "someproject",
+    }
+    clear_template_cache()
+    lazy_src = pickle.loads(pickle.dumps(CoreSource.from_string_lazy(**source_kwargs)))
+    assert get_template_cache_stats().misses == 0
+
+    assert lazy_src.test_info == EXPECTED_TEST_INFO_NO_BUILD
+    assert pickle.loads(pickle.dumps(lazy_src)) == CoreSource(**source_kwargs)
+
+
+def test_source_strings_are_interned():
+    sources = [
+        CoreSource.from_string_lazy(
+            filename=filename,
+            language="".join(["py", "thon"]),
+            path="/".join(["some", "path"]),
+            test_info=TEST_INFO_STRING_NO_BUILD,
+            project_type="".join(["some", "project"]),
+        )
+        for filename in ["hello_world.py", "fizz_buzz.py"]
+    ]
+
+    assert sources[0].language is sources[1].language
+    assert sources[0].path is sources[1].path
+    assert sources[0].project_type is sources[1].project_type
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="slots require Python 3.11+")
+def test_source_has_no_instance_dict():
+    src = CoreSource(
+        filename="hello_world.py",
+        language="python",
+        path="some-path",
+        test_info=TEST_INFO_STRING_NO_BUILD,
+        project_type="someproject",
+    )
+
+    assert not hasattr(src, "__dict__")
+    assert not hasattr(src.test_info, "__dict__")
+    assert not hasattr(src.test_info.container_info, "__dict__")
+    assert not hasattr(src.test_info.file_info, "__dict__")
+
+
+@dataclass(frozen=True)
+class DataclassSource(CoreSource):
+    extra: str
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_dataclass_subclass(lazy):
+    source_kwargs = {
+        "filename": "hello_world.py",
+        "language": "python",
+        "path": "some-path",
+        "test_info": TEST_INFO_STRING_NO_BUILD,
+        "project_type": "someproject",
+        "extra": "some-extra",
+    }
+    if lazy:
+        src = DataclassSource.from_string_lazy(**source_kwargs)
+    else:
+        src = DataclassSource(**source_kwargs)
+
+    assert src._test_info_string == (TEST_INFO_STRING_NO_BUILD if lazy else None)
+    assert src.test_info.container_info.image == "python"
+    assert src._test_info_string is None
+    assert src.extra == "some-extra"
+    assert pickle.loads(pickle.dumps(src)) == src
+
+
+class PostInitSource(CoreSource):
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, "image", self.test_info.container_info.image)
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+def test_categorize_sources_post_init_reads_test_info(repo, cd):
+    with cd(f"test/data/{repo}"):
+        settings = CoreSettings()
+
+    categories = categorize_sources(settings.source_root, settings.projects, PostInitSource)
+
+    assert categories.by_language
+    for language_info in categories.by_language.values():
+        for source in language_info.sources:
+            assert source.image == language_info.test_info.container_info.image
+
+
+def test_from_test_info_post_init_reads_test_info():
+    src = PostInitSource.from_test_info(
+        "hello_world.py", "python", "some-path", EXPECTED_TEST_INFO_NO_BUILD, "someproject"
+    )
+
+    assert src.test_info is EXPECTED_TEST_INFO_NO_BUILD
+    assert src.image == "python"
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+def test_categorize_sources_lazy(repo, cd):
+    with cd(f"test/data/{repo}"):
+        settings = CoreSettings()
+
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    clear_template_cache()
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy=True)
+
+    assert get_template_cache_stats().misses == 0
+    # Only sources whose test information has templates are rendered at all
+    assert all(
+        (source.unrendered_test_info is not None)
+        == ("{{" in language_info.test_info_path.read_text(encoding="utf-8"))
+        for language_info in categories.by_language.values()
+        for source in language_info.sources
+    )
+    _assert_categorized_sources_eq(
+        categories.testable_by_project, expected_categories.testable_by_project
+    )
+    _assert_categorized_languages_eq(categories.by_language, expected_categories.by_language)
+    assert set(categories.bad_sources) == set(expected_categories.bad_sources)
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_categorize_sources_parallel_matches_serial(repo, lazy, cd):
+    with cd(f"test/data/{repo}"):
+        settings = CoreSettings()
+
+    expected_categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, lazy=lazy
+    )
+    categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, lazy=lazy, jobs=2
+    )
+
+    assert categories == expected_categories
+    assert list(categories.by_language) == list(expected_categories.by_language)
+
+
+@pytest.mark.parametrize("jobs", [0, -1])
+def test_categorize_sources_bad_jobs(jobs):
+    with pytest.raises(ValueError) as exc:
+        categorize_sources("test/data/sample-programs-repo", {}, CoreSource, jobs=jobs)
+
+    assert "jobs must be at least 1" in str(exc.value)
+
+
+def test_categorize_sources_cache_dir(tmp_dir, monkeypatch, cd):
+    repo = Path(tmp_dir, "repo")
+    shutil.copytree("test/data/sample-programs-repo", repo)
+    with cd(str(repo)):
+        settings = CoreSettings()
+
+    cache_dir = str(Path(tmp_dir, "cache"))
+    categorized_dirs = []
+    orig_categorize_directory = source_module._categorize_directory
+
+    def _categorize_directory(root, files, options):
+        categorized_dirs.append(Path(root).name)
+        return orig_categorize_directory(root, files, options)
+
+    monkeypatch.setattr(source_module, "_categorize_directory", _categorize_directory)
+
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    categorized_dirs.clear()
+    cold_categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, cache_dir=cache_dir
+    )
+    assert sorted(categorized_dirs) == ["c-plus-plus", "mathematica", "python"]
+    assert cold_categories == expected_categories
+
+    categorized_dirs.clear()
+    warm_categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, cache_dir=cache_dir
+    )
+    assert categorized_dirs == []
+    assert warm_categories == expected_categories
+
+    python_dir = Path(settings.source_root, "p", "python")
+    (python_dir / "junk.py").write_text("", encoding="utf-8")
+    test_info_path = python_dir / "testinfo.yml"
+    test_info_path.write_text(
+        test_info_path.read_text(encoding="utf-8").replace("3.12-alpine", "3.13-alpine"),
+        encoding="utf-8",
+    )
+    (Path(settings.source_root, "c", "c-plus-plus") / "junk.cpp").write_text("", encoding="utf-8")
+
+    categorized_dirs.clear()
+    changed_categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, cache_dir=cache_dir
+    )
+    assert sorted(categorized_dirs) == ["c-plus-plus", "python"]
+    assert changed_categories.by_language["python"].test_info.container_info.tag == "3.13-alpine"
+    assert str(Path("p", "python", "junk.py")) in changed_categories.bad_sources
+
+    categorized_dirs.clear()
+    categorize_sources(
+        settings.source_root,
+        {"helloworld": settings.projects["helloworld"]},
+        CoreSource,
+        cache_dir=cache_dir,
+    )
+    assert sorted(categorized_dirs) == ["c-plus-plus", "mathematica", "python"]
+
+
+def test_categorize_sources_cache_dir_removed_or_relative(tmp_dir, cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    for name in ["a", "b", "a"]:
+        # The cache directory is relative to the current directory, and the one in
+        # "a" is removed before it is used again
+        Path(tmp_dir, name).mkdir(exist_ok=True)
+        shutil.rmtree(Path(tmp_dir, "a", "cache"), ignore_errors=True)
+        with cd(str(Path(tmp_dir, name))):
+            categories = categorize_sources(
+                settings.source_root, settings.projects, CoreSource, cache_dir="cache"
+            )
+
+        assert categories == expected_categories
+        assert len(list(Path(tmp_dir, name, "cache").iterdir())) == 3
+
+
+def test_categorize_sources_cache_dir_parallel(tmp_dir, cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    for _ in range(2):
+        categories = categorize_sources(
+            settings.source_root, settings.projects, CoreSource, jobs=2, cache_dir=tmp_dir
+        )
+        assert categories == expected_categories
+
+
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_iter_sources_matches_categorize_sources(repo, jobs, cd):
+    with cd(f"test/data/{repo}"):
+        settings = CoreSettings()
+
+    expected_categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+    testable_sources = []
+    bad_sources = []
+    languages = {}
+    language_sources = []
+    for event in iter_sources(settings.source_root, settings.projects, CoreSource, jobs=jobs):
+        if isinstance(event, SourceFound):
+            language_sources.append(event.source)
+            if event.is_testable:
+                testable_sources.append(event.source)
+        elif isinstance(event, BadSourceFound):
+            bad_sources.append(event.path)
+        else:
+            assert isinstance(event, LanguageFound)
+            assert event.language_info.sources == language_sources
+            languages[event.language] = event.language_info
+            language_sources = []
+
+    assert language_sources == []
+    assert languages == expected_categories.by_language
+    assert list(languages) == list(expected_categories.by_language)
+    assert bad_sources == expected_categories.bad_sources
+    _assert_sources_eq(
+        testable_sources,
+        [
+            source
+            for sources in expected_categories.testable_by_project.values()
+            for source in sources
+        ],
+    )
+
+
+def test_iter_sources_is_incremental(monkeypatch, cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    categorized_dirs = []
+    orig_categorize_directory = source_module._categorize_directory
+
+    def _categorize_directory(root, files, options):
+        categorized_dirs.append(Path(root).name)
+        return orig_categorize_directory(root, files, options)
+
+    monkeypatch.setattr(source_module, "_categorize_directory", _categorize_directory)
+
+    events = iter_sources(settings.source_root, settings.projects, CoreSource)
+    assert categorized_dirs == []
+    assert isinstance(next(events), SourceFound)
+    assert len(categorized_dirs) == 1
+
+
+@pytest.mark.parametrize("jobs", [0, -1])
+def test_iter_sources_bad_jobs(jobs):
+    with pytest.raises(ValueError) as exc:
+        iter_sources("test/data/sample-programs-repo", {}, CoreSource, jobs=jobs)
+
+    assert "jobs must be at least 1" in str(exc.value)
+
+
+def test_categorize_sources_equal_tags_of_different_types(tmp_dir):
+    projects = {"helloworld": CoreProject({"words": ["hello", "world"]})}
+    for language, tag in [("python", "1"), ("ruby", "1.0"), ("perl", "true")]:
+        language_dir = Path(tmp_dir, language[0], language)
+        language_dir.mkdir(parents=True)
+        Path(language_dir, "testinfo.yml").write_text(
+            f"""\
+folder:
+  extension: ".x"
+  naming: "underscore"
+
+container:
+  image: "runner"
+  tag: {tag}
+  cmd: "run hello_world.x"
+""",
+            encoding="utf-8",
+        )
+        Path(language_dir, "hello_world.x").write_text("", encoding="utf-8")
+
+    categories = categorize_sources(tmp_dir, projects, CoreSource)
+
+    assert {
+        language: type(language_info.test_info.container_info.tag)
+        for language, language_info in categories.by_language.items()
+    } == {"python": int, "ruby": float, "perl": bool}
+
+
+def test_categorize_sources_lazy_conditional_template(tmp_dir):
+    projects = {
+        "helloworld": CoreProject({"words": ["hello", "world"]}),
+        "rot13": CoreProject({"words": ["rot13"]}),
+    }
+    language_dir = Path(tmp_dir, "p", "python")
+    language_dir.mkdir(parents=True)
+    Path(language_dir, "testinfo.yml").write_text(
+        """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+
+container:
+  image: "python"
+  tag: "3.12-alpine"
+  cmd: "{% if source.name == 'hello_world' %}python {{ source.name }}.py{% endif %}"
+""",
+        encoding="utf-8",
+    )
+    for filename in ["hello_world.py", "rot13.py"]:
+        Path(language_dir, filename).write_text("", encoding="utf-8")
+
+    expected_categories = categorize_sources(tmp_dir, projects, CoreSource)
+    categories = categorize_sources(tmp_dir, projects, CoreSource, lazy=True)
+
+    assert [
+        source.filename for source in expected_categories.testable_by_project["helloworld"]
+    ] == ["hello_world.py"]
+    assert expected_categories.testable_by_project["rot13"] == []
+    _assert_categorized_sources_eq(
+        categories.testable_by_project, expected_categories.testable_by_project
+    )
+    _assert_categorized_languages_eq(categories.by_language, expected_categories.by_language)
+
+
 def _assert_categorized_languages_eq(
     languages1: dict[str, CoreLanguage], languages2: dict[str, CoreLanguage]
 ) -> None:
@@ -371,13 +837,3 @@ def _assert_sources_eq(sources1: list[CoreSource], sources2: list[CoreSource]) -
     sources1 = sorted(sources1, key=lambda x: x.filename)
     sources2 = sorted(sources2, key=lambda x: x.filename)
     assert sources1 == sources2
-
-
-@contextmanager
-def cd(path: str) -> Generator[None, None, None]:
-    orig_cwd = os.getcwd()
-    try:
-        os.chdir(path)
-        yield
-    finally:
-        os.chdir(orig_cwd)
@@ -0,0 +1,176 @@
+from pathlib import Path
+
+import pytest
+
+from glotter_core.project import CoreProject
+from glotter_core.settings import CoreSettings
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.table import SourceTable
+from glotter_core.testinfo import clear_template_cache, get_template_cache_stats
+
+
+def test_from_categories(categories):
+    table = SourceTable.from_categories(categories)
+
+    expected_sources = [
+        source
+        for language_info in categories.by_language.values()
+        for source in language_info.sources
+    ]
+    assert len(table) == len(expected_sources)
+    assert table.to_sources() == expected_sources
+    assert table.get_values("language") == list(categories.by_language)
+
+
+def test_views_match_categories(categories):
+    table = SourceTable.from_categories(categories)
+
+    assert dict(table.by_language) == {
+        language: language_info.sources
+        for language, language_info in categories.by_language.items()
+    }
+    assert dict(table.testable_by_project) == {
+        project_type: sources
+        for project_type, sources in categories.testable_by_project.items()
+        if sources
+    }
+
+
+def test_lazy_sources_stay_lazy(cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    clear_template_cache()
+    categories = categorize_sources(settings.source_root, settings.projects, CoreSource, lazy=True)
+    table = SourceTable.from_categories(categories)
+    sources = table.to_sources()
+
+    assert get_template_cache_stats().misses == 0
+    assert [source.unrendered_test_info is not None for source in sources] == [
+        source.language != "mathematica" for source in sources
+    ]
+    assert sources[0].test_info == categories.by_language[sources[0].language].sources[0].test_info
+
+
+def test_select_and_filter(categories):
+    table = SourceTable.from_categories(categories)
+    python_sources = categories.by_language["python"].sources
+
+    rows = table.select(language="python", project_type="rot13")
+    assert table.to_sources(rows) == [
+        source for source in python_sources if source.project_type == "rot13"
+    ]
+    assert list(table.select(language="python", extension=".cpp")) == []
+    assert list(table.select(language="bogus")) == []
+
+    testable = table.filter(testable=True)
+    assert len(testable) == sum(len(s) for s in categories.testable_by_project.values())
+    assert set(testable.get_values("language")) >= {"python", "c-plus-plus"}
+    assert testable.count_by("language").get("mathematica") is None
+
+
+def test_count_by_and_group_rows(categories):
+    table = SourceTable.from_categories(categories)
+
+    assert table.count_by("language") == {
+        language: len(language_info.sources)
+        for language, language_info in categories.by_language.items()
+    }
+    groups = table.group_rows("extension")
+    assert sorted(groups) == [".cpp", ".nb", ".py"]
+    assert all(table.get_value(row, "extension") == ".py" for row in groups[".py"])
+
+
+def test_image_column(categories):
+    table = SourceTable.from_categories(categories)
+
+    counts = table.count_by("image")
+    assert counts["python"] == len(categories.by_language["python"].sources)
+
+
+def test_append_gets_image_from_source(categories):
+    table = SourceTable()
+    source = categories.by_language["python"].sources[0]
+    table.append(source, is_testable=True)
+
+    assert table.get_value(0, "image") == "python"
+    assert table.get_source(0) == source
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_from_categories_templated_image(tmp_dir, lazy):
+    language_dir = Path(tmp_dir, "p", "python")
+    language_dir.mkdir(parents=True)
+    Path(language_dir, "testinfo.yml").write_text(
+        """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+
+container:
+  image: "python-{{ source.name }}"
+  tag: "3.12-alpine"
+  cmd: "python {{ source.name }}.py"
+""",
+        encoding="utf-8",
+    )
+    for filename in ["hello_world.py", "rot13.py"]:
+        Path(language_dir, filename).write_text("", encoding="utf-8")
+
+    projects = {
+        "helloworld": CoreProject({"words": ["hello", "world"]}),
+        "rot13": CoreProject({"words": ["rot13"]}),
+    }
+    categories = categorize_sources(tmp_dir, projects, CoreSource, lazy=lazy)
+    table = SourceTable.from_categories(categories)
+
+    assert sorted(table.get_values("image")) == ["python-hello_world", "python-rot13"]
+    assert table.count_by("image") == {"python-hello_world": 1, "python-rot13": 1}
+
+
+class _Source(CoreSource):
+    pass
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_views_keep_source_class(lazy, cd):
+    with cd("test/data/sample-programs-repo"):
+        settings = CoreSettings()
+
+    categories = categorize_sources(settings.source_root, settings.projects, _Source, lazy=lazy)
+    table = SourceTable.from_categories(categories)
+
+    assert dict(table.by_language) == {
+        language: language_info.sources
+        for language, language_info in categories.by_language.items()
+    }
+    assert dict(table.testable_by_project) == {
+        project_type: sources
+        for project_type, sources in categories.testable_by_project.items()
+        if sources
+    }
+    assert table.filter(language="python").to_sources() == categories.by_language["python"].sources
+    assert type(table.get_source(0, CoreSource)) is CoreSource
+
+
+def test_unknown_column(categories):
+    table = SourceTable.from_categories(categories)
+
+    with pytest.raises(ValueError) as exc:
+        table.count_by("bogus")
+
+    assert 'Unknown column "bogus"' in str(exc.value)
+
+
+def test_from_test_info_does_not_render(categories):
+    source = categories.by_language["python"].sources[0]
+    test_info = source.test_info
+    clear_template_cache()
+
+    copy = CoreSource.from_test_info(
+        source.filename, source.language, source.path, test_info, source.project_type
+    )
+
+    assert get_template_cache_stats().misses == 0
+    assert copy == source
+    assert copy.test_info is test_info
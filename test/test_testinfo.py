@@ -2,9 +2,26 @@ from dataclasses import dataclass, field
 from uuid import uuid4 as uuid
 
 import pytest
+import yaml
 
 from glotter_core.project import CoreProject
-from glotter_core.testinfo import ContainerInfo, FolderInfo, TestInfo
+from glotter_core.testinfo import (
+    DEFAULT_INTERN_CACHE_SIZE,
+    DEFAULT_TEMPLATE_CACHE_SIZE,
+    ContainerInfo,
+    FolderInfo,
+    TestInfo,
+    TestInfoTemplate,
+    clear_intern_cache,
+    clear_template_cache,
+    get_intern_cache_stats,
+    get_template,
+    get_template_cache_stats,
+    get_test_info_template,
+    intern_info,
+    set_intern_cache_size,
+    set_template_cache_size,
+)
 
 
 @pytest.mark.parametrize("build", [uuid().hex, None], ids=["with_build", "without_build"])
@@ -211,3 +228,318 @@ def _get_container_info_dict(is_testable, build=""):
             container_info_dict["build"] = build
 
     return container_info_dict
+
+
+class _FakeSource:
+    name = "hello_world"
+    extension = ".py"
+    language = "python"
+
+
+TEMPLATE_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+  cmd: "python {{ source.name }}{{ source.extension }}"
+"""
+
+
+def test_test_info_from_string_shares_compiled_template():
+    clear_template_cache()
+
+    test_info1 = TestInfo.from_string(TEMPLATE_TEST_INFO_STRING, _FakeSource())
+    test_info2 = TestInfo.from_string(TEMPLATE_TEST_INFO_STRING, _FakeSource())
+
+    assert test_info1 == test_info2
+    assert test_info1.container_info.cmd == "python hello_world.py"
+    stats = get_template_cache_stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+    assert stats.size == 1
+
+
+class _OddSource:
+    def __init__(self, name: str, extension: str = ".py") -> None:
+        self.name = name
+        self.extension = extension
+        self.language = "python"
+
+
+STATIC_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+  cmd: "python main.py"
+"""
+STATEMENT_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+  cmd: "{% if source.extension == '.py' %}python{% else %}run{% endif %} {{ source.name }}"
+notes:
+  - "{% for i in range(2) %}step {{ i }}. {% endfor %}"
+"""
+LOOP_KEYS_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+{% for key in ["cmd", "build"] %}
+  {{ key }}: "{{ key }} {{ source.name }}"
+{% endfor %}
+"""
+PLAIN_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+  cmd: python {{ source.name }}
+  build: {{ source.name }}
+"""
+MULTILINE_TEST_INFO_STRING = """\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: "python"
+  tag: "3.7-alpine"
+  cmd: "python
+    {{ source.name }}"
+"""
+
+
+@pytest.mark.parametrize(
+    ("string", "is_rendered_separately"),
+    [
+        pytest.param(TEMPLATE_TEST_INFO_STRING, True, id="expressions"),
+        pytest.param(STATEMENT_TEST_INFO_STRING, True, id="statements"),
+        pytest.param(LOOP_KEYS_TEST_INFO_STRING, False, id="loop-keys"),
+        pytest.param(PLAIN_TEST_INFO_STRING, False, id="plain-flow-mapping"),
+        pytest.param(MULTILINE_TEST_INFO_STRING, False, id="multiline"),
+        pytest.param(
+            TEMPLATE_TEST_INFO_STRING + "# {{ source.name }}\n", False, id="expression-in-comment"
+        ),
+        pytest.param(
+            TEMPLATE_TEST_INFO_STRING.replace("{{ source.name }}", "{{- source.name }}"),
+            False,
+            id="whitespace-control",
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "source",
+    [
+        _FakeSource(),
+        _OddSource("true"),
+        _OddSource("a: b", ""),
+        _OddSource('say "hi"'),
+        _OddSource("it's"),
+        _OddSource("back\\slash"),
+        _OddSource(" padded "),
+        _OddSource("", ""),
+    ],
+    ids=lambda source: repr(source.name),
+)
+def test_test_info_template_matches_from_string(string, is_rendered_separately, source):
+    template = TestInfoTemplate(string)
+
+    assert (template._fields is not None) == is_rendered_separately
+    assert not template.is_static
+    try:
+        expected = TestInfo.from_string(string, source)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            template.render(source)
+    else:
+        assert template.render(source) == expected
+
+
+def test_test_info_template_static():
+    clear_template_cache()
+    template = get_test_info_template(STATIC_TEST_INFO_STRING)
+
+    assert template.is_static
+    assert template.render(_FakeSource()) is TestInfo.from_dict(template.data, "python")
+    assert get_template_cache_stats().misses == 0
+
+
+@pytest.mark.parametrize(
+    "image,tag,cmd,expected",
+    [
+        pytest.param('"python"', '"3.7-alpine"', '"python main.py"', True, id="static"),
+        pytest.param(
+            '"python"', '"3.7-alpine"', '"python {{ source.name }}.py"', True, id="cmd-text"
+        ),
+        pytest.param('"python"', '"3.7-alpine"', '"{{ source.name }}"', False, id="cmd-no-text"),
+        pytest.param('"python"', '"3.7-alpine"', '" {{ source.name }} "', False, id="cmd-space"),
+        pytest.param(
+            '"python"',
+            '"3.7-alpine"',
+            "\"python{% if source.name == 'main' %} main.py{% endif %}\"",
+            False,
+            id="cmd-statement",
+        ),
+        pytest.param(
+            '"{{ source.language }}"', '"3.7-alpine"', '"python main.py"', False, id="image"
+        ),
+        pytest.param('"python"', '"{{ source.name }}"', '"python main.py"', False, id="tag"),
+    ],
+)
+def test_test_info_template_has_static_testability(image, tag, cmd, expected):
+    template = get_test_info_template(
+        f"""\
+folder:
+  extension: ".py"
+  naming: "underscore"
+container:
+  image: {image}
+  tag: {tag}
+  cmd: {cmd}
+"""
+    )
+
+    assert template.has_static_testability == expected
+
+
+def test_test_info_template_renders_fields_together():
+    clear_template_cache()
+    template = get_test_info_template(STATEMENT_TEST_INFO_STRING)
+
+    test_info = template.render(_FakeSource())
+    assert template.render(_FakeSource()) is test_info
+    assert test_info.container_info.cmd == "python hello_world"
+    assert test_info.notes == ["step 0. step 1. "]
+    assert template.data["container"]["cmd"].startswith("{% if")
+    assert get_template_cache_stats().misses == 1
+
+
+def test_test_info_template_invalid_yaml():
+    string = LOOP_KEYS_TEST_INFO_STRING.replace("folder:", "{% if true %}folder:{% endif %}")
+    template = TestInfoTemplate(string)
+
+    assert not template.is_static
+    with pytest.raises(yaml.YAMLError):
+        _ = template.data
+
+    assert template.render(_FakeSource()) == TestInfo.from_string(string, _FakeSource())
+
+
+def test_get_test_info_template_keyed_by_content():
+    clear_template_cache()
+
+    template1 = get_test_info_template(TEMPLATE_TEST_INFO_STRING)
+    template2 = get_test_info_template("".join(TEMPLATE_TEST_INFO_STRING))
+    template3 = get_test_info_template(STATIC_TEST_INFO_STRING)
+
+    assert template1 is template2
+    assert template1 is not template3
+
+    clear_template_cache()
+    assert get_test_info_template(TEMPLATE_TEST_INFO_STRING) is not template1
+
+
+def test_get_template_keyed_by_content():
+    clear_template_cache()
+
+    template1 = get_template("{{ source.name }}")
+    template2 = get_template("".join(["{{ source", ".name }}"]))
+    template3 = get_template("{{ source.extension }}")
+
+    assert template1 is template2
+    assert template1 is not template3
+
+
+def test_set_template_cache_size():
+    clear_template_cache()
+    try:
+        set_template_cache_size(1)
+        template1 = get_template("a")
+        get_template("b")
+
+        assert get_template_cache_stats().size == 1
+        assert get_template("a") is not template1
+    finally:
+        set_template_cache_size(DEFAULT_TEMPLATE_CACHE_SIZE)
+
+
+def test_test_info_from_dict_shares_equal_objects():
+    clear_intern_cache()
+    test_info_dict = {
+        "container": {"image": "python", "tag": "3.7-alpine", "cmd": "python hello_world.py"},
+        "folder": {"extension": ".py", "naming": "underscore"},
+        "notes": ["some note"],
+    }
+    other_test_info_dict = {
+        **test_info_dict,
+        "container": {**test_info_dict["container"], "cmd": "python fizz_buzz.py"},
+    }
+
+    test_info1 = TestInfo.from_dict(test_info_dict, language="python")
+    test_info2 = TestInfo.from_dict(test_info_dict, language="python")
+    test_info3 = TestInfo.from_dict(other_test_info_dict, language="python")
+
+    assert test_info1 is test_info2
+    assert test_info1 is not test_info3
+    assert test_info1.file_info is test_info3.file_info
+    assert test_info1.container_info.image is test_info3.container_info.image
+    stats = get_intern_cache_stats()
+    assert stats.size == 5
+    assert stats.hits == 4
+    assert stats.hit_ratio == pytest.approx(4 / 9)
+
+
+def test_intern_info_unhashable_notes():
+    clear_intern_cache()
+    test_info = TestInfo(
+        container_info=ContainerInfo(),
+        file_info=FolderInfo(extension=".py", naming="underscore"),
+        language_display_name="Python",
+        notes=[{"not": "hashable"}],
+    )
+
+    assert intern_info(test_info) is test_info
+
+
+def test_set_intern_cache_size():
+    clear_intern_cache()
+    try:
+        set_intern_cache_size(1)
+        container_info = intern_info(ContainerInfo(image="a"))
+        intern_info(ContainerInfo(image="b"))
+
+        assert get_intern_cache_stats().size == 1
+        assert intern_info(ContainerInfo(image="a")) is not container_info
+    finally:
+        set_intern_cache_size(DEFAULT_INTERN_CACHE_SIZE)
+
+
+def test_test_info_from_dict_does_not_share_values_of_different_types():
+    clear_intern_cache()
+    test_infos = [
+        TestInfo.from_dict(
+            {
+                "container": {"image": "python", "tag": tag, "cmd": "python x.py"},
+                "folder": {"extension": ".py", "naming": "underscore"},
+                "notes": [tag],
+            },
+            language="python",
+        )
+        for tag in (1, 1.0, True)
+    ]
+
+    assert [type(test_info.container_info.tag) for test_info in test_infos] == [int, float, bool]
+    assert [type(test_info.notes[0]) for test_info in test_infos] == [int, float, bool]
+    assert len({id(test_info) for test_info in test_infos}) == 3
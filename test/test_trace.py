@@ -0,0 +1,117 @@
+import json
+from pathlib import Path
+
+from glotter_core.settings import CoreSettings, clear_settings_cache
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.trace import (
+    DIRECTORY,
+    PHASE,
+    Tracer,
+    get_tracer,
+    trace_count,
+    trace_span,
+    tracing,
+)
+
+
+def test_span_self_duration():
+    tracer = Tracer()
+    with tracer.span("outer"):
+        with tracer.span("inner", path="x"):
+            pass
+
+    inner, outer = tracer.spans
+    assert (inner.name, outer.name) == ("inner", "outer")
+    assert inner.args == {"path": "x"}
+    assert inner.category == PHASE
+    assert outer.self_duration == outer.duration - inner.duration
+    assert inner.self_duration == inner.duration
+
+
+def test_disabled_tracing_records_nothing():
+    assert get_tracer() is None
+    with trace_span("something"):
+        trace_count("something")
+
+
+def test_tracing_context():
+    tracer = Tracer()
+    with tracing(tracer):
+        assert get_tracer() is tracer
+        with tracing(None):
+            assert get_tracer() is tracer
+
+        with trace_span("something"):
+            trace_count("things", 2)
+
+    assert get_tracer() is None
+    assert [span.name for span in tracer.spans] == ["something"]
+    assert tracer.counters == {"things": 2}
+
+
+def test_categorize_sources_tracer(tmp_dir, get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    tracer = Tracer()
+
+    categories = categorize_sources(
+        settings.source_root, settings.projects, CoreSource, tracer=tracer
+    )
+    assert get_tracer() is None
+
+    summary = tracer.summary(num_slowest=2)
+    phases = summary["phases"]
+    assert phases["categorize_sources"]["count"] == 1
+    assert phases["directory"]["count"] == len(categories.by_language)
+    for name in ["walk", "read", "parse", "render", "project_names", "construct"]:
+        assert phases[name]["count"] > 0
+
+    total = phases["categorize_sources"]["total"]
+    assert sum(phase["self"] for phase in phases.values()) <= total * 1.01
+    assert len(summary["slowest_directories"]) == 2
+    path, seconds = summary["slowest_directories"][0]
+    assert Path(path).name in categories.by_language
+    assert seconds >= summary["slowest_directories"][1][1]
+    assert "template_cache_hits" in summary["counters"]
+
+    trace_path = Path(tmp_dir, "trace.json")
+    tracer.write_chrome_trace(trace_path)
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    events = trace["traceEvents"]
+    assert {event["ph"] for event in events} == {"X", "C"}
+    directory_events = [event for event in events if event.get("cat") == DIRECTORY]
+    assert len(directory_events) == len(categories.by_language)
+    assert all(event["dur"] >= 0 for event in directory_events)
+
+
+def test_categorize_sources_tracer_disk_cache(tmp_dir, get_settings):
+    settings = get_settings("test/data/sample-programs-repo")
+    cache_dir = str(Path(tmp_dir, "cache"))
+    for expected_counter in ["disk_cache_misses", "disk_cache_hits"]:
+        tracer = Tracer()
+        categorize_sources(
+            settings.source_root,
+            settings.projects,
+            CoreSource,
+            cache_dir=cache_dir,
+            tracer=tracer,
+        )
+        assert tracer.counters[expected_counter] == 3
+
+
+def test_settings_tracer(cd):
+    clear_settings_cache()
+    tracer = Tracer()
+    with cd("test/data/sample-programs-repo"):
+        CoreSettings(tracer=tracer)
+        CoreSettings(tracer=tracer)
+
+    phases = tracer.summary()["phases"]
+    assert phases["settings"]["count"] == 2
+    for name in ["locate", "read", "parse"]:
+        assert phases[name]["count"] == 1
+
+    # Remembered settings still go through _set_projects
+    assert phases["projects"]["count"] == 2
+
+    assert tracer.counters["settings_memo_misses"] == 1
+    assert tracer.counters["settings_memo_hits"] == 1
@@ -0,0 +1,303 @@
+import errno
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import glotter_core.watch as watch_module
+from glotter_core.project import CoreProject
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.watch import SourceChanges, SourceWatcher, watch_sources
+
+PROJECTS = {
+    "helloworld": CoreProject({"words": ["hello", "world"]}),
+    "rot13": CoreProject({"words": ["rot13"]}),
+}
+BACKENDS = [
+    "polling",
+    pytest.param("inotify", marks=pytest.mark.skipif(sys.platform != "linux", reason="Linux only")),
+]
+
+
+@pytest.fixture
+def source_root(tmp_dir) -> Path:
+    source_root = Path(tmp_dir, "archive")
+    shutil.copytree("test/data/sample-programs-repo/archive", source_root)
+    return source_root
+
+
+def _create_watcher(source_root: Path, backend: str, changes: list) -> SourceWatcher:
+    return SourceWatcher(str(source_root), PROJECTS, CoreSource, changes.append, backend=backend)
+
+
+def _poll(watcher: SourceWatcher) -> SourceChanges:
+    return watcher.poll(0.5 if watcher.backend == "inotify" else 0)
+
+
+def _assert_categories_match_scan(watcher: SourceWatcher, source_root: Path) -> None:
+    expected = categorize_sources(str(source_root), PROJECTS, CoreSource)
+    assert watcher.categories.by_language == expected.by_language
+    assert watcher.categories.testable_by_project == expected.testable_by_project
+    assert sorted(watcher.categories.bad_sources) == sorted(expected.bad_sources)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_initial_categories(source_root, backend):
+    watcher = _create_watcher(source_root, backend, [])
+    try:
+        assert watcher.backend == backend
+        _assert_categories_match_scan(watcher, source_root)
+        assert not _poll(watcher)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_file_added_and_removed(source_root, backend):
+    callback_changes = []
+    watcher = _create_watcher(source_root, backend, callback_changes)
+    try:
+        cpp_dir = source_root / "c" / "c-plus-plus"
+        (cpp_dir / "rot13.cpp").write_text("", encoding="utf-8")
+        (cpp_dir / "junk.cpp").write_text("", encoding="utf-8")
+
+        changes = _poll(watcher)
+
+        assert [source.filename for source in changes.added] == ["rot13.cpp"]
+        assert changes.added_bad_sources == [str(Path("c", "c-plus-plus", "junk.cpp"))]
+        assert not changes.removed
+        assert not changes.changed
+        assert callback_changes == [changes]
+        _assert_categories_match_scan(watcher, source_root)
+
+        (cpp_dir / "rot13.cpp").rename(cpp_dir / "rot-13.cpp")
+
+        changes = _poll(watcher)
+
+        assert [source.filename for source in changes.removed] == ["rot13.cpp"]
+        assert changes.added_bad_sources == [str(Path("c", "c-plus-plus", "rot-13.cpp"))]
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_test_info_changed(source_root, backend):
+    watcher = _create_watcher(source_root, backend, [])
+    try:
+        test_info_path = source_root / "p" / "python" / "testinfo.yml"
+        test_info_path.write_text(
+            test_info_path.read_text(encoding="utf-8").replace("3.12-alpine", "3.13.1-alpine"),
+            encoding="utf-8",
+        )
+
+        changes = _poll(watcher)
+
+        assert sorted(source.filename for source in changes.changed) == [
+            "hello_world.py",
+            "rot13.py",
+        ]
+        assert not changes.added
+        assert not changes.removed
+        assert watcher.categories.by_language["python"].test_info.container_info.tag == (
+            "3.13.1-alpine"
+        )
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_watcher_language_added_and_removed(source_root, backend):
+    watcher = _create_watcher(source_root, backend, [])
+    try:
+        shutil.copytree(source_root / "p" / "python", source_root / "p" / "python2")
+
+        changes = _poll(watcher)
+
+        assert sorted(source.full_path for source in changes.added) == [
+            str(source_root / "p" / "python2" / "hello_world.py"),
+            str(source_root / "p" / "python2" / "rot13.py"),
+        ]
+        assert "python2" in watcher.categories.by_language
+        _assert_categories_match_scan(watcher, source_root)
+
+        shutil.rmtree(source_root / "p")
+
+        changes = _poll(watcher)
+
+        assert len(changes.removed) == 4
+        assert sorted(changes.removed_bad_sources) == [
+            str(Path("p", "python", "foo.py")),
+            str(Path("p", "python2", "foo.py")),
+        ]
+        assert "python" not in watcher.categories.by_language
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_watcher_watches_directory_before_scanning(source_root, monkeypatch):
+    python_dir = source_root / "p" / "python"
+    orig_scan_directory = watch_module._scan_directory
+
+    def scan_directory(root):
+        result = orig_scan_directory(root)
+        if root == str(python_dir) and not (python_dir / "rot13.py").exists():
+            # Changed after the directory is scanned for the first time
+            (python_dir / "rot13.py").write_text("", encoding="utf-8")
+
+        return result
+
+    (python_dir / "rot13.py").unlink()
+    monkeypatch.setattr(watch_module, "_scan_directory", scan_directory)
+    watcher = _create_watcher(source_root, "inotify", [])
+    try:
+        changes = _poll(watcher)
+
+        assert [source.filename for source in changes.added] == ["rot13.py"]
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_watcher_falls_back_to_polling(source_root, monkeypatch):
+    python_dir = source_root / "p" / "python"
+    orig_watch = watch_module._InotifyBackend.watch
+
+    def watch(self, root):
+        if root == str(python_dir):
+            raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC), root)
+
+        orig_watch(self, root)
+
+    monkeypatch.setattr(watch_module._InotifyBackend, "watch", watch)
+    watcher = _create_watcher(source_root, "inotify", [])
+    try:
+        assert watcher.backend == "polling"
+        _assert_categories_match_scan(watcher, source_root)
+
+        (python_dir / "rot13.py").unlink()
+
+        changes = _poll(watcher)
+
+        assert [source.filename for source in changes.removed] == ["rot13.py"]
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+def test_watcher_auto_falls_back_to_polling(source_root, monkeypatch):
+    def init(self):
+        raise OSError(errno.EMFILE, os.strerror(errno.EMFILE))
+
+    monkeypatch.setattr(watch_module._InotifyBackend, "__init__", init)
+    monkeypatch.setattr(watch_module._InotifyBackend, "is_available", staticmethod(lambda: True))
+    watcher = _create_watcher(source_root, "auto", [])
+    try:
+        assert watcher.backend == "polling"
+        _assert_categories_match_scan(watcher, source_root)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_inotify_backend_watch_fails(tmp_dir):
+    backend = watch_module._InotifyBackend()
+    try:
+        with pytest.raises(FileNotFoundError):
+            backend.watch(str(Path(tmp_dir, "missing")))
+    finally:
+        backend.close()
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Linux only")
+def test_watcher_removes_watches(source_root, tmp_dir):
+    watcher = _create_watcher(source_root, "inotify", [])
+    try:
+        python_dir = source_root / "p" / "python"
+        moved_dir = Path(tmp_dir, "python")
+        assert str(python_dir) in watcher._backend._wds
+
+        # Moving a directory out of the source directory does not remove its watch
+        python_dir.rename(moved_dir)
+        changes = _poll(watcher)
+
+        assert len(changes.removed) == 2
+        assert str(python_dir) not in watcher._backend._wds
+        assert str(python_dir) not in watcher._backend._paths.values()
+
+        (moved_dir / "fizz_buzz.py").write_text("", encoding="utf-8")
+
+        assert not _poll(watcher)
+    finally:
+        watcher.stop()
+
+
+def test_watcher_bad_test_info_is_reported(source_root):
+    watcher = _create_watcher(source_root, "polling", [])
+    test_info_path = source_root / "p" / "python" / "testinfo.yml"
+    test_info_path.write_text("folder:\n  naming: bad\n", encoding="utf-8")
+
+    changes = watcher.poll()
+
+    assert list(changes.errors) == [str(source_root / "p" / "python")]
+    assert "python" in watcher.categories.by_language
+
+
+def test_watcher_bad_backend(source_root):
+    with pytest.raises(ValueError) as exc:
+        _create_watcher(source_root, "bad", [])
+
+    assert 'Unknown watch backend: "bad"' in str(exc.value)
+
+
+def test_watch_sources_runs_in_background(source_root):
+    changed = threading.Event()
+    callback_changes = []
+
+    def _callback(changes):
+        callback_changes.append(changes)
+        changed.set()
+
+    with watch_sources(
+        str(source_root), PROJECTS, CoreSource, _callback, interval=0.05, backend="polling"
+    ) as watcher:
+        (source_root / "c" / "c-plus-plus" / "rot13.cpp").write_text("", encoding="utf-8")
+        assert changed.wait(5)
+
+    assert [source.filename for source in callback_changes[0].added] == ["rot13.cpp"]
+    assert "rot13.cpp" in [
+        source.filename for source in watcher.categories.testable_by_project["rot13"]
+    ]
+
+
+def test_watch_sources_callback_error_is_logged(source_root, caplog):
+    failed = threading.Event()
+    changed = threading.Event()
+    callback_changes = []
+
+    def _callback(changes):
+        callback_changes.append(changes)
+        if not failed.is_set():
+            failed.set()
+            raise RuntimeError("callback failed")
+
+        changed.set()
+
+    with watch_sources(
+        str(source_root), PROJECTS, CoreSource, _callback, interval=0.05, backend="polling"
+    ):
+        (source_root / "c" / "c-plus-plus" / "rot13.cpp").write_text("", encoding="utf-8")
+        assert failed.wait(5)
+
+        (source_root / "c" / "c-plus-plus" / "rot13.cpp").unlink()
+        assert changed.wait(5)
+
+    assert [source.filename for source in callback_changes[1].removed] == ["rot13.cpp"]
+    assert "callback failed" in caplog.text
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from glotter_core.settings import CoreSettings, clear_settings_cache
+from glotter_core.source import CoreSource, categorize_sources
+from glotter_core.testinfo import TestInfo
+from glotter_core.yml import (
+    LIBYAML,
+    PYTHON,
+    get_available_yaml_backends,
+    get_yaml_backend,
+    load_yaml,
+    load_yaml_with_nodes,
+    set_yaml_backend,
+)
+
+BACKENDS = [
+    PYTHON,
+    pytest.param(
+        LIBYAML,
+        marks=pytest.mark.skipif(
+            LIBYAML not in get_available_yaml_backends(), reason="libyaml not available"
+        ),
+    ),
+]
+TEST_DATA_DIR = Path("test/data").resolve()
+
+
+@pytest.fixture
+def yaml_backend(request):
+    set_yaml_backend(request.param)
+    try:
+        yield request.param
+    finally:
+        set_yaml_backend()
+
+
+class _FakeSource:
+    name = "hello-world"
+    extension = ".go"
+    language = "go"
+
+
+def test_default_yaml_backend_is_fastest_available():
+    assert get_yaml_backend() == get_available_yaml_backends()[0]
+    assert get_available_yaml_backends()[-1] == PYTHON
+
+
+def test_set_bad_yaml_backend():
+    with pytest.raises(ValueError) as exc:
+        set_yaml_backend("bad")
+
+    assert 'YAML backend "bad" is not available' in str(exc.value)
+
+
+@pytest.mark.parametrize("yaml_backend", BACKENDS, indirect=True)
+def test_load_yaml(yaml_backend):
+    data = {"folder": {"extension": ".py", "naming": "underscore"}, "notes": ["a: b", "c"]}
+
+    assert get_yaml_backend() == yaml_backend
+    assert (
+        load_yaml("""\
+folder:
+  extension: ".py"
+  naming: "underscore"
+notes:
+  - "a: b"
+  - c
+""")
+        == data
+    )
+
+
+@pytest.mark.parametrize("yaml_backend", BACKENDS, indirect=True)
+@pytest.mark.parametrize(
+    "filename",
+    [
+        "good_glotter.yml",
+        "good_glotter_with_source_and_acronyms.yml",
+        "sample-programs-repo/.glotter.yml",
+        "untestable/.glotter.yml",
+    ],
+)
+def test_backends_give_identical_yaml(yaml_backend, filename):
+    contents = (TEST_DATA_DIR / filename).read_text(encoding="utf-8")
+
+    set_yaml_backend(PYTHON)
+    expected = load_yaml(contents)
+    set_yaml_backend(yaml_backend)
+
+    assert load_yaml(contents) == expected
+
+
+@pytest.mark.parametrize("yaml_backend", BACKENDS, indirect=True)
+def test_load_yaml_with_nodes(yaml_backend):
+    contents = "plain: a\ndouble: \"b\"\nsingle: 'c'\nliteral: |\n  d\n"
+    data, node = load_yaml_with_nodes(contents)
+
+    assert data == load_yaml(contents)
+    assert [value_node.value for _, value_node in node.value] == ["a", "b", "c", "d\n"]
+    assert [value_node.style or "" for _, value_node in node.value] == ["", '"', "'", "|"]
+    assert load_yaml_with_nodes("") == (None, None)
+
+
+@pytest.mark.parametrize("yaml_backend", BACKENDS, indirect=True)
+def test_backends_give_identical_test_info(yaml_backend):
+    paths = sorted((TEST_DATA_DIR / "sample-programs-repo").glob("**/testinfo.yml"))
+    assert paths
+    for path in paths:
+        contents = path.read_text(encoding="utf-8")
+        test_info = TestInfo.from_string(contents, _FakeSource())
+
+        set_yaml_backend(PYTHON)
+        assert test_info == TestInfo.from_string(contents, _FakeSource())
+        set_yaml_backend(yaml_backend)
+
+
+@pytest.mark.parametrize("yaml_backend", BACKENDS, indirect=True)
+@pytest.mark.parametrize("repo", ["sample-programs-repo", "untestable"])
+def test_backends_give_identical_settings_and_categories(yaml_backend, repo):
+    orig_cwd = os.getcwd()
+    os.chdir(TEST_DATA_DIR / repo)
+    try:
+        clear_settings_cache()
+        settings = CoreSettings()
+        categories = categorize_sources(settings.source_root, settings.projects, CoreSource)
+
+        set_yaml_backend(PYTHON)
+        clear_settings_cache()
+        expected_settings = CoreSettings()
+        expected_categories = categorize_sources(
+            expected_settings.source_root, expected_settings.projects, CoreSource
+        )
+    finally:
+        os.chdir(orig_cwd)
+        clear_settings_cache()
+
+    assert settings == expected_settings
+    assert categories == expected_categories